@@ -0,0 +1,61 @@
+"""
+Multi-topic analysis through AnalysisScheduler against a local stub OpenAI server.
+
+The stub adds latency and answers a share of requests with 429 + Retry-After. Every
+topic must still end with a parsed summary; the run exits non-zero otherwise:
+
+    python -m benchmarks.bench_analysis_scheduler
+"""
+import argparse
+import sys
+import tempfile
+import time
+from benchmarks.stub_openai import StubOpenAIServer
+from utils import AnalysisScheduler, OpenAIAnalyzer
+
+
+def run(concurrency, args):
+    topics = {
+        f"TOPIC{t}": [{"title": f"Story {t}-{a}", "content": f"Body of story {t}-{a}. " * 50}
+                      for a in range(args.articles)]
+        for t in range(args.topics)
+    }
+    with StubOpenAIServer(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=concurrency, requests_per_minute=args.rpm,
+                                      base_delay=0.1, max_delay=1.0)
+        analyzer = OpenAIAnalyzer(api_key="stub", cache_dir=tempfile.mkdtemp(), base_url=stub.base_url,
+                                  scheduler=scheduler)
+        start = time.perf_counter()
+        results = analyzer.analyze_topics(topics)
+        elapsed = time.perf_counter() - start
+        analyzer.close()
+    failed = [topic for topic, result in results.items() if result["sentiment"] != "neutral"]
+    return elapsed, scheduler.stats, stub.stats, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--articles", type=int, default=4, help="Articles per topic")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (s)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.15, help="Share of requests answered with 429")
+    parser.add_argument("--rpm", type=int, default=6000, help="Scheduler requests-per-minute budget")
+    args = parser.parse_args()
+
+    rows = []
+    all_ok = True
+    for concurrency in args.concurrency:
+        elapsed, stats, stub_stats, failed = run(concurrency, args)
+        all_ok = all_ok and not failed
+        rows.append((concurrency, elapsed, stats, stub_stats, failed))
+
+    print(f"\n{'cap':>4} {'seconds':>8} {'requests':>9} {'429s':>5} {'retries':>8} {'peak':>5} {'failed':>7}")
+    for concurrency, elapsed, stats, stub_stats, failed in rows:
+        print(f"{concurrency:>4} {elapsed:>8.2f} {stub_stats['requests']:>9} {stub_stats['rate_limited']:>5} "
+              f"{stats['retries']:>8} {stub_stats['max_in_flight']:>5} {len(failed):>7}")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Page-load time and bytes per page with the original Chrome profile vs the lean one.
+
+Needs Chrome and network access. Bytes are the Performance API transferSize of the
+document plus every resource it pulled in, read once the page has settled (loaded and
+no fetch/XHR for --idle-ms) under both profiles. The lean profile's eager load strategy
+returns from driver.get() before subresources finish, so reading right away would miss
+bytes still in flight. Load time is reported both until driver.get() returns, which is
+what a scrape waits for, and until the page settles:
+
+    python -m benchmarks.bench_browser_profile
+    python -m benchmarks.bench_browser_profile --repeat 5 https://finance.yahoo.com/quote/IONQ/
+"""
+import argparse
+import statistics
+import time
+from selenium.common.exceptions import TimeoutException
+from utils import BrowserProfile, PageReadiness, network_idle
+
+DEFAULT_URLS = [
+    "https://finance.yahoo.com/quote/IONQ/",
+    "https://finance.yahoo.com/quote/ASTS/news/",
+]
+
+TRANSFER_SIZE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return {
+    bytes: entries.reduce((total, entry) => total + (entry.transferSize || 0), 0),
+    requests: entries.length,
+};
+"""
+
+
+def measure(profile, urls, repeat, idle_ms, settle_timeout):
+    driver = profile.create_driver()
+    readiness = PageReadiness()
+    loaded, settled, transferred, requests = [], [], [], []
+    unsettled = 0
+    try:
+        for _ in range(repeat):
+            for url in urls:
+                # Start each load from a blank page so resources are not counted twice
+                driver.get("about:blank")
+                start = time.perf_counter()
+                driver.get(url)
+                loaded.append(time.perf_counter() - start)
+                # Same settle condition for both profiles, whatever their page load strategy
+                try:
+                    readiness.wait(driver, network_idle(idle_ms), "settled", timeout=settle_timeout)
+                except TimeoutException:
+                    unsettled += 1
+                settled.append(time.perf_counter() - start)
+                sizes = driver.execute_script(TRANSFER_SIZE_SCRIPT)
+                transferred.append(sizes["bytes"])
+                requests.append(sizes["requests"])
+    finally:
+        driver.quit()
+    if unsettled:
+        print(f"Warning: {unsettled} page load(s) had not settled after {settle_timeout}s; measured as they were")
+    return {
+        "loaded": statistics.median(loaded),
+        "settled": statistics.median(settled),
+        "bytes": statistics.median(transferred),
+        "requests": statistics.median(requests),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--idle-ms", type=int, default=500, help="Quiet network time before a page counts as settled")
+    parser.add_argument("--settle-timeout", type=float, default=30.0, help="Longest wait for a page to settle (s)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'get s':>7} {'settled s':>10} {'KB/page':>10} {'requests':>9}")
+    results = {}
+    for name, profile in (("full", BrowserProfile.full()), ("lean", BrowserProfile())):
+        result = results[name] = measure(profile, args.urls, args.repeat, args.idle_ms, args.settle_timeout)
+        print(f"{name:<8} {result['loaded']:>7.2f} {result['settled']:>10.2f} {result['bytes'] / 1024:>10.0f} "
+              f"{result['requests']:>9.0f}")
+
+    full, lean = results["full"], results["lean"]
+    print(f"\nLean profile: {full['loaded'] / max(lean['loaded'], 1e-9):.1f}x faster driver.get(), "
+          f"{full['settled'] / max(lean['settled'], 1e-9):.1f}x faster to settle, "
+          f"{100 * (1 - lean['bytes'] / max(full['bytes'], 1)):.0f}% fewer bytes per page")
+
+
+if __name__ == "__main__":
+    main()
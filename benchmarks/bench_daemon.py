@@ -0,0 +1,107 @@
+"""
+Per-cycle cost of refreshing topics with one cold run each versus the warm daemon.
+
+Both modes refresh the same topics the same number of times against the local
+fixture server, stub OpenAI and stub Telegram. The driver factory sleeps --startup
+seconds to stand in for a Chrome launch. Cold mode calls main() once per topic cycle, so
+every cycle builds its pool, clients and caches; the daemon builds them once and
+runs each topic on its own short interval:
+
+    python -m benchmarks.bench_daemon
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import ReplayDriver, StubTelegramServer
+from benchmarks.stub_openai import StubOpenAIServer
+from utils import metrics
+
+
+def write_watchlist(path, topics, interval_seconds, concurrency):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"interval_minutes": interval_seconds / 60, "jitter": 0.2, "max_concurrent_topics": concurrency,
+                   "topics": topics}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3, help="Cycles per topic")
+    parser.add_argument("--interval", type=float, default=2.0, help="Daemon refresh interval per topic (s)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Topic cycles running at once")
+    parser.add_argument("--startup", type=float, default=1.0, help="Simulated browser start time (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fixture server latency per page (s)")
+    parser.add_argument("--openai-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    import main as entry_point
+
+    topics = [f"TERM{i}" for i in range(args.topics)]
+    cycles = args.topics * args.rounds
+    browsers = []
+
+    with FixtureServer(latency=args.latency, articles_per_search=4) as server, \
+            StubOpenAIServer(latency=args.openai_latency) as openai_stub, StubTelegramServer() as telegram:
+        def start_browser():
+            time.sleep(args.startup)
+            browsers.append(1)
+            return ReplayDriver(server.base_url)
+
+        options = dict(driver_factory=start_browser, base_urls={"yahoo_finance": server.base_url})
+        environment = {
+            "OPENAI_KEY": "stub", "OPENAI_BASE_URL": openai_stub.base_url, "TELEGRAM_BOT_TOKEN": "stub",
+            "TELEGRAM_CHAT_ID": "1", "TELEGRAM_API_URL": telegram.api_url, "SOURCES": "yahoo_finance",
+            # Every cycle scrapes and analyzes, as it would when new articles keep arriving
+            "INCREMENTAL": "0", "ANALYSIS_FRESH_HOURS": "0",
+            "DAEMON_MAINTENANCE_MINUTES": str(args.interval * 2 / 60),
+        }
+        saved_environment = {name: os.environ.get(name) for name in [*environment, "WATCHLIST", "METRICS_LOG"]}
+        saved_cwd = os.getcwd()
+        os.environ.update(environment)
+        try:
+            os.chdir(tempfile.mkdtemp())
+            cold = []
+            for _ in range(args.rounds):
+                for topic in topics:
+                    write_watchlist("watchlist.json", [topic], args.interval, 1)
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        entry_point.main(**options)
+                    cold.append(time.perf_counter() - start)
+            cold_browsers, cold_messages = len(browsers), len(telegram.delivered)
+
+            os.chdir(tempfile.mkdtemp())
+            write_watchlist("watchlist.json", topics, args.interval, args.concurrency)
+            os.environ["METRICS_LOG"] = "daemon_metrics.log"
+            browsers.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = entry_point.run_daemon(max_cycles=cycles, **options)
+            daemon_seconds = time.perf_counter() - start
+            cycle_span = metrics.summary()["spans"]["cycle"]
+        finally:
+            os.chdir(saved_cwd)
+            for name, value in saved_environment.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    print(f"{cycles} cycles over {args.topics} topics, {args.startup:.1f}s simulated browser start")
+    print(f"{'mode':>7} {'mean cycle':>11} {'max cycle':>10} {'browsers':>9}")
+    print(f"{'cold':>7} {statistics.mean(cold):>10.2f}s {max(cold):>9.2f}s {cold_browsers:>9}")
+    print(f"{'daemon':>7} {cycle_span['seconds'] / cycle_span['count']:>10.2f}s {cycle_span['max_seconds']:>9.2f}s "
+          f"{len(browsers):>9}")
+    print(f"Daemon: {stats['cycles']} cycles ({stats['failures']} failed) in {daemon_seconds:.1f}s wall, "
+          f"{stats['maintenance']} maintenance runs; Telegram messages cold {cold_messages}, "
+          f"daemon {len(telegram.delivered) - cold_messages} (unchanged summaries are not resent)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Scraping with sessions that hang on some pages, with and without the driver pool's governor.
+
+Article pages are fetched through the browser from the local fixture server. Every
+--hang-every-th article hangs the first time it is loaded, until the session is killed or
+--hang seconds pass (standing in for the page load timeout). Without the governor
+the hang runs its course and the article is lost; with it, the session is killed at
+--deadline, replaced, and the article retried. Sessions are also recycled every --max-pages pages:
+
+    python -m benchmarks.bench_driver_governor
+"""
+import argparse
+import contextlib
+import io
+import os
+import threading
+import time
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import ReplayDriver
+from utils import DriverPool, YahooFinanceScraper
+from utils.driver_pool import process_tree_rss
+
+
+class HangingDriver(ReplayDriver):
+    """ReplayDriver whose get() hangs on chosen URLs the first time, until quit() or the hang time passes"""
+
+    def __init__(self, base_url, should_hang, hang):
+        super().__init__(base_url)
+        self.should_hang = should_hang
+        self.hang = hang
+        self._killed = threading.Event()
+
+    def get(self, url):
+        if self.should_hang(url):
+            if self._killed.wait(self.hang):
+                raise ConnectionResetError("session killed")
+            raise TimeoutError("page load timed out")
+        super().get(url)
+
+    def quit(self):
+        self._killed.set()
+
+
+def run(server, terms, args, governed):
+    hung, lock = set(), threading.Lock()
+
+    def should_hang(url):
+        if "/news/" not in url:
+            return False
+        index = int(url.rsplit("-", 1)[-1].split(".")[0])
+        with lock:
+            if index % args.hang_every or url in hung:
+                return False
+            hung.add(url)
+            return True
+
+    limits = dict(max_pages=args.max_pages, operation_timeout=args.deadline) if governed else {}
+    pool = DriverPool(size=args.pool, driver_factory=lambda: HangingDriver(server.base_url, should_hang, args.hang),
+                      **limits)
+    scraper = YahooFinanceScraper(driver_pool=pool, num_articles=args.articles, base_url=server.base_url)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            output = scraper.scrape_website(terms)
+    finally:
+        pool.close()
+    articles = sum(len(found) for found in output.values())
+    return time.perf_counter() - start, articles, pool.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=3)
+    parser.add_argument("--articles", type=int, default=8, help="Articles per search term")
+    parser.add_argument("--pool", type=int, default=2)
+    parser.add_argument("--hang-every", type=int, default=4, help="Every n-th article hangs once")
+    parser.add_argument("--hang", type=float, default=10.0, help="Seconds a hang lasts if nothing kills it")
+    parser.add_argument("--deadline", type=float, default=1.0, help="Per-operation deadline (s)")
+    parser.add_argument("--max-pages", type=int, default=10, help="Pages before a session is recycled")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fixture server latency per page (s)")
+    args = parser.parse_args()
+
+    terms = [f"TERM{i}" for i in range(args.terms)]
+    with FixtureServer(latency=args.latency, articles_per_search=args.articles) as server:
+        results = [(label, run(server, terms, args, governed)) for label, governed in
+                   (("ungoverned", False), ("governed", True))]
+
+    print(f"{'mode':>10} {'seconds':>8} {'articles':>8} {'started':>7} {'deadline':>8} {'page limit':>10}")
+    for label, (seconds, articles, stats) in results:
+        print(f"{label:>10} {seconds:>8.2f} {articles:>8} {stats['started']:>7} {stats['deadline']:>8} "
+              f"{stats['page_limit']:>10}")
+    rss = process_tree_rss(os.getpid())
+    print(f"RSS sampling from /proc: {'this process ' + str(rss // 2**20) + ' MB' if rss else 'unavailable'}")
+
+
+if __name__ == "__main__":
+    main()
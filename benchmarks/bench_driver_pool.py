@@ -0,0 +1,49 @@
+"""
+Throughput of YahooFinanceScraper.scrape_website at driver pool sizes 1/2/4/8.
+
+Runs against a local fixture server, so no Chrome or network access is needed:
+
+    python -m benchmarks.bench_driver_pool
+"""
+import argparse
+import time
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import ReplayDriver
+from utils import DriverPool, YahooFinanceScraper
+
+
+def run(pool_size, server, search_terms, num_articles):
+    pool = DriverPool(size=pool_size, driver_factory=lambda: ReplayDriver(server.base_url))
+    scraper = YahooFinanceScraper(driver_pool=pool, num_articles=num_articles, base_url=server.base_url)
+    start = time.perf_counter()
+    try:
+        output = scraper.scrape_website(search_terms)
+    finally:
+        pool.close()
+    elapsed = time.perf_counter() - start
+    articles = sum(len(articles) for articles in output.values())
+    return elapsed, articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--terms", type=int, default=4, help="Number of search terms")
+    parser.add_argument("--articles", type=int, default=8, help="Articles per search term")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixture server latency per page (s)")
+    args = parser.parse_args()
+
+    search_terms = [f"TERM{i}" for i in range(args.terms)]
+    results = []
+    with FixtureServer(latency=args.latency, articles_per_search=args.articles) as server:
+        for size in args.sizes:
+            elapsed, articles = run(size, server, search_terms, args.articles)
+            results.append((size, elapsed, articles))
+
+    print(f"\n{'pool':>5} {'seconds':>9} {'articles':>9} {'articles/s':>11}")
+    for size, elapsed, articles in results:
+        print(f"{size:>5} {elapsed:>9.2f} {articles:>9} {articles / elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parser backends compared on time and peak memory over Yahoo/CryptoPotato HTML fixtures.
+
+"full" parses the whole page before selecting (the previous approach); "scoped" is
+HtmlExtractor building only the subtrees named by each scraper's spec:
+
+    python -m benchmarks.bench_extraction
+    python -m benchmarks.bench_extraction --yahoo-article saved_article.html
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from benchmarks.fixtures import heavy_cryptopotato_article_page, heavy_yahoo_article_page, heavy_yahoo_search_page
+from utils import HtmlExtractor
+from utils.crypto_potato_scraper import CryptoPotatoScraper
+from utils.extraction import LexborHTMLParser
+from utils.yahoo_finance_scraper import YahooFinanceScraper
+
+
+def full_tree(parser):
+    """Parse the whole document, then apply the spec's selectors"""
+    def extract(spec, html):
+        root = BeautifulSoup(html, parser)
+        extractor = HtmlExtractor(parser)
+        if spec.item is None:
+            return extractor._fields_bs4(spec, root)
+        return [extractor._fields_bs4(spec, item) for item in root.select(spec.item)]
+    return extract
+
+
+def measure(extract, spec, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract(spec, html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    extract(spec, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, result
+
+
+def read(path, default):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--yahoo-search", help="Saved Yahoo search results page")
+    parser.add_argument("--yahoo-article", help="Saved Yahoo article page")
+    parser.add_argument("--cryptopotato-article", help="Saved CryptoPotato article page")
+    args = parser.parse_args()
+
+    fixtures = [
+        ("yahoo search", YahooFinanceScraper.SEARCH_RESULTS_SPEC, read(args.yahoo_search, heavy_yahoo_search_page())),
+        ("yahoo article", YahooFinanceScraper.ARTICLE_SPEC, read(args.yahoo_article, heavy_yahoo_article_page())),
+        ("cryptopotato article", CryptoPotatoScraper.ARTICLE_SPEC,
+         read(args.cryptopotato_article, heavy_cryptopotato_article_page())),
+    ]
+    backends = [
+        ("html.parser full", full_tree("html.parser")),
+        ("html.parser scoped", HtmlExtractor("html.parser").extract),
+        ("lxml full", full_tree("lxml")),
+        ("lxml scoped", HtmlExtractor("lxml").extract),
+    ]
+    if LexborHTMLParser is not None:
+        backends.append(("selectolax", HtmlExtractor("selectolax").extract))
+
+    for name, spec, html in fixtures:
+        print(f"\n{name} ({len(html) / 1024:.0f} KiB)")
+        print(f"{'backend':>20} {'median ms':>10} {'peak KiB':>10} {'items':>6}")
+        for backend, extract in backends:
+            seconds, peak, result = measure(extract, spec, html, args.repeat)
+            items = len(result) if isinstance(result, list) else len(result.get("paragraphs") or [])
+            print(f"{backend:>20} {seconds * 1000:>10.2f} {peak / 1024:>10.0f} {items:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-call cost of the instrumentation in utils.metrics, disabled and enabled.
+
+Times a trivial function undecorated, wrapped in Metrics.timed() with metrics off
+and on, plus Metrics.count() calls:
+
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import tempfile
+import time
+from utils import Metrics
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    metrics = Metrics()
+
+    def work():
+        return None
+
+    timed_work = metrics.timed("work", source="bench")(work)
+
+    def counted():
+        metrics.count("bench", kind="work")
+
+    rows = [("plain call", per_call_ns(work, args.calls))]
+    rows.append(("timed, disabled", per_call_ns(timed_work, args.calls)))
+    rows.append(("count, disabled", per_call_ns(counted, args.calls)))
+    with tempfile.TemporaryDirectory() as directory:
+        metrics.configure(run_log=f"{directory}/run_metrics.log")
+        rows.append(("timed, enabled", per_call_ns(timed_work, args.calls)))
+        rows.append(("count, enabled", per_call_ns(counted, args.calls)))
+        start = time.perf_counter()
+        metrics.flush()
+        flush_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{'case':<18} {'ns/call':>9} {'overhead ns':>12}")
+    for name, ns in rows:
+        print(f"{name:<18} {ns:>9.0f} {ns - rows[0][1]:>12.0f}")
+    print(f"flush of {args.calls} spans: {flush_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Build time and token counts of PromptBuilder on large synthetic article sets.
+
+Compares the old string concatenation of raw articles with cleaning, fair-share
+truncation and batching:
+
+    python -m benchmarks.bench_prompt_builder
+"""
+import argparse
+import random
+import time
+from utils import PromptBuilder
+
+BOILERPLATE = [
+    "Story continues",
+    "Read more: Top 5 stocks to watch this week",
+    "Sign up for our daily newsletter",
+    "All rights reserved.",
+    "This article was originally published on Fixture Wire.",
+]
+
+
+def synthetic_article(index, rng, paragraphs):
+    body = []
+    for p in range(paragraphs):
+        words = " ".join(rng.choice(["revenue", "guidance", "token", "network", "shares", "analysts",
+                                      "quarter", "growth", "volume", "rally", "margin", "outlook"])
+                         for _ in range(rng.randint(40, 90)))
+        body.append(f"Paragraph {p} of story {index}: {words}.")
+        if rng.random() < 0.2:
+            body.append(rng.choice(BOILERPLATE))
+    return {"title": f"Synthetic story {index}", "content": "\n".join(body)}
+
+
+def naive_prompt(articles):
+    combined_text = ""
+    for i, article in enumerate(articles, 1):
+        combined_text += f"\n\nArticle {i}:\nTitle: {article['title']}\nContent: {article['content']}\n"
+    return combined_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 20, 100, 500])
+    parser.add_argument("--paragraphs", type=int, default=25, help="Paragraphs per article")
+    parser.add_argument("--budget", type=int, default=6000, help="Token budget per prompt")
+    args = parser.parse_args()
+
+    builder = PromptBuilder(token_budget=args.budget)
+    rng = random.Random(7)
+    print(f"tokenizer: {'tiktoken' if builder.counter.encoding else 'estimate'}, budget {args.budget}")
+    print(f"{'articles':>8} {'naive tok':>10} {'naive ms':>9} {'built tok':>10} {'batches':>8} {'max batch':>10} {'build ms':>9}")
+
+    for size in args.sizes:
+        articles = [synthetic_article(i, rng, args.paragraphs) for i in range(size)]
+
+        start = time.perf_counter()
+        naive = naive_prompt(articles)
+        naive_ms = (time.perf_counter() - start) * 1000
+        naive_tokens = builder.counter.count(naive)
+
+        start = time.perf_counter()
+        sections = [
+            f"Article {i}:\nTitle: {article['title']}\nContent: {builder.clean(article['content'])}"
+            for i, article in enumerate(articles, 1)
+        ]
+        batches = builder.batches(sections)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        batch_tokens = [builder.counter.count("\n\n".join(batch)) for batch in batches]
+        print(f"{size:>8} {naive_tokens:>10} {naive_ms:>9.1f} {sum(batch_tokens):>10} {len(batches):>8} "
+              f"{max(batch_tokens):>10} {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
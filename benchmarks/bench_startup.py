@@ -0,0 +1,87 @@
+"""
+Wall time of a run where every topic already has today's analysis cached.
+
+Each run is a fresh interpreter (so import costs count) in a temporary directory
+whose analysis cache holds a fresh analysis for every topic; Telegram is the local stub and the
+driver factory refuses to start a browser. Reports the process time, the time spent
+in main() and which heavy modules were imported:
+
+    python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.replay import StubTelegramServer
+from utils.analysis_cache import AnalysisCache
+
+REPO = Path(__file__).resolve().parent.parent
+TOPICS = ["Solana", "BYDDY", "ASTS", "QUBT", "IONQ"]
+HEAVY_MODULES = ["selenium", "webdriver_manager", "openai", "bs4", "lxml", "tiktoken", "requests"]
+
+RUN = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import main
+
+def no_browser():
+    raise RuntimeError("a fully cached run must not start a browser")
+
+entered = time.perf_counter()
+main.main(driver_factory=no_browser)
+done = time.perf_counter()
+print(json.dumps({{"import_s": entered - start, "main_s": done - entered,
+                  "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def seed_cache(directory):
+    cache = AnalysisCache(Path(directory) / "cache" / "analyses.sqlite3")
+    for topic in TOPICS:
+        analysis = {"summary": f"Cached summary for {topic}", "sentiment": "neutral", "confidence": 0.5,
+                    "citations": []}
+        cache.put(f"seed-{topic}", topic, analysis)
+    cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    interpreter = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        interpreter.append(time.perf_counter() - start)
+
+    runs = []
+    with StubTelegramServer(latency=0.0) as telegram:
+        env = dict(os.environ, OPENAI_KEY="stub", TELEGRAM_BOT_TOKEN="stub", TELEGRAM_CHAT_ID="1",
+                   TELEGRAM_API_URL=telegram.api_url)
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as directory:
+                seed_cache(directory)
+                start = time.perf_counter()
+                completed = subprocess.run(
+                    [sys.executable, "-c", RUN.format(repo=str(REPO), heavy=HEAVY_MODULES)],
+                    cwd=directory, env=env, capture_output=True, text=True, check=True,
+                )
+                total = time.perf_counter() - start
+                runs.append(dict(json.loads(completed.stdout.strip().splitlines()[-1]), total_s=total))
+
+    print(f"bare interpreter:      {statistics.median(interpreter) * 1000:7.0f} ms")
+    for key, label in (("import_s", "import main"), ("main_s", "main() fully cached"), ("total_s", "whole process")):
+        print(f"{label + ':':<22} {statistics.median(run[key] for run in runs) * 1000:7.0f} ms")
+    print(f"heavy modules loaded: {', '.join(runs[0]['loaded']) or 'none'}")
+    print(f"Telegram messages: {len(telegram.delivered)} over {args.repeat} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Time to first insight in Telegram: the end-of-run digest versus streaming delivery.
+
+Runs main() end to end against the local fixture server, a stub OpenAI API that streams
+its answers token by token, and the stub Bot API, once with TELEGRAM_DELIVERY=digest
+and once with TELEGRAM_DELIVERY=stream. Reports when the chat first saw something,
+part of a summary and a finished topic, measured from the start of the run:
+
+    python -m benchmarks.bench_streaming
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import ReplayDriver, StubTelegramServer
+from benchmarks.stub_openai import StubOpenAIServer
+
+# Every fixture summary starts with this, so a message containing it shows (part of) an analysis
+SUMMARY_MARK = "Fixture"
+
+
+def first_call(calls, start, matches):
+    at = next((call["at"] for call in calls if matches(call["params"].get("text", ""))), None)
+    return at - start if at is not None else float("nan")
+
+
+def run(mode, topics, options):
+    with StubTelegramServer(latency=0.02) as telegram:
+        os.environ.update(TELEGRAM_API_URL=telegram.api_url, TELEGRAM_DELIVERY=mode)
+        os.chdir(tempfile.mkdtemp())
+        with open("watchlist.json", "w", encoding="utf-8") as f:
+            json.dump({"topics": topics}, f)
+
+        import main as entry_point
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            entry_point.main(**options)
+        total = time.perf_counter() - start
+        calls = list(telegram.calls)
+    return {
+        "first message": first_call(calls, start, lambda text: True),
+        "first partial": first_call(calls, start, lambda text: SUMMARY_MARK in text),
+        "first topic": first_call(calls, start, lambda text: SUMMARY_MARK in text and "Sentiment" in text),
+        "run": total,
+        "calls": len(calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--articles", type=int, default=4, help="Articles per search")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fixture server latency per page (s)")
+    parser.add_argument("--openai-latency", type=float, default=0.3, help="Seconds to the first token")
+    parser.add_argument("--token-interval", type=float, default=0.03, help="Seconds between streamed tokens")
+    args = parser.parse_args()
+
+    topics = [f"TERM{i}" for i in range(args.topics)]
+    saved_environment = dict(os.environ)
+    saved_cwd = os.getcwd()
+    results = {}
+    try:
+        with FixtureServer(latency=args.latency, articles_per_search=args.articles) as server, \
+                StubOpenAIServer(latency=args.openai_latency, token_interval=args.token_interval) as openai_stub:
+            os.environ.update(OPENAI_KEY="stub", OPENAI_BASE_URL=openai_stub.base_url, TELEGRAM_BOT_TOKEN="stub",
+                              TELEGRAM_CHAT_ID="1", SOURCES="yahoo_finance", FETCH_MODE="browser")
+            options = dict(driver_factory=lambda: ReplayDriver(server.base_url),
+                           base_urls={"yahoo_finance": server.base_url})
+            for mode in ("digest", "stream"):
+                results[mode] = run(mode, topics, options)
+    finally:
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_environment)
+
+    columns = ["first message", "first partial", "first topic", "run"]
+    print(f"{args.topics} topics; seconds from the start of the run")
+    print(f"{'mode':>7} " + " ".join(f"{column:>13}" for column in columns) + f" {'API calls':>9}")
+    for mode, result in results.items():
+        print(f"{mode:>7} " + " ".join(f"{result[column]:>13.2f}" for column in columns) + f" {result['calls']:>9}")
+
+
+if __name__ == "__main__":
+    main()
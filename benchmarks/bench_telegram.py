@@ -0,0 +1,86 @@
+"""
+Telegram delivery against the local stub Bot API: chunking, retries, parallel chats and the outbox.
+
+Sends a digest of many long summaries to several chats while the stub injects
+429s (with retry_after) and 502s, checks every message is within the length limit,
+balanced Markdown and in order per chat, then takes the stub down to fill the
+outbox and replays it:
+
+    python -m benchmarks.bench_telegram
+"""
+import argparse
+import random
+import tempfile
+import time
+from benchmarks.replay import StubTelegramServer
+from utils import TelegramNotifier
+from utils.telegram_delivery import MESSAGE_LIMIT, SendRateLimiter, TelegramOutbox, _entity_states
+
+
+def synthetic_summaries(count, rng):
+    words = ["revenue", "*guidance raised*", "token", "_network upgrade_", "shares", "analysts", "`SOL`",
+             "quarter", "growth", "volume", "rally", "margin", "outlook"]
+    return [{"topic": f"TOPIC{i}", "sentiment": rng.choice(["bullish", "bearish", "neutral"]),
+             "summary": " ".join(rng.choice(words) for _ in range(rng.randint(60, 160)))}
+            for i in range(count)]
+
+
+def notifier(stub, chats, outbox, workers, interval):
+    return TelegramNotifier(bot_token="stub", chat_id=",".join(chats), api_url=stub.api_url, outbox=outbox,
+                            rate_limiter=SendRateLimiter(per_chat_interval=interval), base_delay=0.05,
+                            max_workers=workers)
+
+
+def check(stub, chats):
+    """Messages within the limit, with balanced Markdown, and every chat got the same sequence"""
+    per_chat = {chat: [text for chat_id, text in stub.delivered if chat_id == chat] for chat in chats}
+    within_limit = all(len(text) <= MESSAGE_LIMIT for _, text in stub.delivered)
+    balanced = all(_entity_states(text)[-1] is None for _, text in stub.delivered)
+    in_order = len({tuple(texts) for texts in per_chat.values()}) == 1
+    return within_limit, balanced, in_order, len(per_chat[chats[0]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=30)
+    parser.add_argument("--chats", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub API latency per call (s)")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between sends to one chat")
+    args = parser.parse_args()
+
+    summaries = synthetic_summaries(args.topics, random.Random(3))
+    chats = [str(1000 + i) for i in range(args.chats)]
+
+    with StubTelegramServer(latency=args.latency) as stub:
+        single = notifier(stub, chats[:1], None, 1, args.interval)
+        old_length = len(single._get_timestamp()) + sum(len(item["summary"]) + 60 for item in summaries)
+        print(f"{args.topics} summaries as one message: ~{old_length} chars (limit {MESSAGE_LIMIT}), "
+              f"which the old single sendMessage could not deliver")
+
+    print(f"{'workers':>7} {'seconds':>8} {'messages':>8} {'calls':>6} {'retries':>7} {'429s':>5} "
+          f"{'limit':>6} {'balanced':>8} {'ordered':>7}")
+    for workers in (1, args.chats):
+        with StubTelegramServer(latency=args.latency, rate_limit_every=7, error_every=11, retry_after=1) as stub:
+            sender = notifier(stub, chats, None, workers, args.interval)
+            start = time.perf_counter()
+            delivered = sender.send_multiple_summaries(summaries)
+            seconds = time.perf_counter() - start
+            within_limit, balanced, in_order, messages = check(stub, chats)
+            print(f"{workers:>7} {seconds:>8.2f} {messages:>8} {len(stub.calls):>6} {sender.stats['retries']:>7} "
+                  f"{sender.stats['rate_limited']:>5} {str(within_limit):>6} {str(balanced):>8} {str(in_order):>7}"
+                  f"{'' if delivered else '  (not all delivered)'}")
+
+    with tempfile.TemporaryDirectory() as directory, StubTelegramServer(latency=args.latency) as stub:
+        outbox = TelegramOutbox(f"{directory}/telegram_outbox.jsonl")
+        stub.down = True
+        notifier(stub, chats, outbox, args.chats, args.interval).send_multiple_summaries(summaries)
+        queued = len(outbox)
+        stub.down = False
+        replayed = notifier(stub, chats, outbox, args.chats, args.interval).flush_outbox()
+        within_limit, balanced, in_order, messages = check(stub, chats)
+        print(f"Outbox: {queued} queued while the API was down, {replayed} replayed on the next run, "
+              f"{len(outbox)} left; ordered per chat: {in_order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Generated Yahoo Finance and CryptoPotato pages for benchmarks that have no recording to replay"""
+from benchmarks.replay import ReplayServer
+
+HOMEPAGE = """<html><body>
+<header><input id="ybar-sbq" type="text"></header>
+<main>Yahoo Finance fixture homepage</main>
+</body></html>"""
+
+SEARCH_ITEM = """<li><div class="content">
+<a class="subtle-link fin-size-small titles noUnderline yf-106qqvl" href="{base}news/{term}-{index}.html">{term} story {index}</a>
+<div class="footer yf-lfbf5f"><div class="publishing yf-m1e6lz">Fixture Wire • {index}h ago</div></div>
+</div></li>"""
+
+ARTICLE = """<html><body>
+<h1 class="cover-title yf-1rjrr1">{title}</h1>
+<div class="body yf-h0on0w">{paragraphs}</div>
+</body></html>"""
+
+
+def search_page(base_url, term, count):
+    items = "".join(SEARCH_ITEM.format(base=base_url, term=term, index=i) for i in range(1, count + 1))
+    return (f'<html><body><header><input id="ybar-sbq" type="text"></header>'
+            f'<section data-testid="recent-news"><ul>{items}</ul></section></body></html>')
+
+
+def article_page(title, paragraph_count=12):
+    paragraphs = "".join(
+        f'<p class="yf-1090901">{title} paragraph {i}: analysts weighed the latest figures against guidance.</p>'
+        for i in range(paragraph_count)
+    )
+    return ARTICLE.format(title=title, paragraphs=paragraphs)
+
+
+class FixtureServer(ReplayServer):
+    """Serves generated Yahoo Finance homepage, search and article pages for any term with a fixed latency"""
+
+    def __init__(self, latency=0.2, articles_per_search=8):
+        super().__init__(latency=latency)
+        self.articles_per_search = articles_per_search
+
+    def page(self, path):
+        path = path.strip("/")
+        if not path:
+            return HOMEPAGE
+        if path.startswith("quote/"):
+            return search_page(self.base_url, path.split("/")[1], self.articles_per_search)
+        if path.startswith("news/"):
+            return article_page(path.split("/")[1].replace(".html", ""))
+        return None
+
+
+def _page_chrome(index):
+    """Scripts, navigation and ad slots that real pages carry around the content"""
+    script = "window.__data = {" + ",".join(f'"k{i}": "{"x" * 40}"' for i in range(400)) + "};"
+    nav = "".join(f'<li><a href="/nav/{i}">Navigation link {i}</a></li>' for i in range(150))
+    ads = "".join(f'<div class="ad-slot"><iframe src="/ads/{index}-{i}"></iframe><span>Sponsored</span></div>'
+                  for i in range(40))
+    return f"<script>{script}</script><nav><ul>{nav}</ul></nav>{ads}"
+
+
+def heavy_yahoo_search_page(base_url="https://finance.yahoo.com/", term="SOL", count=20):
+    """Yahoo-like search results page with realistic page weight around the recent news section"""
+    filler = "".join(_page_chrome(i) for i in range(6))
+    items = "".join(SEARCH_ITEM.format(base=base_url, term=term, index=i) for i in range(1, count + 1))
+    return (f"<html><head>{filler}</head><body>{filler}"
+            f'<section data-testid="recent-news"><ul>{items}</ul></section>{filler}</body></html>')
+
+
+def heavy_yahoo_article_page(title="Fixture story", paragraph_count=25):
+    """Yahoo-like article page with realistic page weight around the article body"""
+    filler = "".join(_page_chrome(i) for i in range(6))
+    body = article_page(title, paragraph_count)
+    return body.replace("<body>", f"<head>{filler}</head><body>{filler}").replace("</body>", f"{filler}</body>")
+
+
+def heavy_cryptopotato_article_page(title="Fixture post", paragraph_count=25):
+    """CryptoPotato-like article page with realistic page weight around the post body"""
+    filler = "".join(_page_chrome(i) for i in range(4))
+    paragraphs = "".join(f"<p>{title} paragraph {i}: on-chain activity and market flows.</p>"
+                         for i in range(paragraph_count))
+    return (f"<html><head>{filler}</head><body>{filler}<h1 class=\"post-title\">{title}</h1>"
+            f"<div class=\"post-details-content\">{paragraphs}</div>{filler}</body></html>")
@@ -0,0 +1,335 @@
+"""
+Offline replay of recorded runs: local HTTP servers and a urllib-backed WebDriver stand-in.
+
+A recording is the directory written by utils.Recorder during a live run (RECORD_DIR=...).
+ReplayServer serves its pages with every recorded origin mounted under /<host>/, so
+https://finance.yahoo.com/quote/IONQ/ is replayed at <server>/finance.yahoo.com/quote/IONQ/
+and links inside the pages are rewritten to match. StubOpenAIServer (benchmarks.stub_openai)
+and StubTelegramServer replay the recorded API responses.
+"""
+import json
+import threading
+import time
+import urllib.request
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from utils.extraction import EXTRACT_SCRIPT
+
+
+class LocalServer:
+    """Threaded HTTP server on a free local port; subclasses implement respond()"""
+
+    def __init__(self, latency=0.0):
+        """
+        Args:
+            latency (float): Seconds every request is held before it is answered
+        """
+        self.latency = latency
+        self.stats = {"requests": 0, "max_in_flight": 0}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.root_url = f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def requests_served(self):
+        return self.stats["requests"]
+
+    def respond(self, method, path, body):
+        """
+        Answer one request.
+
+        Returns:
+            tuple: (status, payload, headers); a str payload is sent as HTML, an iterator of str
+                as a server-sent event stream written chunk by chunk, anything else as JSON
+        """
+        raise NotImplementedError
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._dispatch(None)
+
+            def do_POST(self):
+                self._dispatch(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            def _dispatch(self, body):
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server._in_flight += 1
+                    server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server._in_flight)
+                try:
+                    time.sleep(server.latency)
+                    status, payload, headers = server.respond(self.command, self.path, body)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+                if isinstance(payload, Iterator):
+                    self._stream(status, payload, headers)
+                    return
+                if isinstance(payload, str):
+                    data, content_type = payload.encode("utf-8"), "text/html; charset=utf-8"
+                else:
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, status, chunks, headers):
+                # No Content-Length: the body ends when the connection closes
+                self.send_response(status)
+                self.send_header("Content-Type", "text/event-stream")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(chunk.encode("utf-8"))
+                    self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Recording:
+    """Read-only view of a directory written by utils.Recorder"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.pages = {}
+        self.kinds = {}
+        for entry in self._read("pages.jsonl"):
+            # The latest capture of a URL wins
+            self.pages[entry["url"]] = entry["file"]
+            self.kinds[entry["url"]] = entry["kind"]
+        self.responses = list(self._read("responses.jsonl"))
+
+    def _read(self, name):
+        path = self.path / name
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def origins(self):
+        """scheme://host of every recorded page"""
+        return sorted({"{0.scheme}://{0.netloc}".format(urlsplit(url)) for url in self.pages})
+
+    def page(self, url):
+        """Recorded HTML for a URL, tolerating a missing or extra trailing slash"""
+        for candidate in (url, url.rstrip("/"), url + "/"):
+            if candidate in self.pages:
+                return (self.path / "pages" / self.pages[candidate]).read_text(encoding="utf-8")
+        return None
+
+    def urls(self, *kinds, origin=None):
+        """Recorded page URLs of the given kinds, optionally limited to one origin"""
+        return [url for url, kind in self.kinds.items()
+                if kind in kinds and (origin is None or url.startswith(origin + "/"))]
+
+    def service_responses(self, service):
+        return [entry for entry in self.responses if entry["service"] == service]
+
+
+class ReplayServer(LocalServer):
+    """Serves a recording's pages, with each recorded origin mounted under /<host>/"""
+
+    def __init__(self, recording=None, latency=0.2):
+        """
+        Args:
+            recording (str or Recording, optional): Recording directory to replay
+            latency (float): Seconds each page takes, standing in for network time
+        """
+        super().__init__(latency)
+        self.recording = Recording(recording) if isinstance(recording, (str, Path)) else recording
+        self.base_url = self.root_url
+
+    def base_url_for(self, origin_url):
+        """Local URL standing in for a recorded site, e.g. for a scraper's base_url"""
+        parts = urlsplit(origin_url)
+        return f"{self.root_url}{parts.netloc}{parts.path or '/'}"
+
+    def page(self, path):
+        """HTML for a local path, or None for a 404"""
+        host, _, rest = path.lstrip("/").partition("/")
+        for origin in self.recording.origins():
+            if urlsplit(origin).netloc == host:
+                html = self.recording.page(f"{origin}/{rest}")
+                if html is not None:
+                    return self._rewrite(html)
+        return None
+
+    def _rewrite(self, html):
+        for origin in self.recording.origins():
+            html = html.replace(origin + "/", self.base_url_for(origin))
+        return html
+
+    def respond(self, method, path, body):
+        html = self.page(path)
+        if html is None:
+            return 404, "<html><body>Not recorded</body></html>", None
+        return 200, html, None
+
+
+class StubTelegramServer(LocalServer):
+    """
+    Bot API stand-in: answers sendMessage, editMessageText and friends, replaying recorded responses in order.
+
+    Like the real API it rejects texts over 4096 characters, and it can inject 429s
+    (with retry_after), 5xx errors or a full outage to exercise retries and the outbox.
+    """
+
+    def __init__(self, latency=0.05, recording=None, rate_limit_every=0, error_every=0, retry_after=1):
+        """
+        Args:
+            latency (float): Seconds each call takes
+            recording (str or Recording, optional): Recording whose Telegram responses are replayed
+            rate_limit_every (int): Answer every n-th call with 429 Too Many Requests; 0 never
+            error_every (int): Answer every n-th call with 502 Bad Gateway; 0 never
+            retry_after (int): retry_after seconds sent with each 429
+        """
+        super().__init__(latency)
+        recording = Recording(recording) if isinstance(recording, (str, Path)) else recording
+        self.recorded = [entry["response"] for entry in recording.service_responses("telegram")] if recording else []
+        self.api_url = self.root_url.rstrip("/")
+        self.rate_limit_every = rate_limit_every
+        self.error_every = error_every
+        self.retry_after = retry_after
+        # Set to True to answer every call with 502, e.g. to fill the outbox
+        self.down = False
+        self.calls = []
+        # Messages accepted, as (chat_id, text) in arrival order; message_id is the 1-based position
+        self.delivered = []
+        # Accepted editMessageText calls, as (chat_id, message_id, text)
+        self.edits = []
+
+    def respond(self, method, path, body):
+        api_method = path.rstrip("/").rsplit("/", 1)[-1]
+        text = (body or b"").decode("utf-8")
+        params = json.loads(text) if text.startswith("{") else dict(parse_qsl(text))
+        with self._lock:
+            self.calls.append({"method": api_method, "params": params, "at": time.perf_counter()})
+            call = len(self.calls)
+        if self.down or (self.error_every and call % self.error_every == 0):
+            return 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}, None
+        if self.rate_limit_every and call % self.rate_limit_every == 0:
+            return 429, {"ok": False, "error_code": 429,
+                         "description": f"Too Many Requests: retry after {self.retry_after}",
+                         "parameters": {"retry_after": self.retry_after}}, None
+        if len(params.get("text", "")) > 4096:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}, None
+        if api_method == "editMessageText":
+            with self._lock:
+                self.edits.append((params.get("chat_id"), int(params.get("message_id", 0)), params.get("text")))
+            return 200, {"ok": True, "result": {"message_id": int(params.get("message_id", 0)),
+                                                "chat": {"id": params.get("chat_id")}, "text": params.get("text")}}, None
+        with self._lock:
+            self.delivered.append((params.get("chat_id"), params.get("text")))
+            index = len(self.delivered)
+        if index <= len(self.recorded):
+            return 200, self.recorded[index - 1], None
+        return 200, {"ok": True, "result": {"message_id": index, "chat": {"id": params.get("chat_id")},
+                                            "text": params.get("text")}}, None
+
+
+class ReplayElement:
+    """Minimal WebElement: visible, and typing RETURN into the search box runs the search"""
+
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.element_id = element_id
+        self.text = ""
+        self._page = driver.page_loads
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        if self.driver.page_loads != self._page:
+            raise StaleElementReferenceException("The page this element belonged to was unloaded")
+        return True
+
+    def send_keys(self, value):
+        if value == Keys.RETURN and self.element_id == "ybar-sbq":
+            self.driver.get(f"{self.driver.base_url}quote/{self.text}/")
+        else:
+            self.text += value
+
+
+class ReplayDriver:
+    """WebDriver stand-in that loads pages with urllib so benchmarks run without Chrome"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.current_url = None
+        self.page_source = ""
+        self.page_loads = 0
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            self.page_source = response.read().decode("utf-8")
+        self.current_url = url
+        self.page_loads += 1
+
+    def execute_script(self, script, *args):
+        if script == EXTRACT_SCRIPT:
+            return self._run_extract_script(args[0])
+        return "complete"
+
+    def _run_extract_script(self, spec):
+        """Python stand-in for EXTRACT_SCRIPT over the loaded page"""
+        soup = BeautifulSoup(self.page_source, "html.parser")
+
+        def value(element, field):
+            return (element.get(field["attr"]) or "") if field["attr"] else element.get_text(strip=True)
+
+        def fields(node):
+            values = {}
+            for key, field in spec["fields"].items():
+                if field["many"]:
+                    values[key] = [v for v in (value(el, field) for el in node.select(field["selector"])) if v]
+                else:
+                    element = node.select_one(field["selector"])
+                    values[key] = value(element, field) if element is not None else None
+            return values
+
+        if spec["item"]:
+            return [fields(item) for item in soup.select(spec["item"])]
+        return fields(soup)
+
+    def find_element(self, by=By.ID, value=None):
+        soup = BeautifulSoup(self.page_source, "html.parser")
+        selector = f"#{value}" if by == By.ID else value
+        if soup.select_one(selector) is None:
+            raise NoSuchElementException(f"No element matches {selector}")
+        return ReplayElement(self, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        soup = BeautifulSoup(self.page_source, "html.parser")
+        selector = f"#{value}" if by == By.ID else value
+        return [ReplayElement(self, value) for _ in soup.select(selector)]
+
+    def quit(self):
+        pass
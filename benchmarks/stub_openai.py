@@ -0,0 +1,94 @@
+"""Local OpenAI-compatible chat completions server that injects latency and 429s, and streams on request"""
+import json
+import random
+import time
+from pathlib import Path
+from benchmarks.replay import LocalServer, Recording
+from utils.recorder import request_key
+
+
+class StubOpenAIServer(LocalServer):
+    """Serves /v1/chat/completions with a fixed latency and a share of 429 responses"""
+
+    def __init__(self, latency=0.2, rate_limit_ratio=0.0, retry_after=0.2, seed=1, recording=None,
+                 token_interval=0.0):
+        """
+        Args:
+            latency (float): Seconds each request takes (until the first token when streaming)
+            rate_limit_ratio (float): Fraction of requests answered with 429
+            retry_after (float): Retry-After header value sent with each 429
+            seed (int): Seed for the 429 draw so runs are repeatable
+            recording (str or Recording, optional): Recording whose OpenAI responses are replayed
+                for matching requests; other requests get fixture replies
+            token_interval (float): Seconds between streamed chunks of about one token each
+        """
+        super().__init__(latency)
+        self.token_interval = token_interval
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.stats.update({"rate_limited": 0, "replayed": 0})
+        self._random = random.Random(seed)
+        recording = Recording(recording) if isinstance(recording, (str, Path)) else recording
+        self.recorded = {entry["key"]: entry["response"]
+                         for entry in (recording.service_responses("openai") if recording else [])}
+        self.base_url = f"{self.root_url}v1"
+
+    def reply(self, request):
+        """Assistant message content for a chat completion request"""
+        recorded = self.recorded.get(request_key({key: request.get(key) for key in
+                                                  ("model", "messages", "max_tokens", "response_format")}))
+        if recorded is not None:
+            with self._lock:
+                self.stats["replayed"] += 1
+            return recorded["content"]
+        prompt = request["messages"][-1]["content"]
+        if prompt.startswith("Condense this article"):
+            return "Fixture digest: revenue rose while guidance was unchanged."
+        if request.get("response_format", {}).get("type") == "json_schema":
+            return json.dumps({"summary": "Fixture summary of the supplied digests.", "sentiment": "neutral",
+                               "confidence": 0.6, "citations": [{"article": 1, "title": "Fixture story"}]})
+        return "Fixture summary of the supplied digests [1]."
+
+    def respond(self, method, path, body):
+        request = json.loads(body)
+        with self._lock:
+            limited = self._random.random() < self.rate_limit_ratio
+            if limited:
+                self.stats["rate_limited"] += 1
+        if limited:
+            return 429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                   "code": "rate_limit_exceeded"}}, {"Retry-After": str(self.retry_after)}
+
+        content = self.reply(request)
+        prompt_tokens = sum(len(m["content"]) for m in request["messages"]) // 4
+        completion_tokens = len(content) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+            return 200, self.stream(request["model"], content, usage if include_usage else None), None
+        # Unstreamed replies arrive once every token has been generated
+        time.sleep(self.token_interval * -(-len(content) // 4))
+        return 200, {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        }, None
+
+    def stream(self, model, content, usage):
+        """Server-sent chat.completion.chunk events carrying content about one token (4 characters) at a time"""
+        def event(choices, **extra):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": choices, **extra}
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(content), 4):
+            time.sleep(self.token_interval)
+            yield event([{"index": 0, "delta": {"content": content[start:start + 4]}, "finish_reason": None}])
+        yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage is not None:
+            yield event([], usage=usage)
+        yield "data: [DONE]\n\n"
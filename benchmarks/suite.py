@@ -0,0 +1,225 @@
+"""
+Scraping and analysis benchmark suite, run offline against a recording or generated pages.
+
+Times YahooFinanceScraper._gather_links, fetch_article and _is_within_date_range,
+OpenAIAnalyzer.analyze_all_articles against the stub OpenAI server, and a full main() run
+with a stub driver, stub OpenAI and stub Telegram. Results are written as JSON so runs on
+different commits can be compared:
+
+    RECORD_DIR=recordings/today python main.py          # capture a live run once
+    python -m benchmarks.suite --recording recordings/today --output before.json
+    python -m benchmarks.suite --recording recordings/today --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import Recording, ReplayDriver, ReplayServer, StubTelegramServer
+from benchmarks.stub_openai import StubOpenAIServer
+from utils import AnalysisScheduler, OpenAIAnalyzer, YahooFinanceScraper
+
+YAHOO_ORIGIN = "https://finance.yahoo.com"
+DATE_SAMPLES = ["just now", "12m ago", "3h ago", "1d ago", "2d ago", "5 hours ago", "3 days ago",
+                "Oct 20, 2025", "yesterday", "Reuters • 4h ago"]
+
+
+def summarize(timings, calls=1):
+    """Timing statistics in milliseconds per call"""
+    per_call = sorted(seconds / calls * 1000 for seconds in timings)
+    return {
+        "runs": len(per_call),
+        "median_ms": round(statistics.median(per_call), 4),
+        "p95_ms": round(per_call[min(len(per_call) - 1, int(len(per_call) * 0.95))], 4),
+        "min_ms": round(per_call[0], 4),
+    }
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+class Pages:
+    """Search and article URLs to benchmark, from a recording or the generated fixture site"""
+
+    def __init__(self, args):
+        if args.recording:
+            recording = Recording(args.recording)
+            self.server = ReplayServer(recording, latency=args.latency)
+            # Yahoo Finance pages, or whichever site the recorded searches ran against
+            searches = recording.urls("search")
+            origin = YAHOO_ORIGIN if YAHOO_ORIGIN in recording.origins() or not searches else \
+                "{0.scheme}://{0.netloc}".format(urlsplit(searches[0]))
+            self.base_url = self.server.base_url_for(origin + "/")
+            self.search_urls = [url.replace(origin + "/", self.base_url) for url in recording.urls("search", origin=origin)]
+            self.article_urls = [url.replace(origin + "/", self.base_url)
+                                 for url in recording.urls("article", "http", origin=origin)]
+            self.source = f"recording:{args.recording}"
+        else:
+            self.server = FixtureServer(latency=args.latency, articles_per_search=args.articles)
+            self.base_url = self.server.base_url
+            terms = [f"TERM{i}" for i in range(args.terms)]
+            self.search_urls = [f"{self.base_url}quote/{term}/" for term in terms]
+            self.article_urls = [f"{self.base_url}news/{term}-{i}.html" for term in terms
+                                 for i in range(1, args.articles + 1)]
+            self.source = "synthetic"
+        self.recording = args.recording
+
+
+def bench_gather_links(pages, repeat):
+    scraper = YahooFinanceScraper(driver=ReplayDriver(pages.base_url), base_url=pages.base_url)
+    timings = []
+    for url in pages.search_urls:
+        scraper.driver.get(url)
+        timings += timed(lambda: scraper._gather_links(scraper.driver), repeat)
+    return summarize(timings)
+
+
+def bench_visit_and_get_article(pages, repeat):
+    scraper = YahooFinanceScraper(driver=ReplayDriver(pages.base_url), base_url=pages.base_url)
+    articles = []
+    timings = []
+    for url in pages.article_urls:
+        timings += timed(lambda: articles.append(scraper.fetch_article(url)), repeat)
+    return summarize(timings), [found[0] for found in articles[::repeat] if found]
+
+
+def bench_is_within_date_range(repeat, calls=10000):
+    scraper = YahooFinanceScraper(driver=object())
+    samples = (DATE_SAMPLES * (calls // len(DATE_SAMPLES) + 1))[:calls]
+    return summarize(timed(lambda: [scraper._is_within_date_range(date) for date in samples], repeat), calls)
+
+
+def bench_analyze_all_articles(pages, articles, repeat, latency):
+    articles = articles or [{"title": "Fixture story", "content": "Revenue rose 12% on strong demand. " * 60}]
+    with StubOpenAIServer(latency=latency, recording=pages.recording) as stub:
+        def run(cache_dir):
+            analyzer = OpenAIAnalyzer(api_key="stub", cache_dir=cache_dir, base_url=stub.base_url,
+                                      scheduler=AnalysisScheduler(base_delay=0.1, max_delay=1.0))
+            try:
+                analyzer.analyze_all_articles(articles, "BENCH")
+            finally:
+                analyzer.close()
+
+        # Cold: every digest and the analysis are new. Warm: the same articles again, served by the analysis cache.
+        cold = timed(lambda: run(tempfile.mkdtemp()), repeat)
+        warm_dir = tempfile.mkdtemp()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run(warm_dir)
+        warm = timed(lambda: run(warm_dir), repeat)
+    return summarize(cold), summarize(warm), stub.stats
+
+
+def bench_main(pages, repeat, latency):
+    import main as entry_point
+
+    timings = []
+    with StubOpenAIServer(latency=latency, recording=pages.recording) as stub, \
+            StubTelegramServer(recording=pages.recording) as telegram:
+        environment = {
+            "OPENAI_KEY": "stub", "OPENAI_BASE_URL": stub.base_url, "TELEGRAM_BOT_TOKEN": "stub",
+            "TELEGRAM_CHAT_ID": "1", "TELEGRAM_API_URL": telegram.api_url, "SOURCES": "yahoo_finance",
+        }
+        saved_environment = {name: os.environ.get(name) for name in environment}
+        saved_cwd = os.getcwd()
+        os.environ.update(environment)
+        try:
+            for _ in range(repeat):
+                # A fresh working directory keeps every cache cold
+                os.chdir(tempfile.mkdtemp())
+                timings += timed(lambda: entry_point.main(
+                    driver_factory=lambda: ReplayDriver(pages.base_url),
+                    base_urls={"yahoo_finance": pages.base_url},
+                ), 1)
+        finally:
+            os.chdir(saved_cwd)
+            for name, value in saved_environment.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    return summarize(timings), {"openai_requests": stub.stats["requests"], "telegram_calls": len(telegram.calls)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n{'case':<34} {'before ms':>10} {'after ms':>10} {'change':>8}", file=sys.stderr)
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0
+        print(f"{name:<34} {before['median_ms']:>10.3f} {result['median_ms']:>10.3f} {change:>+8.1%}",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help="Recording directory written with RECORD_DIR; generated pages otherwise")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Replay latency per page (s)")
+    parser.add_argument("--openai-latency", type=float, default=0.05, help="Stub OpenAI latency per call (s)")
+    parser.add_argument("--terms", type=int, default=3, help="Generated search terms without a recording")
+    parser.add_argument("--articles", type=int, default=4, help="Generated articles per term without a recording")
+    parser.add_argument("--skip-main", action="store_true", help="Skip the end-to-end main() run")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON report to print relative changes against")
+    args = parser.parse_args()
+
+    pages = Pages(args)
+    results = {}
+    with pages.server:
+        results["gather_links"] = bench_gather_links(pages, args.repeat)
+        results["visit_and_get_article"], articles = bench_visit_and_get_article(pages, args.repeat)
+        results["is_within_date_range"] = bench_is_within_date_range(args.repeat)
+        cold, warm, _ = bench_analyze_all_articles(pages, articles, args.repeat, args.openai_latency)
+        results["analyze_all_articles_cold"] = cold
+        results["analyze_all_articles_warm"] = warm
+        if not args.skip_main:
+            results["main_end_to_end"], counts = bench_main(pages, max(1, args.repeat // 2), args.openai_latency)
+            results["main_end_to_end"].update(counts)
+
+    report = {
+        "suite": "scraping",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": pages.source,
+        "pages": {"searches": len(pages.search_urls), "articles": len(pages.article_urls)},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,423 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import asyncio
+import contextlib
+import os
+import signal
+import sys
 from dotenv import load_dotenv
-from utils import OpenAIAnalyzer, YahooFinanceScraper, TelegramNotifier
+from utils import (
+    OpenAIAnalyzer, TelegramNotifier, AnalysisScheduler, Recorder, TelegramOutbox, ScrapeDaemon, load_watchlist,
+    metrics,
+)
 
-# Initialize scrapers
-# Change days_back to control how far back to search (1 = today only, 7 = last week, etc.)
-# crypto_potato_scraper = CryptoPotatoScraper(days_back=2)
+# Sources searched for every topic, by registered scraper name; opt into more with e.g.
+# SOURCES=yahoo_finance,cryptopotato
+DEFAULT_SOURCES = "yahoo_finance"
+# Topics and refresh intervals; override with WATCHLIST=path
+DEFAULT_WATCHLIST = "watchlist.json"
 
-def main():
+
+def plan_run(topics, openai_analyzer):
+    """
+    Split topics into those with a cached analysis and those that still need scraping.
+
+    Args:
+        topics (list): Topics to process this run
+        openai_analyzer (OpenAIAnalyzer): Analyzer whose cache is checked
+
+    Returns:
+        dict: 'cached' maps topic -> cached analysis, 'missing' lists topics to scrape
+    """
+    plan = {"cached": {}, "missing": []}
+    for topic in topics:
+        if openai_analyzer.is_analysis_cached(topic):
+            plan["cached"][topic] = openai_analyzer.load_from_cache(topic)
+            metrics.count("cache_lookups", cache="analysis", result="hit")
+        else:
+            plan["missing"].append(topic)
+            metrics.count("cache_lookups", cache="analysis", result="miss")
+    return plan
+
+
+def print_run_summary(topics, plan, sources):
+    """
+    Print page loads done this run versus searching every topic once per missing topic.
+
+    Args:
+        topics (list): All topics in the run
+        plan (dict): Plan returned by plan_run
+        sources (dict): Scrapers and the helpers they share, as returned by build_sources()
+    """
+    missing = len(plan["missing"])
+    scrapers = sources["scrapers"]
+
+    print("\n" + "="*60)
+    print("Run summary")
+    print(f"Topics: {len(topics)} total, {len(plan['cached'])} cached, {missing} scraped")
+    for source in scrapers:
+        searches = source.page_loads["searches"]
+        articles = source.page_loads["articles"]
+        # The old loop searched every topic for each missing one; topics not scraped
+        # this run are estimated at the num_articles cap
+        unscraped_articles = (len(topics) - missing) * source.num_articles
+        naive_searches = missing * len(topics)
+        naive_articles = missing * (articles + unscraped_articles)
+        print(f"{source.website_name}: {searches} searches (saved {naive_searches - searches}), "
+              f"{articles} article loads (saved up to {naive_articles - articles})")
+    if sources["driver_pool"] is not None:
+        browsers = sources["driver_pool"].stats
+        print(f"Browser sessions: {browsers['started']} started, {browsers['retired']} recycled "
+              f"({browsers['page_limit']} page limit, {browsers['memory_limit']} memory limit, "
+              f"{browsers['deadline']} deadline), peak RSS {browsers['peak_rss_bytes'] / 2**20:.0f} MB")
+    if sources["http_fetcher"] is not None:
+        served = sources["http_fetcher"].counts()
+        print(f"Articles served over HTTP: {served['http']}, by browser: {served['browser']}")
+    if sources["seen_urls"] is not None:
+        seen = sources["seen_urls"].stats
+        print(f"Seen-URL index: {seen['seen']} known links reached, {seen['marked']} marked, "
+              f"{seen['bloom_negatives']}/{seen['lookups']} lookups answered by the Bloom filter")
+    if sources["article_registry"] is not None:
+        shared = sources["article_registry"].stats
+        print(f"Article registry: {shared['fetches']} fetched, {shared['shared']} shared between topics, "
+              f"{shared['near_duplicates']} near duplicates, {shared['dropped']} copies dropped")
+    if sources["article_cache"] is not None:
+        print(f"Article cache: {sources['article_cache'].hits} hits, {sources['article_cache'].misses} misses")
+    moved = sources["extractor"].stats
+    print(f"Extraction transfer: {moved['script_bytes']} bytes from in-page scripts, "
+          f"{moved['page_source_bytes']} bytes of page source")
+    for source in scrapers:
+        search_strategy = getattr(source, "search_strategy", None)
+        for term, search in (search_strategy.summary().items() if search_strategy else ()):
+            print(f"Search '{term}': {search['seconds']:.2f}s via {search['method']} ({search['page_loads']} page loads)")
+    for name, stats in sources["readiness"].summary().items():
+        print(f"Waited {stats['seconds']:.1f}s on {name} ({stats['waits']} waits, {stats['timeouts']} timeouts)")
+    print("="*60)
+
+
+def print_analysis_summary(openai_analyzer):
+    """Print per-article digest cache hits and the prompt tokens they saved"""
+    stats = openai_analyzer.run_stats
+    print(f"Topic analyses reused for unchanged articles: {stats['analysis_hits']}")
+    print(f"Article digests: {stats['digest_hits']} cached, {stats['digest_misses']} new")
+    print(f"Prompt tokens: {stats['prompt_tokens']} sent, {stats['prompt_tokens_saved']} saved by digest cache")
+    calls = openai_analyzer.scheduler.stats
+    print(f"OpenAI requests: {calls['requests']} ({calls['retries']} retries, {calls['rate_limited']} rate limited, "
+          f"{calls['failures']} failed)")
+
+
+def print_metrics_summary():
+    """Print where the run spent its time, per instrumented stage"""
+    totals = metrics.summary()
+    for name, span in sorted(totals["spans"].items(), key=lambda item: -item[1]["seconds"]):
+        print(f"{name}: {span['seconds']:.2f}s over {span['count']} calls (max {span['max_seconds']:.2f}s, "
+              f"{span['errors']} errors)")
+    destinations = [path for path in (metrics.run_log, metrics.prometheus_path) if path]
+    print(f"Metrics for run {metrics.run_id} written to {', '.join(destinations)}")
+
+
+def build_sources(topics, driver_factory=None, base_urls=None, recorder=None):
+    """
+    Build the browser pool, HTTP fetcher, caches and scrapers shared by every topic.
+
+    Args:
+        topics (list): Topics the scrapers will be asked about
+        driver_factory (callable, optional): Creates WebDriver sessions; defaults to Chrome
+        base_urls (dict, optional): Maps source name -> base URL overriding the live site
+        recorder (Recorder, optional): Saves pages for offline replay
+
+    Returns:
+        dict: 'scrapers' plus the shared 'driver_pool', 'http_fetcher', 'article_cache',
+            'seen_urls', 'article_registry', 'readiness' and 'extractor'; release them with close_sources()
+    """
+    from utils import (
+        DriverPool, HttpFetcher, PageReadiness, ArticleCache, BrowserProfile,
+        SeenUrlIndex, ArticleRegistry, HtmlExtractor, create_scraper,
+    )
+
+    base_urls = base_urls or {}
+    # Headless Chrome sessions are started on demand, up to DRIVER_POOL_SIZE of them.
+    # BROWSER_PROFILE=full loads images, fonts and ad/analytics hosts again.
+    if driver_factory is None:
+        profile = BrowserProfile.full() if os.getenv('BROWSER_PROFILE') == 'full' else BrowserProfile()
+        driver_factory = profile.create_driver
+    # Each session is recycled after DRIVER_MAX_PAGES page visits or once Chrome's resident memory
+    # passes DRIVER_MAX_RSS_MB; one stuck past DRIVER_OPERATION_TIMEOUT seconds is killed and the
+    # page retried on a fresh session
+    driver_pool = DriverPool(size=int(os.getenv('DRIVER_POOL_SIZE', '2')), driver_factory=driver_factory,
+                             max_pages=int(os.getenv('DRIVER_MAX_PAGES', '100')),
+                             max_rss_mb=float(os.getenv('DRIVER_MAX_RSS_MB', '1024')),
+                             operation_timeout=float(os.getenv('DRIVER_OPERATION_TIMEOUT', '90')))
+    sources = {
+        "driver_pool": driver_pool,
+        # Article pages are fetched without a browser first unless FETCH_MODE=browser
+        "http_fetcher": HttpFetcher(recorder=recorder) if os.getenv('FETCH_MODE', 'http') == 'http' else None,
+        "article_cache": ArticleCache(),
+        # Articles processed by earlier runs are not gathered again unless INCREMENTAL=0
+        "seen_urls": SeenUrlIndex() if os.getenv('INCREMENTAL', '1') != '0' else None,
+        "article_registry": ArticleRegistry(),
+        "readiness": PageReadiness(),
+        "extractor": HtmlExtractor(),
+        "scrapers": [],
+    }
+    try:
+        # Every source shares the pool, caches and registry, so each article is fetched once per run.
+        # DAYS_BACK controls how far back to search (1 = today only, 7 = last week, etc.)
+        shared = dict(driver_pool=sources["driver_pool"], http_fetcher=sources["http_fetcher"],
+                      readiness=sources["readiness"], extractor=sources["extractor"],
+                      article_cache=sources["article_cache"], seen_urls=sources["seen_urls"],
+                      article_registry=sources["article_registry"], days_back=int(os.getenv('DAYS_BACK', '1')),
+                      list_of_search_words=topics, recorder=recorder)
+        for name in os.getenv('SOURCES', DEFAULT_SOURCES).split(','):
+            name = name.strip()
+            options = dict(shared, base_url=base_urls[name]) if name in base_urls else shared
+            sources["scrapers"].append(create_scraper(name, **options))
+    except Exception:
+        close_sources(sources)
+        raise
+    return sources
+
+
+def close_sources(sources):
+    """Quit the browser sessions and close the fetcher and caches built by build_sources()"""
+    sources["driver_pool"].close()
+    for name in ("http_fetcher", "article_cache", "seen_urls"):
+        if sources[name] is not None:
+            sources[name].close()
+
+
+def build_pipeline(sources, openai_analyzer, digest=None):
+    """
+    Pipeline over the shared sources; analysis of one topic overlaps scraping of the next.
+
+    With a LiveDigest, every result and streamed partial summary is shown as soon as it arrives.
+    """
+    from utils import ScrapePipeline
+
+    pool_size = sources["driver_pool"].size
+    return ScrapePipeline(sources["scrapers"], openai_analyzer, article_registry=sources["article_registry"],
+                          gather_concurrency=pool_size, fetch_concurrency=pool_size * 2,
+                          analyze_concurrency=openai_analyzer.scheduler.max_concurrency,
+                          on_result=digest.complete if digest is not None else None,
+                          on_progress=digest.progress if digest is not None else None)
+
+
+def build_clients(recorder=None):
+    """
+    OpenAI analyzer and Telegram notifier configured from the environment.
+
+    The OpenAI client itself is only created when a topic first needs analyzing.
+
+    Args:
+        recorder (Recorder, optional): Saves API responses for offline replay
+
+    Returns:
+        tuple: (OpenAIAnalyzer, TelegramNotifier)
+    """
+    scheduler = AnalysisScheduler(
+        max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', '4')),
+        requests_per_minute=int(os.getenv('OPENAI_RPM', '500')),
+        tokens_per_minute=int(os.getenv('OPENAI_TPM', '200000')),
+    )
+    # A topic analyzed in the last ANALYSIS_FRESH_HOURS is not scraped again; older ones are scraped
+    # and their analysis reused only when the articles found are the same. An analysis from the last
+    # ANALYSIS_CARRY_OVER_HOURS is updated with the new articles, or carried over when there are none
+    openai_analyzer = OpenAIAnalyzer(scheduler=scheduler, recorder=recorder,
+                                     fresh_hours=float(os.getenv('ANALYSIS_FRESH_HOURS', '2')),
+                                     carry_over_hours=float(os.getenv('ANALYSIS_CARRY_OVER_HOURS', '24')))
+    # Messages Telegram did not accept are kept in cache/telegram_outbox.jsonl and resent next run
+    telegram_notifier = TelegramNotifier(recorder=recorder, outbox=TelegramOutbox())
+    return openai_analyzer, telegram_notifier
+
+
+def scrape_missing(topics, plan, openai_analyzer, driver_factory=None, base_urls=None, recorder=None, digest=None):
+    """
+    Build the browser pool, caches and scrapers, then scrape and analyze every missing topic.
+
+    Only called when some topic has no cached analysis, so a fully cached run never
+    imports selenium or starts Chrome.
+
+    Args:
+        topics (list): All topics in the run
+        plan (dict): Plan returned by plan_run
+        openai_analyzer (OpenAIAnalyzer): Analyzer for the scraped articles
+        driver_factory (callable, optional): Creates WebDriver sessions; defaults to Chrome
+        base_urls (dict, optional): Maps source name -> base URL overriding the live site
+        recorder (Recorder, optional): Saves pages for offline replay
+        digest (LiveDigest, optional): Shows each topic in Telegram as soon as it is analyzed
+
+    Returns:
+        dict: Maps each missing topic to its analysis
+    """
+    sources = build_sources(topics, driver_factory, base_urls, recorder)
+    try:
+        # Scrape each missing topic exactly once
+        pipeline = build_pipeline(sources, openai_analyzer, digest)
+        with metrics.span("pipeline"):
+            results = asyncio.run(pipeline.run(plan['missing']))
+
+        print_run_summary(topics, plan, sources)
+        print_analysis_summary(openai_analyzer)
+        return results
+    finally:
+        close_sources(sources)
+
+
+def main(driver_factory=None, base_urls=None):
+    """
+    Scrape, analyze and notify for every topic.
+
+    Args:
+        driver_factory (callable, optional): Creates WebDriver sessions; defaults to Chrome with
+            the BROWSER_PROFILE profile. Replay benchmarks pass a stub driver here.
+        base_urls (dict, optional): Maps source name -> base URL overriding the live site
+
+    Returns:
+        list: The summaries sent to Telegram
+    """
     load_dotenv()
+    # RECORD_DIR=path saves every page and API response of this run for offline replay
+    recorder = Recorder(os.getenv('RECORD_DIR')) if os.getenv('RECORD_DIR') else None
+    # METRICS_LOG=run_metrics.log appends stage timings and counters as JSONL;
+    # METRICS_PROMETHEUS=path also writes a node_exporter textfile
+    metrics.configure(run_log=os.getenv('METRICS_LOG'), prometheus_path=os.getenv('METRICS_PROMETHEUS'))
+
+    # Initialize OpenAI analyzer and Telegram notifier after loading env vars; the OpenAI
+    # client and the whole scraping stack are only built once a topic misses the cache
+    openai_analyzer, telegram_notifier = build_clients(recorder)
+    topics = [topic["name"] for topic in load_watchlist(os.getenv('WATCHLIST', DEFAULT_WATCHLIST))["topics"]]
+    # TELEGRAM_DELIVERY=stream posts a placeholder digest at once and fills it in while topics are
+    # analyzed, instead of sending everything at the end of the run
+    streaming = os.getenv('TELEGRAM_DELIVERY', 'digest') == 'stream'
 
-    # Initialize OpenAI analyzer and Telegram notifier after loading env vars
-    openai_analyzer = OpenAIAnalyzer()
-    telegram_notifier = TelegramNotifier()
-
-    # Set up Chrome driver
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--incognito')
-    options.add_argument('--disable-popup-blocking')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
-    # Set timeouts to prevent hanging
-    driver.set_page_load_timeout(30)
-    driver.set_script_timeout(30)
-    topics = ["Solana", "BYDDY", "ASTS", "QUBT", "IONQ"]
-    yahoo_finance_scraper = YahooFinanceScraper(driver, list_of_search_words=topics)
-    
-    SCRAPERS = [
-        yahoo_finance_scraper
-    ]
-    
     summaries = []
-    
+
     try:
-        for scraper in SCRAPERS:
-            for topic in topics:
-                if openai_analyzer.is_analysis_cached(topic):
-                    analysis = openai_analyzer.load_from_cache(topic)
-                    summaries.append({"topic": topic, **analysis})
-                else:
-                    articles = scraper.scrape_website()
-                    articles_list = articles.get(topic, [])
-                    print(f"\nScraped {len(articles_list)} articles for topic: {topic}")
-                    analysis = openai_analyzer.analyze_all_articles(articles_list, topic)
-                    summaries.append({"topic": topic, **analysis})
+        plan = plan_run(topics, openai_analyzer)
+        print(f"Run plan: {len(plan['cached'])} cached topic(s), {len(plan['missing'])} to scrape")
+
+        digest = None
+        if streaming:
+            telegram_notifier.flush_outbox()
+            digest = telegram_notifier.start_digest(topics)
+            for topic, analysis in plan['cached'].items():
+                digest.complete(topic, analysis)
+
+        results = {}
+        if plan['missing']:
+            results = scrape_missing(topics, plan, openai_analyzer, driver_factory, base_urls, recorder, digest)
+
+        for topic in topics:
+            analysis = plan['cached'][topic] if topic in plan['cached'] else results.get(
+                topic, {"summary": "Error processing topic", "sentiment": "unknown"})
+            summaries.append({"topic": topic, **analysis})
 
         # Send all summaries to Telegram
         if summaries:
             print("\n" + "="*60)
-            print("Sending summaries to Telegram...")
-            telegram_notifier.send_multiple_summaries(summaries)
+            if digest is not None:
+                print("Finishing the live Telegram digest...")
+                # Topics that failed never reached the digest; already shown ones are left as they are
+                for summary in summaries:
+                    digest.complete(summary["topic"], summary)
+                digest.finish()
+            else:
+                print("Sending summaries to Telegram...")
+                telegram_notifier.flush_outbox()
+                telegram_notifier.send_multiple_summaries(summaries)
+            sent = telegram_notifier.stats
+            print(f"Telegram: {sent['sent']} messages sent, {sent['edited']} edited, {sent['retries']} retries "
+                  f"({sent['rate_limited']} rate limited), {sent['queued']} queued for the next run")
             print("="*60)
+        if recorder is not None:
+            print(f"Recorded {recorder.counts['pages']} pages and {recorder.counts['responses']} API responses "
+                  f"to {recorder.path}")
+        return summaries
 
     finally:
-        driver.quit()
+        if metrics.enabled:
+            metrics.flush()
+            print_metrics_summary()
+        telegram_notifier.close()
+        openai_analyzer.close()
+
+
+def run_daemon(driver_factory=None, base_urls=None, max_cycles=None):
+    """
+    Keep the browser pool and API clients warm and refresh each watchlist topic on its own interval.
+
+    Topics, intervals, jitter and the concurrency cap come from the WATCHLIST file. A topic's
+    summary is only sent when it differs from the last one sent. Every DAEMON_MAINTENANCE_MINUTES,
+    between cycles, idle browser sessions are health checked and those older than
+    DRIVER_MAX_AGE_MINUTES recycled, the outbox is retried and metrics are flushed.
+    Stops cleanly on SIGINT/SIGTERM.
+
+    Args:
+        driver_factory (callable, optional): Creates WebDriver sessions; defaults to Chrome
+        base_urls (dict, optional): Maps source name -> base URL overriding the live site
+        max_cycles (int, optional): Return after this many topic cycles, for benchmarks
+
+    Returns:
+        dict: The daemon stats
+    """
+    load_dotenv()
+    metrics.configure(run_log=os.getenv('METRICS_LOG'), prometheus_path=os.getenv('METRICS_PROMETHEUS'))
+    watchlist = load_watchlist(os.getenv('WATCHLIST', DEFAULT_WATCHLIST))
+    topics = [topic["name"] for topic in watchlist["topics"]]
+    openai_analyzer, telegram_notifier = build_clients()
+    sources = build_sources(topics, driver_factory, base_urls)
+    driver_max_age = float(os.getenv('DRIVER_MAX_AGE_MINUTES', '120')) * 60
+    # topic -> (summary, sentiment) last delivered
+    last_sent = {}
+
+    async def run_topic(topic):
+        with metrics.span("cycle", topic=topic):
+            analysis = (await build_pipeline(sources, openai_analyzer).run([topic])).get(topic)
+        if analysis is None:
+            return
+        delivered = (analysis.get("summary"), analysis.get("sentiment"))
+        # A carried-over analysis was already sent when it was made
+        if "carried_over_from" in analysis or last_sent.get(topic) == delivered:
+            print(f"No change for {topic}, nothing sent")
+            return
+        if await asyncio.to_thread(telegram_notifier.send_multiple_summaries, [{"topic": topic, **analysis}]):
+            last_sent[topic] = delivered
+
+    def maintenance():
+        health = sources["driver_pool"].health_check(max_age=driver_max_age)
+        sources["article_registry"].reset()
+        telegram_notifier.flush_outbox()
+        if metrics.enabled:
+            metrics.flush()
+        print(f"Maintenance: {health['checked']} idle browser session(s) checked, {health['retired']} recycled")
+
+    daemon = ScrapeDaemon(watchlist["topics"], run_topic, max_concurrent=watchlist["max_concurrent_topics"],
+                          maintenance=maintenance,
+                          maintenance_interval=float(os.getenv('DAEMON_MAINTENANCE_MINUTES', '10')) * 60)
+
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # Signal handlers are only available on the main thread of Unix event loops
+            with contextlib.suppress(NotImplementedError, RuntimeError):
+                loop.add_signal_handler(sig, stop.set)
+        return await daemon.run(stop, max_cycles=max_cycles)
+
+    print(f"Daemon watching {len(topics)} topic(s), at most {daemon.max_concurrent} at once")
+    try:
+        return asyncio.run(serve())
+    finally:
+        print(f"Daemon ran {daemon.stats['cycles']} cycle(s), {daemon.stats['failures']} failed, "
+              f"{daemon.stats['maintenance']} maintenance run(s)")
+        if metrics.enabled:
+            metrics.flush()
+        close_sources(sources)
+        telegram_notifier.close()
+        openai_analyzer.close()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python main.py --daemon keeps running and refreshes every topic on its own interval
+    if "--daemon" in sys.argv[1:]:
+        run_daemon()
+    else:
+        main()
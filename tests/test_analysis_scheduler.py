@@ -0,0 +1,111 @@
+"""AnalysisScheduler against the local stub OpenAI server: concurrency cap, rate budgets and 429 backoff"""
+import asyncio
+import time
+import pytest
+from openai import AsyncOpenAI, RateLimitError
+from benchmarks.stub_openai import StubOpenAIServer
+from utils import AnalysisScheduler
+
+
+def complete_all(stub, scheduler, calls, estimated_tokens=100):
+    """Run `calls` chat completions through the scheduler; returns their contents"""
+    async def run():
+        client = AsyncOpenAI(api_key="stub", base_url=stub.base_url, max_retries=0)
+        try:
+            async def request():
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini", messages=[{"role": "user", "content": "Summarize"}], max_tokens=50)
+                return response.choices[0].message.content
+
+            return await asyncio.gather(*(scheduler.run(request, estimated_tokens) for _ in range(calls)))
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_requests_in_flight_stay_under_the_concurrency_cap():
+    with StubOpenAIServer(latency=0.1) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=3)
+        replies = complete_all(stub, scheduler, 12)
+
+    assert len(replies) == 12
+    assert stub.stats["requests"] == 12
+    assert stub.stats["max_in_flight"] == 3
+    assert scheduler.stats["requests"] == 12
+
+
+def test_request_budget_holds_calls_until_the_window_moves_on():
+    with StubOpenAIServer(latency=0.0) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=8, requests_per_minute=2, window=0.5)
+        start = time.perf_counter()
+        complete_all(stub, scheduler, 5)
+        elapsed = time.perf_counter() - start
+
+    # Two requests per window: the 3rd and 4th wait one window, the 5th two
+    assert stub.stats["requests"] == 5
+    assert elapsed >= 1.0
+
+
+def test_token_budget_holds_calls_until_the_window_moves_on():
+    with StubOpenAIServer(latency=0.0) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=8, tokens_per_minute=250, window=0.5)
+        start = time.perf_counter()
+        complete_all(stub, scheduler, 3, estimated_tokens=100)
+        first_window = time.perf_counter() - start
+
+    # 100 + 100 fit in 250 tokens, the third call has to wait for the window
+    assert stub.stats["requests"] == 3
+    assert first_window >= 0.5
+
+
+def test_rate_limited_calls_are_retried_until_they_succeed():
+    with StubOpenAIServer(latency=0.0, rate_limit_ratio=0.4, retry_after=0.05) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=4, max_retries=10, base_delay=0.01, max_delay=0.05)
+        replies = complete_all(stub, scheduler, 10)
+
+    assert all(reply.startswith("Fixture") for reply in replies)
+    assert stub.stats["rate_limited"] > 0
+    assert scheduler.stats["rate_limited"] == stub.stats["rate_limited"]
+    assert scheduler.stats["retries"] == stub.stats["rate_limited"]
+    assert stub.stats["requests"] == 10 + stub.stats["rate_limited"]
+    assert scheduler.stats["failures"] == 0
+
+
+def test_retry_after_is_waited_out_before_giving_up():
+    with StubOpenAIServer(latency=0.0, rate_limit_ratio=1.0, retry_after=0.3) as stub:
+        scheduler = AnalysisScheduler(max_retries=2, base_delay=0.01, max_delay=0.01)
+        start = time.perf_counter()
+        with pytest.raises(RateLimitError):
+            complete_all(stub, scheduler, 1)
+        elapsed = time.perf_counter() - start
+
+    # Backoff is at least Retry-After even though the jittered delay is capped at 10 ms
+    assert stub.stats["requests"] == 3
+    assert elapsed >= 2 * 0.3
+    assert scheduler.stats["failures"] == 1
+
+
+def test_retry_after_pauses_the_other_callers_too():
+    with StubOpenAIServer(latency=0.0, rate_limit_ratio=1.0, retry_after=0.5) as stub:
+        scheduler = AnalysisScheduler(max_concurrency=1, max_retries=0)
+
+        async def run():
+            client = AsyncOpenAI(api_key="stub", base_url=stub.base_url, max_retries=0)
+
+            async def request():
+                return await client.chat.completions.create(
+                    model="gpt-4o-mini", messages=[{"role": "user", "content": "Summarize"}], max_tokens=50)
+
+            with pytest.raises(RateLimitError):
+                await scheduler.run(request, 100)
+            stub.rate_limit_ratio = 0.0
+            start = time.perf_counter()
+            await scheduler.run(request, 100)
+            await client.close()
+            return time.perf_counter() - start
+
+        waited = asyncio.run(run())
+
+    # The failed call's Retry-After holds back the next caller as well
+    assert waited >= 0.4
@@ -0,0 +1,93 @@
+"""SQLite-backed caches: TTL and LRU eviction, the seen-URL migration and removal of the old JSON cache"""
+import sqlite3
+import time
+from utils.analysis_cache import AnalysisCache, remove_legacy_cache_files
+from utils.article_cache import ArticleCache
+from utils.digest_cache import DigestCache
+from utils.seen_urls import SeenUrlIndex
+
+
+def article(i):
+    return {"title": f"Title {i}", "content": f"Body {i}"}
+
+
+def test_article_cache_evicts_least_recently_used(tmp_path):
+    cache = ArticleCache(tmp_path / "articles.sqlite3", max_entries=2)
+    cache.put("https://example.com/a", article(1))
+    cache.put("https://example.com/b", article(2))
+    time.sleep(0.01)
+    assert cache.get("https://example.com/a/?utm_source=x") is not None
+    cache.put("https://example.com/c", article(3))
+
+    assert len(cache) == 2
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a")["title"] == "Title 1"
+    cache.close()
+
+
+def test_expired_articles_are_missing_and_evicted(tmp_path):
+    cache = ArticleCache(tmp_path / "articles.sqlite3", ttl_hours=-1)
+    cache.put("https://example.com/a", article(1))
+
+    assert cache.get("https://example.com/a") is None
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_digest_cache_keeps_max_entries(tmp_path):
+    cache = DigestCache(tmp_path / "digests.sqlite3", max_entries=3)
+    for i in range(5):
+        cache.put(f"key{i}", f"digest {i}", 10)
+
+    assert len(cache) == 3
+    assert cache.get("key0") is None
+    assert cache.get("key4") == {"digest": "digest 4", "prompt_tokens": 10}
+    cache.close()
+
+
+def test_analysis_cache_evicts_at_most_a_batch_per_write(tmp_path):
+    cache = AnalysisCache(tmp_path / "analyses.sqlite3", max_entries=100, evict_batch=2)
+    for i in range(10):
+        cache.put(f"key{i}", "BTC", {"summary": str(i)})
+    cache.max_entries = 5
+    cache.put("key10", "BTC", {"summary": "10"})
+
+    assert len(cache) == 9
+    assert cache.get("key0") is None
+    assert cache.latest("BTC")["analysis"] == {"summary": "10"}
+    cache.close()
+
+
+def test_seen_url_index_replaces_a_table_without_topics(tmp_path):
+    path = tmp_path / "seen_urls.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE seen_urls (url TEXT PRIMARY KEY, source TEXT NOT NULL, seen_at REAL NOT NULL)")
+    conn.execute("INSERT INTO seen_urls VALUES ('https://example.com/a', 'yahoo', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    index = SeenUrlIndex(path)
+    assert len(index) == 0
+    index.mark("https://example.com/a", "yahoo", "BTC")
+    assert index.is_seen("https://example.com/a", "yahoo", "BTC")
+    assert not index.is_seen("https://example.com/a", "yahoo", "ETH")
+    index.close()
+
+
+def test_seen_url_index_forgets_entries_past_retention(tmp_path):
+    path = tmp_path / "seen_urls.sqlite3"
+    index = SeenUrlIndex(path)
+    index.mark("https://example.com/a", "yahoo", "BTC")
+    index.close()
+
+    assert len(SeenUrlIndex(path, retention_days=-1)) == 0
+
+
+def test_only_old_per_day_json_files_are_removed(tmp_path):
+    for name in ("BTC_2025-10-21.json", "cryptopotato.com_tag_solana__2025-10-21.json", "watchlist.json"):
+        (tmp_path / name).write_text("{}")
+    (tmp_path / "analyses.sqlite3").write_text("")
+
+    assert remove_legacy_cache_files(tmp_path) == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["analyses.sqlite3", "watchlist.json"]
+    assert remove_legacy_cache_files(tmp_path) == 0
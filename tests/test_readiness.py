@@ -0,0 +1,58 @@
+"""Adaptive page wait timeouts: learning from fast pages and widening again after timeouts"""
+import time
+import pytest
+from selenium.common.exceptions import TimeoutException
+from utils import AdaptiveTimeout, PageReadiness
+
+
+def ready_after(seconds):
+    """Expected condition that turns true `seconds` after it is first checked"""
+    ready_at = []
+
+    def condition(driver):
+        if not ready_at:
+            ready_at.append(time.perf_counter() + seconds)
+        return time.perf_counter() >= ready_at[0]
+    return condition
+
+
+def test_timeout_shrinks_to_the_minimum_on_fast_pages():
+    timeout = AdaptiveTimeout(default=10, minimum=2, maximum=20)
+    for _ in range(20):
+        timeout.observe(0.1)
+
+    assert timeout.current() == 2
+
+
+def test_each_timeout_doubles_the_timeout_up_to_the_maximum():
+    timeout = AdaptiveTimeout(default=10, minimum=2, maximum=20, multiplier=2)
+    for _ in range(20):
+        timeout.observe(0.1)
+
+    seen = []
+    for _ in range(5):
+        timeout.observe_timeout(timeout.current())
+        seen.append(timeout.current())
+
+    assert seen == pytest.approx([4, 8, 16, 20, 20])
+
+
+def test_wait_recovers_after_timing_out_on_a_slower_page():
+    readiness = PageReadiness(poll_frequency=0.01, default=1, minimum=0.05, maximum=1, multiplier=2)
+    for _ in range(20):
+        readiness.wait(None, lambda driver: True, "article_body")
+    assert readiness.timeout_for("article_body") == 0.05
+
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            readiness.wait(None, ready_after(0.3), "article_body")
+            break
+        except TimeoutException:
+            assert attempts < 5
+
+    # 0.05 -> 0.1 -> 0.2 -> 0.4 s, and the fourth wait succeeds
+    assert attempts == 4
+    assert readiness.summary()["article_body"]["timeouts"] == 3
+    assert readiness.timeout_for("article_body") >= 0.4
@@ -0,0 +1,65 @@
+"""Article fetching: HTTP first and the browser only as a fallback, against the local fixture server"""
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.fixtures import FixtureServer
+from benchmarks.replay import ReplayDriver
+from utils import ArticleCache, ArticleRegistry, DriverPool, HttpFetcher, YahooFinanceScraper
+
+
+def scraper_for(server, pool, **options):
+    return YahooFinanceScraper(driver_pool=pool, base_url=server.base_url, in_browser_extraction=False, **options)
+
+
+def article_urls(server, count):
+    return [f"{server.base_url}news/TERM-{i}.html" for i in range(count)]
+
+
+def fetch_all(scraper, urls, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(scraper.fetch_article, urls))
+
+
+def test_http_fetches_are_not_held_to_the_pool_size(tmp_path):
+    with FixtureServer(latency=0.2) as server:
+        pool = DriverPool(size=2, driver_factory=lambda: ReplayDriver(server.base_url))
+        fetcher = HttpFetcher(pool_size=8)
+        results = fetch_all(scraper_for(server, pool, http_fetcher=fetcher), article_urls(server, 8), 8)
+        pool.close()
+        fetcher.close()
+
+    assert all(len(found) == 1 and found[0]["content"] != "No content" for found in results)
+    assert server.stats["max_in_flight"] > 2
+    assert pool.stats["started"] == 0
+    assert fetcher.counts() == {"http": 8}
+
+
+def test_browser_fallback_borrows_a_driver(tmp_path):
+    with FixtureServer(latency=0.0) as server:
+        pool = DriverPool(size=2, driver_factory=lambda: ReplayDriver(server.base_url))
+        results = fetch_all(scraper_for(server, pool), article_urls(server, 4), 4)
+        pool.close()
+
+    assert all(len(found) == 1 for found in results)
+    assert 1 <= pool.stats["started"] <= 2
+
+
+def test_cached_articles_start_no_session(tmp_path):
+    with FixtureServer(latency=0.0) as server:
+        urls = article_urls(server, 4)
+        cache = ArticleCache(tmp_path / "articles.sqlite3")
+        first_pool = DriverPool(size=2, driver_factory=lambda: ReplayDriver(server.base_url))
+        fetch_all(scraper_for(server, first_pool, article_cache=cache), urls, 4)
+        first_pool.close()
+
+        pool = DriverPool(size=2, driver_factory=lambda: ReplayDriver(server.base_url))
+        registry = ArticleRegistry()
+        scraper = scraper_for(server, pool, article_cache=cache, article_registry=registry)
+        requests_before = server.stats["requests"]
+        results = fetch_all(scraper, urls, 4)
+        pool.close()
+        cache.close()
+
+    assert all(len(found) == 1 for found in results)
+    assert pool.stats["started"] == 0
+    assert scraper.page_loads["articles"] == 0
+    assert server.stats["requests"] == requests_before
+    assert registry.stats["fetches"] == 4
@@ -0,0 +1,188 @@
+"""Telegram splitting, packing, pacing, 429 handling and outbox replay against the stub Bot API"""
+import time
+import pytest
+from benchmarks.replay import StubTelegramServer
+from utils import TelegramNotifier, TelegramOutbox
+from utils.telegram_delivery import MESSAGE_LIMIT, SendRateLimiter, _entity_states, pack_messages, split_message
+
+
+def balanced(message):
+    """True if no Markdown entity is left open at the end of the message"""
+    return _entity_states(message)[-1] is None
+
+
+def notifier_for(stub, tmp_path, chat_id="1", per_chat_interval=0.0, **options):
+    return TelegramNotifier(bot_token="stub", chat_id=chat_id, api_url=stub.api_url,
+                            outbox=TelegramOutbox(tmp_path / "outbox.jsonl"),
+                            rate_limiter=SendRateLimiter(messages_per_second=1000, per_chat_interval=per_chat_interval),
+                            base_delay=0.01, **options)
+
+
+def test_split_breaks_between_entities_at_paragraphs():
+    paragraphs = [f"*Topic {i}* has _{'moving ' * 30}parts_ and `code {i}`" for i in range(60)]
+    text = "\n\n".join(paragraphs)
+
+    messages = split_message(text)
+
+    assert len(messages) > 1
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert all(balanced(message) for message in messages)
+    # Only whitespace is lost at the cuts, and every paragraph survives whole
+    assert "".join(messages).replace("\n", "") == text.replace("\n", "")
+    assert all(any(paragraph in message for message in messages) for paragraph in paragraphs)
+
+
+def test_split_carries_an_entity_with_no_boundary_across_messages():
+    text = "*" + "x" * (MESSAGE_LIMIT * 2) + "*"
+
+    messages = split_message(text)
+
+    assert len(messages) == 3
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert all(message.startswith("*") and message.endswith("*") for message in messages)
+    assert all(balanced(message) for message in messages)
+
+
+def test_split_does_not_break_inside_a_code_block_with_spaces():
+    code = "```" + " ".join(["word"] * 600) + "```"
+    # No line breaks anywhere, so the only candidate cuts are spaces, most of them inside the block
+    text = "lead " * 400 + code + " tail" * 400
+
+    messages = split_message(text)
+
+    assert len(messages) > 1
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert all(balanced(message) for message in messages)
+    assert sum(code in message for message in messages) == 1
+
+
+def test_pack_keeps_blocks_whole_and_in_order():
+    blocks = [f"*Block {i}*\n" + "z" * 1500 for i in range(7)]
+
+    messages = pack_messages(blocks)
+
+    assert len(messages) == 4
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
+    assert "\n".join(messages) == "\n".join(blocks)
+
+
+def test_long_digest_reaches_the_stub_in_chunks_within_the_limit(tmp_path):
+    summaries = [{"topic": f"TERM{i}", "sentiment": "bullish", "summary": f"*Key point {i}:* " + "gains " * 300}
+                 for i in range(10)]
+    with StubTelegramServer(latency=0.0) as stub:
+        notifier = notifier_for(stub, tmp_path)
+        assert notifier.send_multiple_summaries(summaries)
+        notifier.close()
+
+    texts = [text for _, text in stub.delivered]
+    assert len(texts) > 1
+    assert all(len(text) <= MESSAGE_LIMIT for text in texts)
+    assert all(balanced(text) for text in texts)
+    # Topics arrive in order and none is split, since each fits in one message
+    joined = "\n".join(texts)
+    assert [joined.index(f"*TERM{i}*") for i in range(10)] == sorted(joined.index(f"*TERM{i}*") for i in range(10))
+    assert all(sum(f"*TERM{i}*" in text for text in texts) == 1 for i in range(10))
+
+
+def test_sends_to_one_chat_are_paced(tmp_path):
+    with StubTelegramServer(latency=0.0) as stub:
+        notifier = notifier_for(stub, tmp_path, chat_id="1,2", per_chat_interval=0.3)
+        assert notifier.send_messages(["one", "two", "three"])
+        notifier.close()
+
+    for chat_id in ("1", "2"):
+        times = [call["at"] for call in stub.calls if call["params"]["chat_id"] == chat_id]
+        assert len(times) == 3
+        # Arrival times jitter by a few milliseconds around the 0.3 s slots
+        assert all(later - earlier >= 0.25 for earlier, later in zip(times, times[1:]))
+    # Chats are paced independently, so both finish in about two intervals rather than five
+    assert stub.calls[-1]["at"] - stub.calls[0]["at"] < 1.0
+
+
+def test_rate_limited_send_waits_for_retry_after(tmp_path):
+    with StubTelegramServer(latency=0.0, rate_limit_every=2, retry_after=1) as stub:
+        notifier = notifier_for(stub, tmp_path)
+        assert notifier.send_messages(["first", "second"])
+        notifier.close()
+
+    assert [call["params"]["text"] for call in stub.calls] == ["first", "second", "second"]
+    assert [text for _, text in stub.delivered] == ["first", "second"]
+    assert stub.calls[2]["at"] - stub.calls[1]["at"] >= 0.95
+    assert notifier.stats["rate_limited"] == 1
+    assert notifier.stats["retries"] == 1
+
+
+def test_failed_sends_are_replayed_in_order_from_the_outbox(tmp_path):
+    with StubTelegramServer(latency=0.0) as stub:
+        stub.down = True
+        notifier = notifier_for(stub, tmp_path, max_retries=1)
+        assert not notifier.send_messages(["first", "second", "third"])
+        notifier.close()
+
+        outbox = TelegramOutbox(tmp_path / "outbox.jsonl")
+        assert [entry["text"] for entry in outbox.pending()] == ["first", "second", "third"]
+        assert stub.delivered == []
+
+        stub.down = False
+        next_run = notifier_for(stub, tmp_path)
+        assert next_run.flush_outbox() == 3
+        next_run.close()
+
+    assert [text for _, text in stub.delivered] == ["first", "second", "third"]
+    assert len(outbox) == 0
+    assert next_run.stats["replayed"] == 3
+
+
+@pytest.mark.parametrize("failing_call", [2, 3])
+def test_messages_after_a_failure_wait_in_the_outbox(tmp_path, failing_call):
+    with StubTelegramServer(latency=0.0, error_every=failing_call) as stub:
+        notifier = notifier_for(stub, tmp_path, max_retries=0)
+        assert not notifier.send_messages(["first", "second", "third"])
+        notifier.close()
+
+    delivered = [text for _, text in stub.delivered]
+    queued = [entry["text"] for entry in TelegramOutbox(tmp_path / "outbox.jsonl").pending()]
+    # Nothing is delivered after the failed message, so replaying the outbox keeps the order
+    assert delivered + queued == ["first", "second", "third"]
+    assert len(delivered) == failing_call - 1
+
+
+def shown_texts(stub):
+    """Text each delivered message shows after its edits"""
+    texts = [text for _, text in stub.delivered]
+    for _, message_id, text in stub.edits:
+        texts[int(message_id) - 1] = text
+    return texts
+
+
+def test_live_digest_collapses_updates_and_ends_as_the_digest(tmp_path):
+    with StubTelegramServer(latency=0.0) as stub:
+        notifier = notifier_for(stub, tmp_path, per_chat_interval=0.2)
+        digest = notifier.start_digest(["BTC", "ETH"])
+        for i in range(50):
+            digest.progress("BTC", "Rising on *ETF" + " inflows" * i)
+        digest.complete("BTC", {"summary": "Rising on ETF inflows", "sentiment": "bullish"})
+        digest.complete("ETH", {"summary": "Flat", "sentiment": "neutral"})
+        assert digest.finish()
+        notifier.close()
+
+    # Each call carries the newest state, so the burst of progress costs a handful of calls
+    assert len(stub.calls) < 10
+    [text] = shown_texts(stub)
+    assert "*BTC* 📈\nSentiment: BULLISH\nRising on ETF inflows" in text
+    assert "*ETH* ➡️\nSentiment: NEUTRAL\nFlat" in text
+    assert "_Generated at " in text and "analyzing" not in text
+
+
+def test_live_digest_escapes_partial_output(tmp_path):
+    with StubTelegramServer(latency=0.0) as stub:
+        notifier = notifier_for(stub, tmp_path, per_chat_interval=0.3)
+        digest = notifier.start_digest(["BTC"])
+        digest.progress("BTC", "Rising on *ETF_flows")
+        time.sleep(0.5)
+        digest.finish()
+        notifier.close()
+
+    partials = [call["params"]["text"] for call in stub.calls if "ETF" in call["params"].get("text", "")]
+    assert partials and all("\\*ETF\\_flows" in text and balanced(text) for text in partials)
+    assert "✗ *BTC*: no result" in shown_texts(stub)[0]
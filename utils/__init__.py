@@ -1,6 +1,54 @@
-from .yahoo_finance_scraper import YahooFinanceScraper
-from .base_scraper import BaseScraper
-from .openai_analyzer import OpenAIAnalyzer
-from .telegram_notifier import TelegramNotifier
+import importlib
+# Eager: the instance must win over the utils.metrics submodule of the same name
+from .metrics import Metrics, metrics
 
-__all__ = ['YahooFinanceScraper', 'BaseScraper', 'OpenAIAnalyzer', 'TelegramNotifier']
+# Public name -> submodule. Submodules are imported on first access, so importing utils
+# does not load selenium, openai or bs4 until a run actually needs them.
+_EXPORTS = {
+    'YahooFinanceScraper': '.yahoo_finance_scraper',
+    'BaseScraper': '.base_scraper', 'SCRAPER_REGISTRY': '.base_scraper',
+    'register_scraper': '.base_scraper', 'create_scraper': '.base_scraper',
+    'CryptoPotatoScraper': '.crypto_potato_scraper',
+    'OpenAIAnalyzer': '.openai_analyzer',
+    'TelegramNotifier': '.telegram_notifier', 'LiveDigest': '.telegram_notifier',
+    'TelegramOutbox': '.telegram_delivery', 'SendRateLimiter': '.telegram_delivery',
+    'split_message': '.telegram_delivery', 'pack_messages': '.telegram_delivery',
+    'BrowserProfile': '.browser_profile', 'cached_chromedriver_path': '.browser_profile',
+    'DriverPool': '.driver_pool', 'create_chrome_driver': '.driver_pool',
+    'HttpFetcher': '.http_fetcher',
+    'ScrapePipeline': '.pipeline',
+    'AnalysisScheduler': '.analysis_scheduler', 'RateLimiter': '.analysis_scheduler',
+    'ArticleCache': '.article_cache', 'normalize_url': '.article_cache', 'content_hash': '.article_cache',
+    'HtmlExtractor': '.extraction', 'ExtractionSpec': '.extraction', 'Field': '.extraction',
+    'PromptBuilder': '.prompt_builder', 'TokenCounter': '.prompt_builder',
+    'ArticleRegistry': '.article_registry', 'simhash': '.article_registry',
+    'SeenUrlIndex': '.seen_urls', 'BloomFilter': '.seen_urls',
+    'SearchStrategy': '.search_strategy',
+    'Recorder': '.recorder',
+    'ScrapeDaemon': '.daemon', 'load_watchlist': '.daemon',
+    'PageReadiness': '.readiness', 'AdaptiveTimeout': '.readiness',
+    'element_count_at_least': '.readiness', 'network_idle': '.readiness',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = ['YahooFinanceScraper', 'BaseScraper', 'OpenAIAnalyzer', 'TelegramNotifier', 'DriverPool', 'create_chrome_driver', 'HttpFetcher', 'ScrapePipeline', 'PageReadiness', 'AdaptiveTimeout',
+           'element_count_at_least', 'network_idle', 'ArticleCache', 'normalize_url', 'content_hash',
+           'PromptBuilder', 'TokenCounter', 'AnalysisScheduler', 'RateLimiter',
+           'HtmlExtractor', 'ExtractionSpec', 'Field', 'BrowserProfile',
+           'cached_chromedriver_path', 'SearchStrategy',
+           'SeenUrlIndex', 'BloomFilter', 'ArticleRegistry', 'simhash',
+           'CryptoPotatoScraper', 'SCRAPER_REGISTRY', 'register_scraper', 'create_scraper', 'Recorder',
+           'Metrics', 'metrics', 'TelegramOutbox', 'SendRateLimiter', 'split_message',
+           'pack_messages', 'ScrapeDaemon', 'load_watchlist', 'LiveDigest']
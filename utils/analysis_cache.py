@@ -0,0 +1,138 @@
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from .article_cache import content_hash
+from .sqlite_store import SqliteStore
+
+# Per-day analysis files written before analyses moved to SQLite: <topic>_YYYY-MM-DD.json
+LEGACY_CACHE_FILE = re.compile(r".+_\d{4}-\d{2}-\d{2}\.json")
+
+
+def analysis_key(topic, articles, model, prompt_version):
+    """
+    Content address of a topic analysis: the topic, model, prompt version and the set of article hashes.
+
+    Article order does not matter, so the same articles found in a different order
+    on a later run map to the same analysis.
+    """
+    hashes = sorted({content_hash(article["title"], article["content"]) for article in articles})
+    payload = json.dumps([topic, model, prompt_version, hashes])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def remove_legacy_cache_files(cache_dir):
+    """
+    Delete the per-day JSON analyses left over from before the SQLite cache.
+
+    Nothing reads them any more and nothing else would ever remove them. Only files
+    matching the old naming scheme are touched.
+
+    Args:
+        cache_dir (str): Directory the old files were written to
+
+    Returns:
+        int: Number of files removed
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return 0
+    removed = 0
+    for cache_file in cache_dir.glob("*.json"):
+        if LEGACY_CACHE_FILE.fullmatch(cache_file.name):
+            cache_file.unlink(missing_ok=True)
+            removed += 1
+    if removed:
+        print(f"Removed {removed} old per-day cache file(s)")
+    return removed
+
+
+class AnalysisCache(SqliteStore):
+    """Topic analyses keyed by their inputs, so an unchanged set of articles is never analyzed twice"""
+
+    table = "analyses"
+    schema = """
+        CREATE TABLE IF NOT EXISTS analyses (
+            key TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            analysis TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS analyses_topic ON analyses (topic, created_at);
+        CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at);
+        CREATE INDEX IF NOT EXISTS analyses_last_access ON analyses (last_access);
+    """
+
+    def __init__(self, path="cache/analyses.sqlite3", ttl_days=5, max_entries=1000, evict_batch=50):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite database file
+            ttl_days (float): Analyses older than this are treated as missing and evicted
+            max_entries (int): Least recently used analyses beyond this count are evicted
+            evict_batch (int): Most rows removed per write, so eviction cost stays bounded
+        """
+        super().__init__(path)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.evict_batch = evict_batch
+
+    def get(self, key):
+        """
+        Look up an analysis by its content address.
+
+        Args:
+            key (str): Key from analysis_key()
+
+        Returns:
+            dict: The analysis, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis FROM analyses WHERE key = ? AND created_at >= ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(key, now)
+        return json.loads(row[0])
+
+    def latest(self, topic, max_age_seconds=None):
+        """
+        Most recent analysis of a topic.
+
+        Args:
+            topic (str): Topic name
+            max_age_seconds (float, optional): Only consider analyses at most this old; defaults to the TTL
+
+        Returns:
+            dict: 'analysis' and its 'created_at' time, or None
+        """
+        max_age = self.ttl_seconds if max_age_seconds is None else min(max_age_seconds, self.ttl_seconds)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis, created_at FROM analyses WHERE topic = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (topic, time.time() - max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"analysis": json.loads(row[0]), "created_at": row[1]}
+
+    def put(self, key, topic, analysis):
+        """Store a topic analysis under its content address"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, topic, analysis, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, topic, json.dumps(analysis), now, now),
+            )
+            self._conn.commit()
+        self._evict()
+
+    def _evict(self):
+        """Drop up to evict_batch expired entries, then least recently used ones beyond max_entries"""
+        super()._evict(self.max_entries, "created_at", self.ttl_seconds, batch=self.evict_batch)
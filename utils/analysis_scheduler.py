@@ -0,0 +1,132 @@
+import asyncio
+import random
+import time
+from collections import deque
+from .metrics import metrics
+
+
+def retryable_errors():
+    """Errors worth retrying: rate limits, timeouts/connection drops and server-side failures"""
+    # Imported here so a run that never calls the API does not pay for importing openai
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    return RateLimitError, APIConnectionError, InternalServerError
+
+
+class RateLimiter:
+    """Sliding one-minute window over request and token budgets"""
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=200000, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._events = deque()
+        self._tokens_in_window = 0
+        self._paused_until = 0.0
+
+    def pause(self, seconds):
+        """Hold every caller back for `seconds`, e.g. after the API returned 429"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, tokens):
+        """Wait until one more request of `tokens` fits both budgets, then claim it"""
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            now = time.monotonic()
+            while self._events and now - self._events[0][0] >= self.window:
+                self._tokens_in_window -= self._events.popleft()[1]
+
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif (len(self._events) < self.requests_per_minute
+                  and self._tokens_in_window + tokens <= self.tokens_per_minute):
+                self._events.append((now, tokens))
+                self._tokens_in_window += tokens
+                return
+            else:
+                wait = self._events[0][0] + self.window - now
+            await asyncio.sleep(max(wait, 0.01))
+
+
+class AnalysisScheduler:
+    """Runs OpenAI calls under a concurrency cap and rate budgets, retrying 429s and timeouts"""
+
+    def __init__(self, max_concurrency=4, requests_per_minute=500, tokens_per_minute=200000,
+                 max_retries=5, base_delay=1.0, max_delay=30.0, window=60.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency (int): Maximum requests in flight at once
+            requests_per_minute (int): Request budget per rolling minute
+            tokens_per_minute (int): Token budget (prompt plus max completion) per rolling minute
+            max_retries (int): Retries per call after a retryable error
+            base_delay (float): First backoff delay in seconds, doubled on each retry
+            max_delay (float): Upper bound for a single backoff delay
+            window (float): Seconds the request and token budgets are counted over
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.window = window
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+        self._loop = None
+
+    def _bind_loop(self):
+        """asyncio primitives belong to one event loop, so rebuild them when the loop changes"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute, self.window)
+
+    async def run(self, call, estimated_tokens):
+        """
+        Run an API call once budgets allow, retrying retryable errors with jittered backoff.
+
+        Args:
+            call (callable): Zero-argument coroutine function making the request
+            estimated_tokens (int): Tokens the request will count against the budget
+
+        Returns:
+            The call's result
+
+        Raises:
+            The last error once retries are exhausted, or any non-retryable error
+        """
+        self._bind_loop()
+        retryable = retryable_errors()
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.acquire(estimated_tokens)
+            try:
+                async with self._slots:
+                    self.stats["requests"] += 1
+                    return await call()
+            except retryable as e:
+                # Counted, and a 429's Retry-After honored by the other callers, even on the last attempt
+                delay = self._backoff(attempt, e)
+                if attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                metrics.count("retries", service="openai", error=type(e).__name__)
+                print(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff; a 429's Retry-After also pauses every other caller"""
+        from openai import RateLimitError
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if isinstance(error, RateLimitError):
+            self.stats["rate_limited"] += 1
+            try:
+                retry_after = float(error.response.headers.get("retry-after", 0))
+            except (TypeError, ValueError):
+                retry_after = 0
+            if retry_after:
+                self._limiter.pause(retry_after)
+                delay = max(delay, retry_after)
+        return delay
@@ -0,0 +1,111 @@
+import hashlib
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from .metrics import metrics
+from .sqlite_store import SqliteStore
+
+# Query parameters that only track the visit and never change the article
+TRACKING_PARAMS = {"guccounter", "guce_referrer", "guce_referrer_sig", "ncid", "soc_src", "soc_trk", "tsrc", "fbclid", "gclid"}
+
+
+def normalize_url(url):
+    """
+    Normalize an article URL so trivially different links share one cache entry.
+
+    Lowercases the scheme and host, drops the fragment, tracking parameters and
+    trailing slash, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def content_hash(title, content):
+    """SHA-256 of an article's title and content"""
+    return hashlib.sha256(f"{title}\n{content}".encode("utf-8")).hexdigest()
+
+
+class ArticleCache(SqliteStore):
+    """Fetched article bodies keyed by normalized URL, so a revisited link skips the browser"""
+
+    table = "articles"
+    key_column = "url"
+    schema = """
+        CREATE TABLE IF NOT EXISTS articles (
+            url TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS articles_last_access ON articles (last_access);
+    """
+
+    def __init__(self, path="cache/articles.sqlite3", ttl_hours=72, max_entries=2000):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite database file
+            ttl_hours (float): Entries older than this are treated as missing and evicted
+            max_entries (int): Least recently used entries beyond this count are evicted
+        """
+        super().__init__(path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._evict()
+
+    def get(self, url):
+        """
+        Look up a cached article.
+
+        Args:
+            url (str): Article URL
+
+        Returns:
+            dict: 'title', 'content', 'content_hash' and 'fetched_at', or None if missing or expired
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, content, content_hash, fetched_at FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[3] > self.ttl_seconds:
+                self.misses += 1
+                metrics.count("cache_lookups", cache="article", result="miss")
+                return None
+            self._touch(key, now)
+            self.hits += 1
+        metrics.count("cache_lookups", cache="article", result="hit")
+        return {"title": row[0], "content": row[1], "content_hash": row[2], "fetched_at": row[3]}
+
+    def put(self, url, article):
+        """
+        Store an article.
+
+        Args:
+            url (str): Article URL
+            article (dict): Dictionary with 'title' and 'content' keys
+        """
+        now = time.time()
+        digest = content_hash(article["title"], article["content"])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (url, title, content, content_hash, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), article["title"], article["content"], digest, now, now),
+            )
+            self._conn.commit()
+        self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones beyond max_entries"""
+        super()._evict(self.max_entries, "fetched_at", self.ttl_seconds)
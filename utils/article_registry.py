@@ -0,0 +1,144 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+from .article_cache import content_hash, normalize_url
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def simhash(text, bits=64, shingle=3):
+    """
+    SimHash fingerprint of a text over word shingles.
+
+    Texts that share most of their shingles get fingerprints a few bits apart, so
+    syndicated copies with a different byline or footer still land close together.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = [" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1))]
+    weights = [0] * bits
+    for item in shingles:
+        value = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=bits // 8).digest(), "little")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(first, second):
+    return bin(first ^ second).count("1")
+
+
+class ArticleRegistry:
+    """
+    Run-wide article store shared by every topic.
+
+    Each unique URL is fetched once, even when several topics ask for it at the same
+    time, and articles whose text is nearly identical are grouped into one cluster so
+    a topic only keeps one copy of a syndicated story.
+    """
+
+    def __init__(self, max_distance=3):
+        """
+        Args:
+            max_distance (int): Largest SimHash bit difference still treated as the same story
+        """
+        self.max_distance = max_distance
+        self.stats = {"fetches": 0, "shared": 0, "near_duplicates": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        # normalized URL -> Future resolving to the fetched article list
+        self._fetches = {}
+        # (fingerprint, cluster) of every registered article
+        self._fingerprints = []
+        # content hash -> cluster, the content hash of the first article in the cluster
+        self._clusters = {}
+
+    def fetch(self, url, fetch):
+        """
+        Fetch an article once per run.
+
+        Args:
+            url (str): Article URL
+            fetch (callable): fetch(url) returning a list of zero or one article dicts
+
+        Returns:
+            list: The article list from the first successful fetch of this URL
+        """
+        key = normalize_url(url)
+        with self._lock:
+            future = self._fetches.get(key)
+            owner = future is None
+            if owner:
+                future = self._fetches[key] = Future()
+            else:
+                self.stats["shared"] += 1
+
+        if owner:
+            try:
+                articles = fetch(url)
+            except Exception as e:
+                with self._lock:
+                    self._fetches.pop(key, None)
+                future.set_exception(e)
+                raise
+            for article in articles:
+                self._register(article)
+            with self._lock:
+                self.stats["fetches"] += 1
+                if not articles:
+                    # Failed fetches are not remembered, so a retry (e.g. on a fresh session) fetches again
+                    self._fetches.pop(key, None)
+            future.set_result(articles)
+        return future.result()
+
+    def _register(self, article):
+        if article["content"] in ("", "No content"):
+            return
+        digest = content_hash(article["title"], article["content"])
+        fingerprint = simhash(article["content"])
+        with self._lock:
+            if digest in self._clusters:
+                return
+            cluster = digest
+            for other, other_cluster in self._fingerprints:
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    cluster = other_cluster
+                    self.stats["near_duplicates"] += 1
+                    break
+            self._fingerprints.append((fingerprint, cluster))
+            self._clusters[digest] = cluster
+
+    def reset(self):
+        """
+        Forget every fetch and fingerprint, so a long-running process starts each cycle afresh.
+
+        Only call this while no topic is being scraped.
+        """
+        with self._lock:
+            self._fetches.clear()
+            self._fingerprints.clear()
+            self._clusters.clear()
+
+    def dedupe(self, articles):
+        """
+        Keep the first article of every near-duplicate cluster, in order.
+
+        Args:
+            articles (list): Article dicts with 'title' and 'content' keys
+
+        Returns:
+            list: Articles with exact and near duplicates removed
+        """
+        return list(self.iter_unique(articles))
+
+    def iter_unique(self, articles):
+        """Stream version of dedupe(): yields each article unless its cluster was already yielded"""
+        clusters = set()
+        for article in articles:
+            digest = content_hash(article["title"], article["content"])
+            with self._lock:
+                cluster = self._clusters.get(digest, digest)
+                if cluster in clusters:
+                    self.stats["dropped"] += 1
+                    continue
+            clusters.add(cluster)
+            yield article
@@ -1,34 +1,227 @@
+import importlib
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from .metrics import metrics
+
+# Scraper classes by source name, filled by @register_scraper
+SCRAPER_REGISTRY = {}
+# Modules of the scrapers shipped with the package, imported the first time one is created
+BUILTIN_SCRAPERS = {
+    "yahoo_finance": ".yahoo_finance_scraper",
+    "cryptopotato": ".crypto_potato_scraper",
+}
+
+
+def register_scraper(name):
+    """Class decorator adding a scraper to SCRAPER_REGISTRY under `name`"""
+    def decorator(cls):
+        cls.website_name = name
+        SCRAPER_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def create_scraper(name, **options):
+    """
+    Build a registered scraper by source name.
+
+    Args:
+        name (str): Registered source name, e.g. "yahoo_finance" or "cryptopotato"
+        **options: Constructor arguments; ones the scraper does not accept are ignored
+
+    Returns:
+        BaseScraper: The new scraper
+    """
+    if name not in SCRAPER_REGISTRY and name in BUILTIN_SCRAPERS:
+        importlib.import_module(BUILTIN_SCRAPERS[name], __package__)
+    if name not in SCRAPER_REGISTRY:
+        available = sorted(set(SCRAPER_REGISTRY) | set(BUILTIN_SCRAPERS))
+        raise ValueError(f"Unknown scraper '{name}'. Available: {', '.join(available)}")
+    cls = SCRAPER_REGISTRY[name]
+    accepted = inspect.signature(cls).parameters
+    return cls(**{key: value for key, value in options.items() if key in accepted})
 
 
 class BaseScraper(ABC):
-    """Abstract base class for all website scrapers"""
+    """
+    Abstract base class for all website scrapers.
+
+    A scraper finds article links for a topic and fetches one article per link; the
+    pipeline runs those two steps for every registered source. Subclasses describe
+    their article pages with ARTICLE_SPEC and ARTICLE_BODY and set the http_fetcher,
+    readiness and extractor helpers the visit uses.
+    """
+
+    website_name = None
+    # ExtractionSpec with 'title' and 'paragraphs' fields for an article page
+    ARTICLE_SPEC = None
+    # CSS selector present once an article's body has rendered in the browser
+    ARTICLE_BODY = None
+
+    def _init_sources(self, driver=None, driver_pool=None, article_cache=None, seen_urls=None, article_registry=None,
+                      recorder=None):
+        """Set up the browser source and shared stores every scraper uses"""
+        if driver is None and driver_pool is None:
+            raise ValueError("Either a driver or a driver_pool must be provided")
+        self.driver = driver
+        self.driver_pool = driver_pool
+        self.article_cache = article_cache
+        self.seen_urls = seen_urls
+        self.article_registry = article_registry
+        self.recorder = recorder
+        self.page_loads = {"searches": 0, "articles": 0}
+        self._page_loads_lock = threading.Lock()
+        self._driver_lock = threading.Lock()
 
     @abstractmethod
-    def scrape_func(self, driver, soup):
+    def search_links(self, topic):
         """
-        Main scraping function that extracts data from the page.
+        Find the article links for a topic.
 
         Args:
-            driver: Selenium WebDriver instance
-            soup: BeautifulSoup parsed HTML
+            topic (str): Topic or search term
 
         Returns:
-            dict: Dictionary containing scraped data
+            list: Article URLs to fetch, newest first
         """
         pass
 
-    @abstractmethod
-    def visit_and_get_article(self, driver, url):
+    def fetch_article(self, url):
         """
-        Visit a specific article URL and extract its content.
+        Fetch and parse a single article, borrowing one driver only if the browser is needed.
 
         Args:
-            driver: Selenium WebDriver instance
-            url: URL of the article to visit
+            url (str): Article URL
 
         Returns:
-            list: List of dictionaries containing article data
-                  Each dict should have 'title' and 'content' keys
+            list: Zero or one dictionaries with 'title' and 'content' keys
         """
-        pass
+        cached = self._cached_article(url)
+        load = self._load_article if cached is None else (lambda link: cached)
+        # Cached articles still go through the registry, so they are shared and fingerprinted like fetched ones
+        if self.article_registry is not None:
+            return self.article_registry.fetch(url, load)
+        return load(url)
+
+    def dedupe_articles(self, articles):
+        """Drop repeated and near-duplicate articles when an article registry is set"""
+        if self.article_registry is None:
+            return articles
+        return self.article_registry.dedupe(articles)
+
+    def _with_driver(self, func, item):
+        """Run func(driver, item) on a borrowed pool driver, or on self.driver one call at a time"""
+        if self.driver_pool is not None:
+            return self.driver_pool.run(func, item)
+        with self._driver_lock:
+            return func(self.driver, item)
+
+    def _map_drivers(self, func, items):
+        """Run func(driver, item) for each item on the pool, or sequentially on self.driver"""
+        if self.driver_pool is not None:
+            return self.driver_pool.map(func, items)
+        return [func(self.driver, item) for item in items]
+
+    def _fetch_many(self, urls):
+        """fetch_article() for each URL, as many at once as the pool has drivers"""
+        urls = list(urls)
+        if self.driver_pool is None or not urls:
+            return [self.fetch_article(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(self.driver_pool.size, len(urls))) as executor:
+            return list(executor.map(self.fetch_article, urls))
+
+    def _count_page_load(self, kind):
+        with self._page_loads_lock:
+            self.page_loads[kind] += 1
+        metrics.count("page_loads", kind=kind, source=self.website_name)
+
+    def _record_page(self, driver, kind):
+        """Save the rendered page when the run is being recorded for replay"""
+        if self.recorder is not None:
+            self.recorder.record_driver_page(driver, kind)
+
+    def is_seen(self, url, topic):
+        """True if this source's article was already analyzed for the topic in an earlier run"""
+        return self.seen_urls is not None and self.seen_urls.is_seen(url, self.website_name, topic)
+
+    def mark_seen(self, url, topic):
+        """
+        Record that an article was analyzed for a topic, so later runs stop gathering links there.
+
+        Called once the topic's analysis has succeeded, not when the article is fetched.
+        """
+        if self.seen_urls is not None:
+            self.seen_urls.mark(url, self.website_name, topic)
+
+    def _cached_article(self, url):
+        """The article list for a cached URL, or None if it has to be fetched"""
+        if self.article_cache is None:
+            return None
+        cached = self.article_cache.get(url)
+        if not cached:
+            return None
+        print(f"Using cached article: {url}")
+        return [{'title': cached['title'], 'content': cached['content']}]
+
+    def _load_article(self, url):
+        """Load an article over plain HTTP, falling back to the browser on a borrowed driver"""
+        with metrics.span("visit_article", source=self.website_name):
+            print(f"Visiting article: {url}")
+            self._count_page_load("articles")
+
+            if self.http_fetcher is not None:
+                html = self.http_fetcher.get(url)
+                if html:
+                    article = self._extract_article(html)
+                    if article['content'] not in ('', 'No content'):
+                        self.http_fetcher.record(url, "http")
+                        self._store_article(url, article)
+                        return [article]
+                print(f"Static extraction empty, falling back to browser: {url}")
+
+            # Only now is a browser session needed, so HTTP fetches are not held to the pool size
+            return self._with_driver(self._browser_article, url)
+
+    def _browser_article(self, driver, url):
+        """Load an article in the browser and extract it once its body has rendered"""
+        try:
+            driver.get(url)
+
+            # Wait for the article body instead of a fixed pause
+            try:
+                self.readiness.wait(driver, EC.presence_of_element_located((By.CSS_SELECTOR, self.ARTICLE_BODY)),
+                                    "article_body")
+            except Exception as e:
+                print(f"Warning: Timeout waiting for article body: {e}")
+
+            self._record_page(driver, "article")
+            article = self._article_from_values(
+                self.extractor.extract_from_driver(self.ARTICLE_SPEC, driver, self.in_browser_extraction)
+            )
+        except Exception as e:
+            print(f"Error loading article {url}: {e}")
+            return []
+
+        if self.http_fetcher is not None:
+            self.http_fetcher.record(url, "browser")
+        self._store_article(url, article)
+        return [article]
+
+    def _store_article(self, url, article):
+        if article['content'] in ('', 'No content'):
+            return
+        if self.article_cache is not None:
+            self.article_cache.put(url, article)
+
+    def _extract_article(self, html):
+        """Extract the title and paragraph text from an article page's HTML"""
+        return self._article_from_values(self.extractor.extract(self.ARTICLE_SPEC, html))
+
+    def _article_from_values(self, values):
+        title = values['title'] or 'No title'
+        content = '\n'.join(values['paragraphs']) or 'No content'
+        return {'title': title, 'content': content}
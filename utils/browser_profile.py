@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+
+# Ad, analytics and tracking hosts Yahoo Finance and CryptoPotato pull in; none carry article text
+THIRD_PARTY_BLOCKLIST = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*", "*google-analytics.com*",
+    "*adservice.google.com*", "*amazon-adsystem.com*", "*scorecardresearch.com*", "*taboola.com*",
+    "*outbrain.com*", "*criteo.com*", "*criteo.net*", "*moatads.com*", "*chartbeat.com*", "*chartbeat.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*adnxs.com*", "*rubiconproject.com*", "*pubmatic.com*",
+    "*casalemedia.com*", "*openx.net*", "*yieldmo.com*", "*quantserve.com*", "*demdex.net*",
+    "*ads.yahoo.com*", "*analytics.yahoo.com*", "*beap.gemini.yahoo.com*", "*consent.cmp.oath.com*",
+]
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.mp4", "*.webm"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+
+DRIVER_PATH_CACHE = Path.home() / ".cache" / "random_scraper" / "chromedriver.json"
+
+
+def explicit_chromedriver_path():
+    """CHROMEDRIVER_PATH, or a chromedriver on PATH; None when neither is set"""
+    return os.getenv("CHROMEDRIVER_PATH") or shutil.which("chromedriver")
+
+
+def cached_chromedriver_path(max_age_days=7, refresh=False):
+    """
+    Locate a chromedriver binary without hitting the network on every run.
+
+    Uses CHROMEDRIVER_PATH or a chromedriver on PATH when present. Otherwise the path
+    returned by ChromeDriverManager().install() is remembered for max_age_days.
+
+    Args:
+        max_age_days (float): Days a remembered path is trusted
+        refresh (bool): Forget the remembered path and resolve it again, e.g. after Chrome updated
+
+    Returns:
+        str: Path to the chromedriver executable
+    """
+    explicit = explicit_chromedriver_path()
+    if explicit:
+        return explicit
+
+    if refresh:
+        DRIVER_PATH_CACHE.unlink(missing_ok=True)
+    try:
+        cached = json.loads(DRIVER_PATH_CACHE.read_text())
+        if Path(cached["path"]).exists() and time.time() - cached["installed_at"] < max_age_days * 86400:
+            return cached["path"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    DRIVER_PATH_CACHE.write_text(json.dumps({"path": path, "installed_at": time.time()}))
+    return path
+
+
+class BrowserProfile:
+    """Builds Chrome sessions that only load what the scrapers need to read text"""
+
+    def __init__(self, headless=True, block_images=True, block_fonts=True, block_third_party=True,
+                 extra_blocked_urls=None, page_load_strategy="eager", page_load_timeout=30, script_timeout=30):
+        """
+        Initialize the profile.
+
+        Args:
+            headless (bool): Run Chrome without a window
+            block_images (bool): Disable image loading and block image/video URLs
+            block_fonts (bool): Block web font downloads
+            block_third_party (bool): Block known ad and analytics hosts
+            extra_blocked_urls (list, optional): More URL patterns for Network.setBlockedURLs
+            page_load_strategy (str): "eager" returns once the DOM is ready; "normal" waits for every resource
+            page_load_timeout (float): Seconds before driver.get gives up
+            script_timeout (float): Seconds before execute_script gives up
+        """
+        self.headless = headless
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.block_third_party = block_third_party
+        self.extra_blocked_urls = extra_blocked_urls or []
+        self.page_load_strategy = page_load_strategy
+        self.page_load_timeout = page_load_timeout
+        self.script_timeout = script_timeout
+
+    @classmethod
+    def full(cls, **kwargs):
+        """Profile that loads every resource, as the scraper did originally"""
+        return cls(block_images=False, block_fonts=False, block_third_party=False,
+                   page_load_strategy="normal", **kwargs)
+
+    def blocked_urls(self):
+        patterns = list(self.extra_blocked_urls)
+        if self.block_third_party:
+            patterns += THIRD_PARTY_BLOCKLIST
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        return patterns
+
+    def chrome_options(self):
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+        options.add_argument('--incognito')
+        options.add_argument('--disable-popup-blocking')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+        options.page_load_strategy = self.page_load_strategy
+        if self.block_images:
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def apply(self, driver):
+        """Install URL blocking and timeouts on a running session"""
+        patterns = self.blocked_urls()
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver.set_page_load_timeout(self.page_load_timeout)
+        driver.set_script_timeout(self.script_timeout)
+        return driver
+
+    def create_driver(self):
+        """Start a Chrome session with this profile"""
+        try:
+            driver = webdriver.Chrome(service=Service(cached_chromedriver_path()), options=self.chrome_options())
+        except SessionNotCreatedException as e:
+            # Usually Chrome auto-updated past the remembered chromedriver; an explicit path is left alone
+            if explicit_chromedriver_path():
+                raise
+            print(f"Warning: Chrome session not created with the cached chromedriver, resolving it again: {e.msg}")
+            driver = webdriver.Chrome(service=Service(cached_chromedriver_path(refresh=True)),
+                                      options=self.chrome_options())
+        return self.apply(driver)
@@ -1,83 +1,114 @@
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-import time
-from .base_scraper import BaseScraper
+from urllib.parse import quote_plus
+from .base_scraper import BaseScraper, register_scraper
+from .extraction import ExtractionSpec, Field, HtmlExtractor
+from .metrics import metrics
+from .readiness import PageReadiness
 
 
+@register_scraper("cryptopotato")
 class CryptoPotatoScraper(BaseScraper):
     """Scraper for CryptoPotato website"""
 
-    def __init__(self, days_back=1):
+    # Listing page (search results, tags): one item per post with its link and date
+    LISTING_SPEC = ExtractionSpec(
+        scope=[('div', {'class': 'cp-post'})],
+        item='div.cp-post',
+        fields={
+            'url': Field('a', attr='href'),
+            'date': Field('span.post-date'),
+        },
+    )
+
+    # Article page: the post title and the paragraphs of the post body
+    ARTICLE_SPEC = ExtractionSpec(
+        scope=[('h1', {'class': 'post-title'}), ('div', {'class': 'post-details-content'})],
+        fields={
+            'title': Field('h1.post-title'),
+            'paragraphs': Field('div.post-details-content p', many=True),
+        },
+    )
+    ARTICLE_BODY = 'div.post-details-content'
+
+    def __init__(self, days_back=1, http_fetcher=None, readiness=None, article_cache=None, extractor=None,
+                 in_browser_extraction=True, seen_urls=None, article_registry=None, driver=None,
+                 driver_pool=None, base_url="https://cryptopotato.com/", num_articles=4, recorder=None):
         """
         Initialize the scraper.
 
         Args:
             days_back (int): Number of days back to check for articles (default: 1 = today only)
+            http_fetcher (HttpFetcher, optional): Tries article pages over plain HTTP before the browser
+            readiness (PageReadiness, optional): Shared page wait helper; one is created if not given
+            article_cache (ArticleCache, optional): Checked before fetching an article at all
+            extractor (HtmlExtractor, optional): HTML extraction backend; defaults to the fastest installed
+            in_browser_extraction (bool): Run selectors inside the page via execute_script instead
+                of pulling page_source into Python
+            seen_urls (SeenUrlIndex, optional): Articles analyzed for a topic in earlier runs; link
+                gathering for that topic stops at the first one and only newer links are visited
+            article_registry (ArticleRegistry, optional): Run-wide registry so an article is fetched
+                once per run and near-duplicate stories are dropped
+            driver: Selenium WebDriver instance, used when no driver_pool is given
+            driver_pool (DriverPool, optional): Pool to borrow drivers from for browser fetches
+            base_url (str): CryptoPotato homepage URL; topic searches use its ?s= listing
+            num_articles (int): Maximum articles to visit per topic
+            recorder (Recorder, optional): Saves listing and article pages for offline replay
         """
+        self._init_sources(driver, driver_pool, article_cache, seen_urls, article_registry, recorder)
         self.days_back = days_back
+        self.http_fetcher = http_fetcher
+        self.readiness = readiness or PageReadiness()
+        self.extractor = extractor or HtmlExtractor()
+        self.in_browser_extraction = in_browser_extraction
+        self.base_url = base_url
+        self.num_articles = num_articles
+
+    @metrics.timed("search", source="cryptopotato")
+    def search_links(self, topic):
+        """
+        Load the CryptoPotato search listing for a topic and return its article links.
+
+        Args:
+            topic (str): Topic to search for
+
+        Returns:
+            list: Article URLs within the date range, newest first
+        """
+        url = f"{self.base_url}?s={quote_plus(topic)}"
+        print(f"Searching CryptoPotato for '{topic}'...")
+        self._count_page_load("searches")
+        html = self.http_fetcher.get(url) if self.http_fetcher is not None else None
+        if html:
+            posts = self.extractor.extract(self.LISTING_SPEC, html)
+        else:
+            posts = self._with_driver(self._listing_from_driver, url)
+        return self._links_from_listing(posts, topic)[:self.num_articles]
 
-    def scrape_func(self, driver, soup):
-        """Extract Solana news from CryptoPotato"""
-        print("Processing CryptoPotato...")
+    def _listing_from_driver(self, driver, url):
+        driver.get(url)
+        self._record_page(driver, "search")
+        return self.extractor.extract_from_driver(self.LISTING_SPEC, driver, self.in_browser_extraction)
 
-        # Find all article containers
-        article_divs = soup.find_all('div', class_='cp-post')
+    def _links_from_listing(self, posts, topic=None):
+        """Links among LISTING_SPEC posts within the date range, stopping at one analyzed for the topic before"""
         articles_to_visit = []
 
-        for article in article_divs:
-            # Find the link
-            link_tag = article.find('a')
-            if not link_tag:
+        for post in posts:
+            article_url = post['url']
+            if not article_url:
                 continue
-            article_url = link_tag.get('href', '')
-            # Find the date
-            date_tag = article.find('span', class_='post-date')
-            date = date_tag.get_text(strip=True) if date_tag else 'No date'
+            # Posts are listed newest first, so everything from here on was analyzed for this topic by an earlier run
+            if topic is not None and self.is_seen(article_url, topic):
+                print(f"Reached already analyzed article, stopping: {article_url}")
+                break
 
             # Check if posted within the specified days back
-            within_range = self._is_within_date_range(date)
-
-            if within_range:
+            if self._is_within_date_range(post['date'] or 'No date'):
                 articles_to_visit.append(article_url)
 
         timeframe = "today" if self.days_back == 1 else f"last {self.days_back} days"
         print(f"Articles to visit ({timeframe}): {len(articles_to_visit)}")
-        articles = []
-        for url in articles_to_visit:
-             articles += self.visit_and_get_article(driver, url)
-        
-        return articles
-
-    def visit_and_get_article(self, driver, url):
-        """Visit an article and extract its content"""
-        print(f"Visiting article: {url}")
-
-        article_texts = []
-        driver.get(url)
-
-        # Wait for page to load
-        time.sleep(2)
-
-        # Get page source and parse with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        # Extract title and content
-        title_tag = soup.find('h1', class_='post-title')
-        title = title_tag.get_text(strip=True) if title_tag else 'No title'
-
-        content_div = soup.find('div', class_='post-details-content')
-
-        # Find all <p> elements within the content div
-        if content_div:
-            paragraphs = content_div.find_all('p')
-            article_text = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-            content = '\n'.join(article_text)
-        else:
-            content = 'No content'
-
-        article_texts.append({'title': title, 'content': content})
-
-        return article_texts
+        return articles_to_visit
 
     def _is_within_date_range(self, date_str):
         """
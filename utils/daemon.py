@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import json
+import random
+import time
+from pathlib import Path
+
+# Used for topics and settings the watchlist file leaves out
+DEFAULT_WATCHLIST = {
+    "interval_minutes": 60,
+    "jitter": 0.1,
+    "max_concurrent_topics": 2,
+    "topics": ["Solana", "BYDDY", "ASTS", "QUBT", "IONQ"],
+}
+
+
+def load_watchlist(path=None):
+    """
+    Read topics and their refresh intervals from a JSON watchlist.
+
+    The file looks like:
+
+        {"interval_minutes": 60, "jitter": 0.1, "max_concurrent_topics": 2,
+         "topics": ["IONQ", {"name": "Solana", "interval_minutes": 15}]}
+
+    Top-level interval_minutes and jitter are defaults that any topic can override.
+
+    Args:
+        path (str, optional): Watchlist file; DEFAULT_WATCHLIST is used when omitted or missing
+
+    Returns:
+        dict: 'topics' as a list of dicts with 'name', 'interval' (seconds) and 'jitter',
+            and 'max_concurrent_topics'
+    """
+    config = dict(DEFAULT_WATCHLIST)
+    if path is not None and Path(path).exists():
+        with open(path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+
+    topics = []
+    for entry in config["topics"]:
+        entry = {"name": entry} if isinstance(entry, str) else entry
+        if not entry.get("name"):
+            raise ValueError(f"Watchlist topic without a name: {entry}")
+        interval = float(entry.get("interval_minutes", config["interval_minutes"])) * 60
+        jitter = float(entry.get("jitter", config["jitter"]))
+        if interval <= 0 or not 0 <= jitter < 1:
+            raise ValueError(f"Watchlist topic {entry['name']} needs a positive interval and 0 <= jitter < 1")
+        topics.append({"name": entry["name"], "interval": interval, "jitter": jitter})
+
+    max_concurrent = int(config["max_concurrent_topics"])
+    if max_concurrent < 1:
+        raise ValueError("max_concurrent_topics must be at least 1")
+    return {"topics": topics, "max_concurrent_topics": max_concurrent}
+
+
+class ScrapeDaemon:
+    """
+    Runs every topic's scrape-analyze-notify cycle on its own cadence in one long-lived process.
+
+    A topic is rescheduled when its cycle finishes, so a slow cycle never overlaps the
+    next one of the same topic. Maintenance (driver health checks, cache trimming) runs
+    between cycles: once it is due, no new cycle starts until the running ones finish.
+    """
+
+    def __init__(self, topics, run_topic, max_concurrent=2, maintenance=None, maintenance_interval=600, seed=None):
+        """
+        Initialize the daemon.
+
+        Args:
+            topics (list): Topic dicts with 'name', 'interval' and 'jitter', as from load_watchlist()
+            run_topic (callable): Coroutine function run_topic(topic) doing one cycle for a topic
+            max_concurrent (int): Topic cycles running at once, across the whole watchlist
+            maintenance (callable, optional): Called in a thread between cycles
+            maintenance_interval (float): Seconds between maintenance runs
+            seed (int, optional): Seed for the jitter, for reproducible schedules
+        """
+        self.topics = topics
+        self.run_topic = run_topic
+        self.max_concurrent = max_concurrent
+        self.maintenance = maintenance
+        self.maintenance_interval = maintenance_interval
+        self._random = random.Random(seed)
+        self.stats = {"cycles": 0, "failures": 0, "maintenance": 0}
+        # topic name -> {'runs', 'last_seconds', 'last_finished'}
+        self.topic_stats = {}
+
+    def next_delay(self, topic):
+        """Seconds until a topic's next cycle: its interval, spread by +/- jitter"""
+        return topic["interval"] * (1 + self._random.uniform(-topic["jitter"], topic["jitter"]))
+
+    async def run(self, stop=None, max_cycles=None):
+        """
+        Schedule cycles until stopped.
+
+        Args:
+            stop (asyncio.Event, optional): Set to finish the running cycles and return
+            max_cycles (int, optional): Return after this many cycles have started
+
+        Returns:
+            dict: The daemon stats
+        """
+        stop = stop or asyncio.Event()
+        now = time.monotonic()
+        # First cycles are spread over each topic's jitter window so a big watchlist does not start at once
+        due = [(now + self._random.uniform(0, topic["interval"] * topic["jitter"]), index, topic)
+               for index, topic in enumerate(self.topics)]
+        heapq.heapify(due)
+        slots = asyncio.Semaphore(self.max_concurrent)
+        # Set whenever a finished cycle reschedules its topic
+        self._rescheduled = asyncio.Event()
+        running = set()
+        last_maintenance = now
+        started = 0
+
+        while not stop.is_set() and (max_cycles is None or started < max_cycles):
+            if self.maintenance is not None and time.monotonic() - last_maintenance >= self.maintenance_interval:
+                if running:
+                    await asyncio.wait(running)
+                await self._maintain()
+                last_maintenance = time.monotonic()
+
+            wait = due[0][0] - time.monotonic() if due else float("inf")
+            if wait > 0:
+                if self.maintenance is not None:
+                    wait = min(wait, max(last_maintenance + self.maintenance_interval - time.monotonic(), 0))
+                await self._sleep(stop, None if wait == float("inf") else wait)
+                continue
+
+            await slots.acquire()
+            _, index, topic = heapq.heappop(due)
+            task = asyncio.create_task(self._cycle(topic, index, slots, due))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            started += 1
+
+        if running:
+            await asyncio.wait(running)
+        return self.stats
+
+    async def _cycle(self, topic, index, slots, due):
+        name = topic["name"]
+        start = time.perf_counter()
+        try:
+            await self.run_topic(name)
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"Cycle for {name} failed: {e}")
+        finally:
+            slots.release()
+            seconds = time.perf_counter() - start
+            self.stats["cycles"] += 1
+            stats = self.topic_stats.setdefault(name, {"runs": 0, "last_seconds": 0.0, "last_finished": None})
+            stats["runs"] += 1
+            stats["last_seconds"] = seconds
+            stats["last_finished"] = time.time()
+            delay = self.next_delay(topic)
+            heapq.heappush(due, (time.monotonic() + delay, index, topic))
+            self._rescheduled.set()
+            print(f"Cycle for {name} took {seconds:.1f}s; next in {delay / 60:.1f} min")
+
+    async def _sleep(self, stop, timeout):
+        """Wait until the timeout (None for no limit), a stop request or a topic being rescheduled"""
+        self._rescheduled.clear()
+        waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(self._rescheduled.wait())]
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+
+    async def _maintain(self):
+        try:
+            await asyncio.to_thread(self.maintenance)
+            self.stats["maintenance"] += 1
+        except Exception as e:
+            print(f"Maintenance failed: {e}")
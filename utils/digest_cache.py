@@ -0,0 +1,55 @@
+import time
+from .sqlite_store import SqliteStore
+
+
+class DigestCache(SqliteStore):
+    """Per-article digests keyed by content hash and prompt version, reused across topics and runs"""
+
+    table = "digests"
+    schema = """
+        CREATE TABLE IF NOT EXISTS digests (
+            key TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS digests_last_access ON digests (last_access);
+    """
+
+    def __init__(self, path="cache/digests.sqlite3", max_entries=5000):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Least recently used digests beyond this count are evicted
+        """
+        super().__init__(path)
+        self.max_entries = max_entries
+
+    def get(self, key):
+        """
+        Look up a digest.
+
+        Args:
+            key (str): Digest key (content hash plus prompt and model version)
+
+        Returns:
+            dict: 'digest' and the 'prompt_tokens' it cost to produce, or None if missing
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT digest, prompt_tokens FROM digests WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+        return {"digest": row[0], "prompt_tokens": row[1]}
+
+    def put(self, key, digest, prompt_tokens):
+        """Store a digest and the prompt tokens spent producing it"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests (key, digest, prompt_tokens, last_access) VALUES (?, ?, ?, ?)",
+                (key, digest, prompt_tokens, time.time()),
+            )
+            self._conn.commit()
+        self._evict(self.max_entries)
@@ -0,0 +1,346 @@
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .browser_profile import BrowserProfile
+from .metrics import metrics
+
+# Bytes per page in /proc/<pid>/statm
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def create_chrome_driver():
+    """Build a headless Chrome session with the scraper's default (lean) profile"""
+    return BrowserProfile().create_driver()
+
+
+def session_pid(driver):
+    """Process id of a session's chromedriver, or None for drivers not started through a Service"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def process_tree(pid):
+    """A process id followed by every descendant's, read from /proc (just the pid where /proc is missing)"""
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending += [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+    return pids
+
+
+def process_tree_rss(pid):
+    """
+    Resident memory of a process and its descendants, e.g. chromedriver and its Chrome processes.
+
+    Returns:
+        int: Bytes, or None where /proc is unavailable
+    """
+    total = None
+    for current in process_tree(pid):
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total = (total or 0) + int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class DriverPool:
+    """
+    Bounded pool of WebDriver sessions shared by scraping threads.
+
+    Also governs the sessions it hands out: a session is recycled once it has served
+    max_pages operations or its process tree passes max_rss_mb, and an operation run
+    through run() that overruns operation_timeout has its session killed and is retried
+    on a fresh one.
+    """
+
+    def __init__(self, size=2, driver_factory=None, max_pages=None, max_rss_mb=None, operation_timeout=None,
+                 retries=1):
+        """
+        Initialize the pool. Sessions are started lazily, up to `size` of them.
+
+        Args:
+            size (int): Maximum number of concurrent WebDriver sessions
+            driver_factory (callable, optional): Zero-argument callable returning a new
+                driver. Defaults to create_chrome_driver.
+            max_pages (int, optional): Operations (page visits) after which a session is recycled
+            max_rss_mb (float, optional): Resident memory of a session's processes above which it
+                is recycled; only measurable on Linux for sessions started through a Service
+            operation_timeout (float, optional): Seconds one run() operation may take before its
+                session is killed
+            retries (int): Times an operation killed at the deadline is retried on a fresh session
+        """
+        if size < 1:
+            raise ValueError("Driver pool size must be at least 1")
+        self.size = size
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.operation_timeout = operation_timeout
+        self.retries = retries
+        # Holds idle drivers, and None for each slot freed by a retired session so waiters wake up
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        # id(driver) -> {'started_at': time.monotonic(), 'pages': operations served}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"started": 0, "retired": 0, "page_limit": 0, "memory_limit": 0, "deadline": 0,
+                      "not_responding": 0, "too_old": 0, "peak_rss_bytes": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _checkout(self):
+        """Take an idle driver, starting a new session if the pool has room"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._start_or_wait()
+            # None marks a slot freed by a retired session: go round and fill it
+            if driver is not None:
+                return driver
+            if self._closed:
+                # Or close() waking the waiters: pass it on to the next one
+                self._idle.put(None)
+                raise RuntimeError("Driver pool is closed")
+
+    def _start_or_wait(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Driver pool is closed")
+            start_new = len(self._drivers) < self.size
+            if start_new:
+                # Reserve the slot before the (slow) browser start
+                slot = object()
+                self._drivers.append(slot)
+
+        if not start_new:
+            return self._idle.get()
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._drivers.remove(slot)
+            raise
+        with self._lock:
+            self._drivers[self._drivers.index(slot)] = driver
+            self._sessions[id(driver)] = {"started_at": time.monotonic(), "pages": 0}
+            self.stats["started"] += 1
+            running = len(self._drivers)
+        metrics.count("browser_starts")
+        print(f"Started WebDriver session {running}/{self.size}")
+        return driver
+
+    def _release(self, driver):
+        """Return a driver after an operation, recycling it if it has reached a page or memory limit"""
+        with self._lock:
+            session = self._sessions.get(id(driver))
+            if session is not None:
+                session["pages"] += 1
+            pages = session["pages"] if session is not None else 0
+
+        reason = None
+        if self.max_pages is not None and pages >= self.max_pages:
+            reason = "page_limit"
+        pid = session_pid(driver)
+        rss = process_tree_rss(pid) if pid is not None else None
+        if rss is not None:
+            with self._lock:
+                self.stats["peak_rss_bytes"] = max(self.stats["peak_rss_bytes"], rss)
+            metrics.peak("browser_rss_peak_bytes", rss)
+            if self.max_rss_bytes is not None and rss > self.max_rss_bytes:
+                reason = "memory_limit"
+
+        if reason is None:
+            self._idle.put(driver)
+        else:
+            print(f"Recycling WebDriver session after {pages} pages ({reason})")
+            self._retire(driver, reason)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a driver for the duration of the with-block"""
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+
+    def run(self, func, item):
+        """
+        Run func(driver, item) on a borrowed driver under the operation deadline.
+
+        A session still busy at the deadline is killed, since a hung page_source or
+        execute_script call cannot be interrupted otherwise; its result is discarded and the
+        item is retried on a fresh session. The last attempt's outcome is returned as is.
+
+        Args:
+            func (callable): Called with a borrowed driver and the item
+            item: Work item, typically a URL
+
+        Returns:
+            The value returned by func
+        """
+        for attempt in range(self.retries + 1):
+            driver = self._checkout()
+            expired = threading.Event()
+            watchdog = None
+            if self.operation_timeout is not None:
+                watchdog = threading.Timer(self.operation_timeout, self._expire, (driver, expired))
+                watchdog.daemon = True
+                watchdog.start()
+            result = error = None
+            try:
+                result = func(driver, item)
+            except Exception as e:
+                error = e
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+
+            if not expired.is_set():
+                self._release(driver)
+            else:
+                self._retire(driver, "deadline")
+                if attempt < self.retries:
+                    print(f"WebDriver session passed the {self.operation_timeout}s deadline on {item}, "
+                          f"retrying on a fresh session")
+                    continue
+            if error is not None:
+                raise error
+            return result
+
+    def map(self, func, items):
+        """
+        Run func(driver, item) for every item, spread across the pool.
+
+        Args:
+            func (callable): Called with a borrowed driver and one item
+            items (iterable): Work items
+
+        Returns:
+            list: Results in the same order as items
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.size, len(items))) as executor:
+            return list(executor.map(lambda item: self.run(func, item), items))
+
+    def health_check(self, max_age=None):
+        """
+        Ping every idle session and retire the ones that no longer answer or have run too long.
+
+        Retired sessions are quit and their slots freed, so replacements start on demand.
+        Sessions borrowed at the time are left alone.
+
+        Args:
+            max_age (float, optional): Seconds after which a session is recycled even if healthy
+
+        Returns:
+            dict: Number of idle sessions 'checked' and 'retired'
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        checked = retired = 0
+        now = time.monotonic()
+        for driver in idle:
+            if driver is None:
+                self._idle.put(driver)
+                continue
+            checked += 1
+            session = self._sessions.get(id(driver), {"started_at": now})
+            too_old = max_age is not None and now - session["started_at"] > max_age
+            if not too_old and self._responds(driver):
+                self._idle.put(driver)
+            else:
+                reason = "too_old" if too_old else "not_responding"
+                print(f"Recycling WebDriver session ({reason})")
+                self._retire(driver, reason)
+                retired += 1
+        return {"checked": checked, "retired": retired}
+
+    def _is_reserved(self, driver):
+        return type(driver) is object
+
+    def _responds(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _expire(self, driver, expired):
+        """Watchdog callback: mark the operation as expired and kill its session"""
+        expired.set()
+        pid = session_pid(driver)
+        if pid is None:
+            # No process to kill (e.g. a stub driver); ask it to quit instead
+            self._quit(driver)
+            return
+        # Killed outright: quit() would queue behind the very call that is stuck
+        for current in reversed(process_tree(pid)):
+            try:
+                os.kill(current, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+
+    def _retire(self, driver, reason):
+        """Quit a session, free its slot and wake a thread waiting for a driver"""
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._sessions.pop(id(driver), None)
+            self.stats["retired"] += 1
+            self.stats[reason] += 1
+        metrics.count("browser_restarts", reason=reason)
+        # A session killed at the deadline is quit too, so its client and service are released;
+        # _quit() only logs the errors a dead process gives
+        self._quit(driver)
+        self._idle.put(None)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Warning: Error closing WebDriver session: {e}")
+
+    def close(self):
+        """Quit every session the pool started and wake threads still waiting for one"""
+        with self._lock:
+            self._closed = True
+            drivers = [driver for driver in self._drivers if not self._is_reserved(driver)]
+            self._drivers = []
+
+        for driver in drivers:
+            self._quit(driver)
+        # Idle sessions are gone; threads blocked in _checkout() wake up on None and fail
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        self._idle.put(None)
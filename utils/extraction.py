@@ -0,0 +1,217 @@
+import json
+from bs4 import BeautifulSoup, SoupStrainer
+from selenium.common.exceptions import WebDriverException
+from .metrics import metrics
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_BACKEND = "lxml"
+except ImportError:
+    DEFAULT_BACKEND = "html.parser"
+
+# selectolax parses the whole page but is still an order of magnitude faster than lxml
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    DEFAULT_BACKEND = "selectolax"
+except ImportError:
+    LexborHTMLParser = None
+
+BACKENDS = ("lxml", "html.parser", "selectolax")
+
+# Runs an ExtractionSpec (as produced by ExtractionSpec.as_dict) inside the page. Text matches
+# BeautifulSoup's get_text(strip=True): every text node stripped, then joined without a separator.
+EXTRACT_SCRIPT = """
+const spec = arguments[0];
+function text(el) {
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    const parts = [];
+    while (walker.nextNode()) {
+        const value = walker.currentNode.nodeValue.trim();
+        if (value) parts.push(value);
+    }
+    return parts.join('');
+}
+function value(el, field) {
+    return field.attr ? (el.getAttribute(field.attr) || '') : text(el);
+}
+function fields(node) {
+    const values = {};
+    for (const [key, field] of Object.entries(spec.fields)) {
+        if (field.many) {
+            values[key] = Array.from(node.querySelectorAll(field.selector)).map(el => value(el, field)).filter(v => v);
+        } else {
+            const el = node.querySelector(field.selector);
+            values[key] = el ? value(el, field) : null;
+        }
+    }
+    return values;
+}
+if (spec.item) {
+    return Array.from(document.querySelectorAll(spec.item)).map(fields);
+}
+return fields(document);
+"""
+
+
+class Field:
+    """One value to extract: the text (or an attribute) of the first or every match of a CSS selector"""
+
+    def __init__(self, selector, attr=None, many=False):
+        """
+        Args:
+            selector (str): CSS selector, relative to the item when the spec has one
+            attr (str, optional): Attribute to read instead of the element's text
+            many (bool): Return a list of every non-empty match instead of the first match
+        """
+        self.selector = selector
+        self.attr = attr
+        self.many = many
+
+
+class ExtractionSpec:
+    """Declares which subtrees of a page to parse and which fields to pull out of them"""
+
+    def __init__(self, scope, fields, item=None):
+        """
+        Args:
+            scope (list): (tag, attrs) pairs naming the subtrees worth parsing. Attribute
+                values are matched exactly, except that a single class also matches elements
+                carrying other classes; every pair must use the same attribute names.
+            fields (dict): Maps output key -> Field
+            item (str, optional): CSS selector for repeated items; fields are then
+                extracted once per item and a list of dicts is returned
+        """
+        self.scope = scope
+        self.fields = fields
+        self.item = item
+        attr_names = {tuple(sorted(attrs)) for _, attrs in scope}
+        if len(attr_names) > 1:
+            raise ValueError("All scope entries must filter on the same attribute names")
+
+    def as_dict(self):
+        """JSON-serializable form passed to EXTRACT_SCRIPT"""
+        return {
+            "item": self.item,
+            "fields": {
+                key: {"selector": field.selector, "attr": field.attr, "many": field.many}
+                for key, field in self.fields.items()
+            },
+        }
+
+    def strainer(self):
+        """SoupStrainer matching only the scoped subtrees"""
+        names = sorted({tag for tag, _ in self.scope})
+        attrs = {}
+        for _, scope_attrs in self.scope:
+            for name, value in scope_attrs.items():
+                attrs.setdefault(name, []).append(value)
+        if "class" in attrs:
+            # The strainer sees the whole class attribute, e.g. "cp-post featured" for 'cp-post'
+            classes = set(attrs["class"])
+            attrs["class"] = lambda value: value is not None and (value in classes or
+                                                                  not classes.isdisjoint(value.split()))
+        return SoupStrainer(names, attrs=attrs)
+
+
+class HtmlExtractor:
+    """Runs extraction specs over HTML with a fast parser; BeautifulSoup backends build only the scoped subtrees"""
+
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend (str, optional): "lxml", "html.parser" or "selectolax". Defaults to the
+                fastest one installed: selectolax, then lxml, then html.parser.
+        """
+        self.backend = backend or DEFAULT_BACKEND
+        # Bytes moved from the browser to Python, by extraction path
+        self.stats = {"page_source_bytes": 0, "script_bytes": 0}
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend: {self.backend}")
+        if self.backend == "selectolax" and LexborHTMLParser is None:
+            raise ValueError("The selectolax backend requires the selectolax package")
+
+    def extract(self, spec, html):
+        """
+        Extract a spec's fields from a page.
+
+        Args:
+            spec (ExtractionSpec): What to extract
+            html (str): Page source
+
+        Returns:
+            dict or list: One dict of fields, or a list of them when the spec has an item selector.
+            Missing single fields are None and missing many-fields are empty lists.
+        """
+        if self.backend == "selectolax":
+            return self._extract_selectolax(spec, html)
+
+        # Only the scoped subtrees are built; everything else is skipped while tokenizing
+        root = BeautifulSoup(html, self.backend, parse_only=spec.strainer())
+        if spec.item is None:
+            return self._fields_bs4(spec, root)
+        return [self._fields_bs4(spec, item) for item in root.select(spec.item)]
+
+    def extract_from_driver(self, spec, driver, in_browser=True):
+        """
+        Extract a spec's fields from the page currently loaded in a WebDriver.
+
+        In-browser extraction runs the selectors as JavaScript so only the extracted
+        values cross the WebDriver wire; it falls back to page_source if the script fails.
+
+        Args:
+            spec (ExtractionSpec): What to extract
+            driver: Selenium WebDriver instance
+            in_browser (bool): Run the selectors in the page instead of parsing page_source
+
+        Returns:
+            dict or list: Same shape as extract()
+        """
+        if in_browser:
+            try:
+                result = driver.execute_script(EXTRACT_SCRIPT, spec.as_dict())
+                size = len(json.dumps(result))
+                self.stats["script_bytes"] += size
+                metrics.count("bytes", size, path="script")
+                return result
+            except WebDriverException as e:
+                print(f"Warning: In-browser extraction failed, parsing page source: {e}")
+        html = driver.page_source
+        self.stats["page_source_bytes"] += len(html)
+        metrics.count("bytes", len(html), path="page_source")
+        return self.extract(spec, html)
+
+    def _fields_bs4(self, spec, node):
+        values = {}
+        for key, field in spec.fields.items():
+            if field.many:
+                values[key] = [v for v in (self._value_bs4(el, field) for el in node.select(field.selector)) if v]
+            else:
+                element = node.select_one(field.selector)
+                values[key] = self._value_bs4(element, field) if element is not None else None
+        return values
+
+    def _value_bs4(self, element, field):
+        if field.attr:
+            return element.get(field.attr, '')
+        return element.get_text(strip=True)
+
+    def _extract_selectolax(self, spec, html):
+        root = LexborHTMLParser(html).root
+        if spec.item is None:
+            return self._fields_selectolax(spec, root)
+        return [self._fields_selectolax(spec, item) for item in root.css(spec.item)]
+
+    def _fields_selectolax(self, spec, node):
+        values = {}
+        for key, field in spec.fields.items():
+            if field.many:
+                values[key] = [v for v in (self._value_selectolax(el, field) for el in node.css(field.selector)) if v]
+            else:
+                element = node.css_first(field.selector)
+                values[key] = self._value_selectolax(element, field) if element is not None else None
+        return values
+
+    def _value_selectolax(self, element, field):
+        if field.attr:
+            return element.attributes.get(field.attr) or ''
+        return element.text(strip=True)
@@ -0,0 +1,77 @@
+import threading
+from collections import Counter
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import metrics
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class HttpFetcher:
+    """Fetches article pages without a browser over a pooled keep-alive session"""
+
+    def __init__(self, pool_size=8, timeout=10, headers=None, recorder=None):
+        """
+        Initialize the fetcher.
+
+        Args:
+            pool_size (int): Maximum keep-alive connections kept per host
+            timeout (float): Connect/read timeout in seconds for each request
+            headers (dict, optional): Request headers. Defaults to a desktop Chrome profile.
+            recorder (Recorder, optional): Saves every fetched page for offline replay
+        """
+        self.timeout = timeout
+        self.recorder = recorder
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Which path ("http" or "browser") served each URL
+        self.served_by = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """
+        Fetch a page's server-rendered HTML.
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            str: Response body, or None if the request failed
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                print(f"HTTP fetch returned {response.status_code} for {url}")
+                return None
+            metrics.count("bytes", len(response.content), path="http")
+            if self.recorder is not None:
+                self.recorder.record_page(url, response.text, "http")
+            return response.text
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+    def record(self, url, path):
+        """Record that `path` ("http" or "browser") served `url`"""
+        with self._lock:
+            self.served_by[url] = path
+
+    def counts(self):
+        """Number of URLs served by each path"""
+        with self._lock:
+            return Counter(self.served_by.values())
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,247 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _NullSpan:
+    """Span handed out while metrics are disabled; entering and leaving it does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics._finish(self, time.perf_counter() - self._start, exc_type)
+        return False
+
+
+class Metrics:
+    """
+    Run-wide timers and counters, written to a JSONL run log and optionally a Prometheus textfile.
+
+    Disabled until configure() is called; while disabled span() returns a shared no-op
+    context, timed() calls straight through and count() returns at once, so the
+    instrumentation left in the code costs one attribute check.
+    """
+
+    def __init__(self, prefix="random_scraper"):
+        """
+        Args:
+            prefix (str): Prefix of every metric name in the Prometheus textfile
+        """
+        self.prefix = prefix
+        self.enabled = False
+        self.run_log = None
+        self.prometheus_path = None
+        self.run_id = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configure(self, run_log=None, prometheus_path=None):
+        """
+        Enable collection for this run.
+
+        Args:
+            run_log (str, optional): JSONL file every span and the final counters are appended to
+            prometheus_path (str, optional): Prometheus textfile rewritten by flush()
+        """
+        self.run_log = run_log
+        self.prometheus_path = prometheus_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.enabled = bool(run_log or prometheus_path)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = defaultdict(float)
+            self.gauges = {}
+            # (name, labels) -> [count, total seconds, max seconds, errors]
+            self.timings = defaultdict(lambda: [0, 0.0, 0.0, 0])
+            self._events = []
+
+    def span(self, name, **labels):
+        """
+        Time a block of code.
+
+        Args:
+            name (str): Span name, e.g. "gather_links"
+            **labels: Extra dimensions such as source="yahoo_finance"
+
+        Returns:
+            Context manager timing the block; a failing block is counted as an error
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, labels)
+
+    def timed(self, name, **labels):
+        """Decorator timing every call of a function or coroutine function as a span"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with _Span(self, name, labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Counter name, e.g. "cache_lookups"
+            value (float): Amount to add
+            **labels: Extra dimensions such as cache="article", result="hit"
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def peak(self, name, value, **labels):
+        """
+        Raise a gauge to value if value is higher, keeping the run's peak.
+
+        Args:
+            name (str): Gauge name, e.g. "browser_rss_peak_bytes"
+            value (float): Observed value
+            **labels: Extra dimensions
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = max(self.gauges.get(key, value), value)
+
+    def _finish(self, span, seconds, exc_type):
+        key = (span.name, tuple(sorted(span.labels.items())))
+        with self._lock:
+            timing = self.timings[key]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+            if exc_type is not None:
+                timing[3] += 1
+            self._events.append({
+                "type": "span", "run": self.run_id, "name": span.name, "labels": span.labels,
+                "start": round(span.started_at, 3), "seconds": round(seconds, 6),
+                "error": exc_type.__name__ if exc_type is not None else None,
+            })
+
+    def summary(self):
+        """
+        Totals collected so far.
+
+        Returns:
+            dict: 'spans' maps span name -> count, seconds, max_seconds and errors summed over
+                labels; 'counters' maps counter name -> value summed over labels; 'gauges' maps
+                gauge name -> peak over labels
+        """
+        spans = {}
+        counters = defaultdict(float)
+        with self._lock:
+            for (name, _), (calls, seconds, longest, errors) in self.timings.items():
+                span = spans.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "errors": 0})
+                span["count"] += calls
+                span["seconds"] += seconds
+                span["max_seconds"] = max(span["max_seconds"], longest)
+                span["errors"] += errors
+            for (name, _), value in self.counters.items():
+                counters[name] += value
+            gauges = {}
+            for (name, _), value in self.gauges.items():
+                gauges[name] = max(gauges.get(name, value), value)
+        return {"spans": spans, "counters": dict(counters), "gauges": gauges}
+
+    def flush(self):
+        """Append buffered spans and the counters to the run log and rewrite the Prometheus textfile"""
+        if not self.enabled:
+            return
+        with self._lock:
+            events, self._events = self._events, []
+            counters = [
+                {"type": "counter", "run": self.run_id, "name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.counters.items()
+            ] + [
+                {"type": "gauge", "run": self.run_id, "name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.gauges.items()
+            ]
+        if self.run_log:
+            with open(self.run_log, "a", encoding="utf-8") as f:
+                for event in events + counters:
+                    f.write(json.dumps(event) + "\n")
+        if self.prometheus_path:
+            self._write_prometheus()
+
+    def _write_prometheus(self):
+        """Write the textfile collector format atomically so node_exporter never reads half a file"""
+        def label_text(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+        lines = []
+        with self._lock:
+            timings = sorted(self.timings.items())
+            counters = sorted(list(self.counters.items()) + list(self.gauges.items()))
+        # The file describes the last run only, so every value is exported as a gauge
+        for suffix, index in (("span_seconds", 1), ("span_calls", 0), ("span_errors", 3), ("span_max_seconds", 2)):
+            metric = f"{self.prefix}_{suffix}"
+            lines.append(f"# TYPE {metric} gauge")
+            for (name, labels), timing in timings:
+                lines.append(f"{metric}{label_text((('span', name),) + labels)} {timing[index]}")
+        for name in sorted({name for (name, _), _ in counters}):
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for (counter, labels), value in counters:
+                if counter == name:
+                    lines.append(f"{metric}{label_text(labels)} {value}")
+        lines.append(f"# TYPE {self.prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{self.prefix}_last_run_timestamp_seconds {time.time():.0f}")
+
+        temporary = f"{self.prometheus_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temporary, self.prometheus_path)
+
+
+# Process-wide instance used by the instrumented code; enabled by main() via METRICS_LOG / METRICS_PROMETHEUS
+metrics = Metrics()
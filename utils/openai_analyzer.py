@@ -1,13 +1,99 @@
 import os
+import re
 import json
-from datetime import datetime
+import asyncio
 from pathlib import Path
-from openai import OpenAI
+from .analysis_cache import AnalysisCache, analysis_key, remove_legacy_cache_files
+from .analysis_scheduler import AnalysisScheduler
+from .article_cache import content_hash
+from .digest_cache import DigestCache
+from .metrics import metrics
+from .prompt_builder import PromptBuilder
+
+# Bump when DIGEST_PROMPT changes so old digests are not reused
+DIGEST_PROMPT_VERSION = 1
+# Bump when the topic prompt or ANALYSIS_SCHEMA changes so old analyses are not reused
+ANALYSIS_PROMPT_VERSION = 1
+DIGEST_PROMPT = """Condense this article into a digest of at most 80 words covering the key facts, figures,
+events and any forward-looking statements that matter for market sentiment.
+
+Title: {title}
+Content: {content}
+"""
+
+SENTIMENTS = ("bullish", "bearish", "neutral")
+# Summary of the analysis returned when a topic could not be analyzed; it is never cached
+FAILED_SUMMARY = "Error analyzing articles"
+SUMMARY_FIELD = re.compile(r'"summary"\s*:\s*"')
+
+# Structured output schema for the topic summary; cached analyses are stored in this shape
+ANALYSIS_SCHEMA = {
+    "name": "topic_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "summary": {"type": "string"},
+            "sentiment": {"type": "string", "enum": list(SENTIMENTS)},
+            "confidence": {"type": "number"},
+            "citations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "article": {"type": "integer"},
+                        "title": {"type": "string"},
+                    },
+                    "required": ["article", "title"],
+                },
+            },
+        },
+        "required": ["summary", "sentiment", "confidence", "citations"],
+    },
+}
+
+
+def partial_summary(response_text):
+    """
+    The summary string received so far in a streamed structured response.
+
+    Args:
+        response_text (str): JSON text streamed so far, e.g. '{"summary": "Shares ro'
+
+    Returns:
+        str: The decoded summary so far ('Shares ro'), or "" before it starts
+    """
+    match = SUMMARY_FIELD.search(response_text)
+    if match is None:
+        return ""
+    raw = response_text[match.end():]
+    escaped = False
+    for index, char in enumerate(raw):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            raw = raw[:index]
+            break
+    # Drop an escape sequence cut off by the end of the stream
+    if escaped:
+        raw = raw[:-1]
+    raw = re.sub(r'\\u[0-9a-fA-F]{0,3}$', "", raw)
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return ""
+
 
 class OpenAIAnalyzer:
     """Handles article analysis using OpenAI API"""
 
-    def __init__(self, api_key=None, cache_dir="cache", max_cache_days=5):
+    def __init__(self, api_key=None, cache_dir="cache", max_cache_days=5, model="gpt-4o-mini",
+                 token_budget=6000, article_token_budget=3000, scheduler=None, base_url=None,
+                 request_timeout=60, schema_retries=1, recorder=None, fresh_hours=2, carry_over_hours=24):
         """
         Initialize the OpenAI analyzer.
 
@@ -15,68 +101,109 @@ class OpenAIAnalyzer:
             api_key (str, optional): OpenAI API key. If not provided, uses OPENAI_API_KEY env variable.
             cache_dir (str): Directory to store cached responses. Default is "cache".
             max_cache_days (int): Maximum number of days to keep cached results. Default is 5.
+            fresh_hours (float): A topic analyzed this recently is not scraped again at all;
+                otherwise it is scraped and the analysis reused only if its articles are unchanged
+            carry_over_hours (float): How long a topic's latest analysis stays the starting point for
+                an incremental run: it is updated with the new articles, or carried over when there are none
+            model (str): OpenAI chat model used for digests and summaries
+            token_budget (int): Maximum tokens of digest text per summary prompt; larger topics are map-reduced
+            article_token_budget (int): Maximum tokens of a single article sent for its digest
+            scheduler (AnalysisScheduler, optional): Concurrency, rate budgets and retries for API calls
+            base_url (str, optional): OpenAI-compatible API base URL. Defaults to the OpenAI API.
+            request_timeout (float): Seconds before a single API request times out
+            schema_retries (int): Extra calls allowed when a structured response fails validation
+            recorder (Recorder, optional): Saves every completion for offline replay
         """
-        self.client = OpenAI(api_key=api_key or os.getenv('OPENAI_KEY'))
+        self.api_key = api_key or os.getenv('OPENAI_KEY')
+        self.base_url = base_url
+        self.request_timeout = request_timeout
+        self.schema_retries = schema_retries
+        self.recorder = recorder
+        self.scheduler = scheduler or AnalysisScheduler()
+        self._async_client = None
+        self._async_client_loop = None
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.max_cache_days = max_cache_days
+        self.fresh_hours = fresh_hours
+        self.carry_over_hours = carry_over_hours
+        self.model = model
+        self.prompt_builder = PromptBuilder(token_budget=token_budget, model=model)
+        self.article_token_budget = article_token_budget
+        self.digest_cache = DigestCache(self.cache_dir / "digests.sqlite3")
+        # Analyses keyed by topic, model, prompt version and article content, not by date
+        self.analysis_cache = AnalysisCache(self.cache_dir / "analyses.sqlite3", ttl_days=max_cache_days)
+        remove_legacy_cache_files(self.cache_dir)
+        self.run_stats = {"digest_hits": 0, "digest_misses": 0, "prompt_tokens": 0, "prompt_tokens_saved": 0,
+                          "analysis_hits": 0}
+
+    def load_from_cache(self, topic, max_age_hours=None):
+        """
+        Latest analysis of a topic, if one is recent enough.
+
+        Args:
+            topic (str): Topic name
+            max_age_hours (float, optional): Oldest analysis accepted; defaults to fresh_hours
+
+        Returns:
+            dict: The analysis, or None
+        """
+        max_age_hours = self.fresh_hours if max_age_hours is None else max_age_hours
+        latest = self.analysis_cache.latest(topic, max_age_hours * 3600)
+        if latest is None:
+            return None
+        print(f"Loading cached analysis for {topic}")
+        return latest["analysis"]
+
+    def previous_analysis(self, topic):
+        """
+        Latest analysis of a topic made within carry_over_hours.
+
+        Returns:
+            dict: 'analysis' and its 'created_at' time, or None
+        """
+        return self.analysis_cache.latest(topic, self.carry_over_hours * 3600)
 
-        # Clean up old cache files
-        self._cleanup_old_cache()
-
-    def _get_cache_filename(self, topic):
-        """Generate cache filename based on website and today's date"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        safe_website_name = topic.replace("https://", "").replace("http://", "").replace("/", "_").replace(":", "_")
-        return self.cache_dir / f"{safe_website_name}_{today}.json"
-
-    def load_from_cache(self, topic):
-        """Load analysis from cache if it exists for today"""
-        cache_file = self._get_cache_filename(topic)
-        if cache_file.exists():
-            print(f"Loading cached analysis for {topic}")
-            with open(cache_file, 'r') as f:
-                return json.load(f)
-        return None
-
-    def _save_to_cache(self, topic, analysis):
-        """Save analysis to cache"""
-        cache_file = self._get_cache_filename(topic)
-        with open(cache_file, 'w') as f:
-            json.dump(analysis, f, indent=2)
-            
     def is_analysis_cached(self, topic):
-        """Check if analysis is already cached for today"""
-        cache_file = self._get_cache_filename(topic)
-        return cache_file.exists()
-
-    def _cleanup_old_cache(self):
-        """Remove cache files older than max_cache_days"""
-        if not self.cache_dir.exists():
-            return
-
-        from datetime import timedelta
-        now = datetime.now()
-        cutoff_date = now - timedelta(days=self.max_cache_days)
-
-        removed_count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            # Extract date from filename (format: topic_YYYY-MM-DD.json)
-            try:
-                # Get the last part before .json and extract date
-                filename = cache_file.stem  # removes .json
-                date_str = filename.split('_')[-1]  # get YYYY-MM-DD part
-                file_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-                if file_date < cutoff_date:
-                    cache_file.unlink()
-                    removed_count += 1
-            except (ValueError, IndexError):
-                # Skip files that don't match expected format
-                continue
-
-        if removed_count > 0:
-            print(f"Cleaned up {removed_count} old cache file(s)")
+        """Check if the topic was analyzed within the last fresh_hours, so it need not be scraped again"""
+        return self.fresh_hours > 0 and self.analysis_cache.latest(topic, self.fresh_hours * 3600) is not None
+
+    def close(self):
+        self.digest_cache.close()
+        self.analysis_cache.close()
+
+    def analyze_topics(self, topic_articles):
+        """
+        Analyze several topics concurrently.
+
+        Args:
+            topic_articles (dict): Maps topic -> list of article dicts
+
+        Returns:
+            dict: Maps topic -> analysis dict
+        """
+        return asyncio.run(self.analyze_topics_async(topic_articles))
+
+    async def analyze_topics_async(self, topic_articles):
+        """Async version of analyze_topics; the scheduler caps the API calls across all topics"""
+        topics = list(topic_articles)
+        results = await asyncio.gather(
+            *(self.analyze_all_articles_async(topic_articles[topic], topic) for topic in topics)
+        )
+        return dict(zip(topics, results))
+
+    def _get_async_client(self):
+        """Return an AsyncOpenAI client bound to the running event loop"""
+        # Imported on first use: runs served entirely from the cache never load openai
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Retries are handled by the scheduler so they respect the shared rate budget
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                             timeout=self.request_timeout, max_retries=0)
+            self._async_client_loop = loop
+        return self._async_client
 
     def analyze_all_articles(self, articles, topic):
         """
@@ -87,72 +214,218 @@ class OpenAIAnalyzer:
             topic (str): Name/URL of the website for caching purposes
 
         Returns:
-            dict: Dictionary containing 'summary', 'sentiment', and 'reasoning' keys
+            dict: Dictionary containing 'summary', 'sentiment', 'confidence' and 'citations' keys
         """
-        print(f"\nAnalyzing articles for {topic}...")
+        return asyncio.run(self.analyze_all_articles_async(articles, topic))
 
-        # Combine all articles into one text block
-        combined_text = ""
+    @metrics.timed("analyze_all_articles")
+    async def analyze_all_articles_async(self, articles, topic, on_progress=None, previous=None):
+        """
+        Async version of analyze_all_articles using the AsyncOpenAI client.
 
-        for i, article in enumerate(articles, 1):
-            combined_text += f"\n\nArticle {i}:\nTitle: {article['title']}\nContent: {article['content']}\n"
-        prompt = f"""Analyze the following collection of cryptocurrency articles about {topic}:
+        Each article is first reduced to a digest, cached by content hash, so only
+        new articles are sent to the model. The topic summary is then built from the digests.
 
-{combined_text}
+        Args:
+            articles (list): List of dictionaries with 'title' and 'content' keys
+            topic (str): Topic name
+            on_progress (callable, optional): Called with the summary text so far while the
+                final summary streams in; runs on the event loop, so it must not block
+            previous (dict, optional): Earlier analysis of the topic that these articles update,
+                for incremental runs that only gathered what is new since
+        """
+        print(f"\nAnalyzing articles for {topic}...")
+        versions = (ANALYSIS_PROMPT_VERSION, DIGEST_PROMPT_VERSION)
+        if previous is not None:
+            # The same new articles on top of a different earlier analysis make a different analysis
+            versions += (previous.get("summary"), previous.get("sentiment"))
+        key = analysis_key(topic, articles, self.model, versions)
+        cached = self.analysis_cache.get(key)
+        metrics.count("cache_lookups", cache="analysis_inputs", result="hit" if cached else "miss")
+        if cached:
+            # Same articles as an earlier analysis, whenever it ran: no digests or summary call needed
+            self.run_stats["analysis_hits"] += 1
+            print(f"Articles for {topic} unchanged since an earlier analysis, reusing it")
+            return cached
+        try:
+            digests = await asyncio.gather(*(self._digest_article(article) for article in articles))
+
+            sections = [
+                f"Article {i}:\nTitle: {article['title']}\nDigest: {digest}"
+                for i, (article, digest) in enumerate(zip(articles, digests), 1)
+            ]
+            batches = self.prompt_builder.batches(sections)
+            if len(batches) > 1:
+                # Map: condense each batch concurrently, then reduce over the partial summaries
+                print(f"Splitting {len(sections)} digests for {topic} into {len(batches)} batches")
+                partials = await asyncio.gather(*(self._summarize_batch(batch, topic) for batch in batches))
+                sections = self.prompt_builder.fit(
+                    [f"Partial summary {i}:\n{partial}" for i, partial in enumerate(partials, 1)]
+                )
+            else:
+                sections = batches[0]
+            digest_text = "\n\n".join(sections)
+            earlier = ""
+            if previous is not None:
+                earlier = f"""
+These articles are new since an earlier analysis of {topic} (sentiment: {previous.get('sentiment', 'unknown')}):
+{previous.get('summary', '')}
 
-Please provide:
-1. A one-paragraph summary no more than 200 words MAX that synthesizes the key themes and information across ALL articles
-2. An overall sentiment analysis for stock evaluation (bullish/bearish/neutral) with reasoning
+Update that analysis with the new articles: keep what still holds and revise what they change.
+"""
 
-Format your response as:
-Summary: [your summary here]
+            prompt = f"""Analyze the following digests of cryptocurrency articles about {topic}:
 
-Sentiment: [bullish/bearish/neutral]
+{digest_text}
+{earlier}
+Provide:
+- summary: one paragraph of no more than 200 words that synthesizes the key themes and information across ALL articles
+- sentiment: the overall sentiment for stock evaluation (bullish/bearish/neutral)
+- confidence: how confident you are in that sentiment, from 0 to 1
+- citations: the article numbers and titles that support the summary
 """
-        try:
             print(f"Calling OpenAI API for topic: {topic}...")
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            result = None
+            for attempt in range(self.schema_retries + 1):
+                analysis, _ = await self._complete([
                     {"role": "system", "content": "You are a financial analyst specializing in cryptocurrency markets. Provide concise, accurate analysis that synthesizes multiple sources."},
                     {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=800
-            )
-            analysis = response.choices[0].message.content
-            result = self._parse_response(analysis)
-            print(f"Analysis complete for {topic} - Sentiment: {result.get('sentiment', 'unknown')}")
-            # Save to cache
-            self._save_to_cache(topic, result)
-            print(f"Saved analysis to cache: {self._get_cache_filename(topic).name}")
+                ], max_tokens=400, response_format={"type": "json_schema", "json_schema": ANALYSIS_SCHEMA},
+                    on_delta=self._summary_progress(on_progress) if on_progress is not None else None)
+                try:
+                    result = self._validate_analysis(analysis)
+                    break
+                except ValueError as e:
+                    # Only a schema failure is worth another call; API errors are retried by the scheduler
+                    print(f"Invalid structured response for {topic} (attempt {attempt + 1}): {e}")
+            if result is None:
+                raise ValueError(f"no valid structured response after {self.schema_retries + 1} attempts")
+
+            print(f"Analysis complete for {topic} - Sentiment: {result['sentiment']} ({result['confidence']:.2f})")
+            self.analysis_cache.put(key, topic, result)
             return result
         except Exception as e:
             print(f"Error analyzing articles: {e}")
-            return {"summary": "Error analyzing articles", "sentiment": "unknown"}
+            return {"summary": FAILED_SUMMARY, "sentiment": "unknown"}
+
+    async def _summarize_batch(self, sections, topic):
+        """Condense one batch of article digests into a partial summary for the reduce step"""
+        text = "\n\n".join(sections)
+        partial, _ = await self._complete([
+            {"role": "system", "content": "You are a financial analyst. Keep every fact that matters for market sentiment."},
+            {"role": "user", "content": f"Summarize the key themes of these article digests about {topic} in at most 150 words, citing article numbers in brackets:\n\n{text}"}
+        ], max_tokens=300)
+        return partial.strip()
 
+    async def _digest_article(self, article):
+        """Return the digest for one article, calling the model only on a cache miss"""
+        key = f"{content_hash(article['title'], article['content'])}:{self.model}:{DIGEST_PROMPT_VERSION}"
+        cached = self.digest_cache.get(key)
+        metrics.count("cache_lookups", cache="digest", result="hit" if cached else "miss")
+        if cached:
+            self.run_stats["digest_hits"] += 1
+            self.run_stats["prompt_tokens_saved"] += cached["prompt_tokens"]
+            return cached["digest"]
 
-    def _parse_response(self, response_text):
-        """Parse the OpenAI response into structured data"""
-        lines = response_text.strip().split('\n')
+        self.run_stats["digest_misses"] += 1
+        content = self.prompt_builder.counter.truncate(
+            self.prompt_builder.clean(article['content']), self.article_token_budget
+        )
+        digest, usage = await self._complete([
+            {"role": "system", "content": "You are a financial analyst. Extract only the facts that matter for market sentiment."},
+            {"role": "user", "content": DIGEST_PROMPT.format(title=article['title'], content=content)}
+        ], max_tokens=250)
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        self.digest_cache.put(key, digest.strip(), prompt_tokens)
+        return digest.strip()
 
-        summary = ""
-        sentiment = ""
+    def _summary_progress(self, on_progress):
+        """Turn streamed response text into on_progress(summary so far) calls, skipping repeats"""
+        last = ""
+
+        def on_delta(response_text):
+            nonlocal last
+            summary = partial_summary(response_text)
+            if summary and summary != last:
+                last = summary
+                on_progress(summary)
+        return on_delta
+
+    @metrics.timed("openai_request")
+    async def _complete(self, messages, max_tokens, response_format=None, on_delta=None):
+        """
+        Run one chat completion through the scheduler and return its text and token usage.
+
+        With on_delta the completion is streamed and on_delta(text so far) called for every chunk.
+        """
+        client = self._get_async_client()
+        estimated_tokens = sum(self.prompt_builder.counter.count(m["content"]) for m in messages) + max_tokens
+        params = dict(model=self.model, messages=messages, temperature=0.5, max_tokens=max_tokens,
+                      **({"response_format": response_format} if response_format else {}))
+
+        async def request():
+            if on_delta is None:
+                response = await client.chat.completions.create(**params)
+                return response.choices[0].message.content, response.usage
+            stream = await client.chat.completions.create(**params, stream=True,
+                                                          stream_options={"include_usage": True})
+            text, usage = "", None
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    on_delta(text)
+            return text, usage
+
+        content, usage = await self.scheduler.run(request, estimated_tokens)
+        if usage:
+            self.run_stats["prompt_tokens"] += usage.prompt_tokens
+            metrics.count("openai_tokens", usage.prompt_tokens, kind="prompt")
+            metrics.count("openai_tokens", usage.completion_tokens, kind="completion")
+        if self.recorder is not None:
+            self.recorder.record_response(
+                "openai",
+                {"model": self.model, "messages": messages, "max_tokens": max_tokens, "response_format": response_format},
+                {"content": content, "usage": usage.model_dump() if usage else None},
+            )
+        return content, usage
+
+    def _validate_analysis(self, response_text):
+        """
+        Check a structured response against ANALYSIS_SCHEMA.
+
+        Returns:
+            dict: 'summary', 'sentiment', 'confidence' and 'citations'
+
+        Raises:
+            ValueError: If the response is not valid JSON or does not match the schema
+        """
+        try:
+            data = json.loads(response_text)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"response is not JSON: {e}")
+        if not isinstance(data, dict):
+            raise ValueError("response is not a JSON object")
 
-        current_section = None
+        summary = data.get("summary")
+        sentiment = data.get("sentiment")
+        confidence = data.get("confidence")
+        citations = data.get("citations")
+        if not isinstance(summary, str) or not summary.strip():
+            raise ValueError("summary must be a non-empty string")
+        if sentiment not in SENTIMENTS:
+            raise ValueError(f"sentiment must be one of {', '.join(SENTIMENTS)}")
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+            raise ValueError("confidence must be a number between 0 and 1")
+        if not isinstance(citations, list) or not all(
+            isinstance(c, dict) and isinstance(c.get("article"), int) and isinstance(c.get("title"), str)
+            for c in citations
+        ):
+            raise ValueError("citations must be a list of {article, title} objects")
 
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Summary:"):
-                current_section = "summary"
-                summary = line.replace("Summary:", "").strip()
-            elif line.startswith("Sentiment:"):
-                current_section = "sentiment"
-                sentiment = line.replace("Sentiment:", "").strip()
-            elif line and current_section == "summary":
-                summary += " " + line
-            
         return {
             "summary": summary.strip(),
-            "sentiment": sentiment.strip(),
+            "sentiment": sentiment,
+            "confidence": float(confidence),
+            "citations": [{"article": c["article"], "title": c["title"]} for c in citations],
         }
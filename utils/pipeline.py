@@ -0,0 +1,198 @@
+import asyncio
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from .openai_analyzer import FAILED_SUMMARY
+
+
+def carried_over(previous):
+    """
+    An earlier analysis shown again for a run that found nothing new, labeled with its age.
+
+    Args:
+        previous (dict): 'analysis' and 'created_at', as from OpenAIAnalyzer.previous_analysis()
+
+    Returns:
+        dict: The analysis with the label appended to its summary and 'carried_over_from' set
+    """
+    made_at = datetime.fromtimestamp(previous["created_at"]).strftime("%Y-%m-%d %H:%M")
+    analysis = previous["analysis"]
+    return {**analysis, "summary": f"{analysis.get('summary', '')}\n\n(No new articles; analysis from {made_at})",
+            "carried_over_from": previous["created_at"]}
+
+
+class ScrapePipeline:
+    """Runs topics through link gathering, article fetching, analysis and notification as overlapping stages"""
+
+    def __init__(self, scrapers, analyzer, on_result=None, gather_concurrency=2, fetch_concurrency=4,
+                 analyze_concurrency=2, notify_concurrency=1, queue_size=4, article_registry=None, on_progress=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            scrapers (list): BaseScraper sources searched for every topic; a single scraper is also accepted
+            analyzer (OpenAIAnalyzer): Provides analyze_all_articles_async() and previous_analysis()
+            on_result (callable, optional): Called as on_result(topic, analysis) by the notify stage
+            gather_concurrency (int): Searches running at once
+            fetch_concurrency (int): Article fetches running at once, across all topics
+            analyze_concurrency (int): OpenAI analyses running at once
+            notify_concurrency (int): Notification callbacks running at once
+            queue_size (int): Capacity of each queue between stages
+            article_registry (ArticleRegistry, optional): Drops near-duplicate stories across sources
+            on_progress (callable, optional): Called as on_progress(topic, summary so far) while a
+                topic's summary streams in; runs on the event loop, so it must not block
+        """
+        self.scrapers = list(scrapers) if isinstance(scrapers, (list, tuple)) else [scrapers]
+        self.analyzer = analyzer
+        self.on_result = on_result
+        self.gather_concurrency = gather_concurrency
+        self.fetch_concurrency = fetch_concurrency
+        self.analyze_concurrency = analyze_concurrency
+        self.notify_concurrency = notify_concurrency
+        self.queue_size = queue_size
+        self.article_registry = article_registry
+        self.on_progress = on_progress
+        self.results = {}
+        self.stage_seconds = {"gather": 0.0, "fetch": 0.0, "analyze": 0.0, "notify": 0.0}
+
+    async def run(self, topics):
+        """
+        Push every topic through the pipeline.
+
+        Args:
+            topics (list): Topics to scrape and analyze
+
+        Returns:
+            dict: Maps each topic to its analysis dict
+        """
+        self.results = {}
+        self._fetch_slots = asyncio.Semaphore(self.fetch_concurrency)
+        # Blocking scraper and callback work runs on threads sized to the stage limits
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.gather_concurrency * len(self.scrapers) + self.fetch_concurrency + self.notify_concurrency
+        )
+        start = time.perf_counter()
+
+        gather_queue = asyncio.Queue(maxsize=self.queue_size)
+        fetch_queue = asyncio.Queue(maxsize=self.queue_size)
+        analyze_queue = asyncio.Queue(maxsize=self.queue_size)
+        notify_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        stages = [
+            ("gather", gather_queue, fetch_queue, self._gather, self.gather_concurrency),
+            ("fetch", fetch_queue, analyze_queue, self._fetch, self.fetch_concurrency),
+            ("analyze", analyze_queue, notify_queue, self._analyze, self.analyze_concurrency),
+            ("notify", notify_queue, None, self._notify, self.notify_concurrency),
+        ]
+        workers = [
+            asyncio.create_task(self._worker(name, inbox, outbox, handler))
+            for name, inbox, outbox, handler, concurrency in stages
+            for _ in range(concurrency)
+        ]
+
+        try:
+            for topic in topics:
+                await gather_queue.put(topic)
+            # Each stage only drains once everything upstream has been handed on
+            for _, inbox, _, _, _ in stages:
+                await inbox.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._executor.shutdown(wait=False)
+
+        elapsed = time.perf_counter() - start
+        busy = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.stage_seconds.items())
+        print(f"Pipeline finished {len(topics)} topic(s) in {elapsed:.1f}s (stage busy time: {busy})")
+        return {topic: self.results[topic] for topic in topics if topic in self.results}
+
+    async def _worker(self, name, inbox, outbox, handler):
+        while True:
+            item = await inbox.get()
+            start = time.perf_counter()
+            try:
+                result = await handler(item)
+                self.stage_seconds[name] += time.perf_counter() - start
+                if outbox is not None:
+                    await outbox.put(result)
+            except Exception as e:
+                topic = item if isinstance(item, str) else item[0]
+                print(f"Error in {name} stage for {topic}: {e}")
+                self.results[topic] = {"summary": "Error processing topic", "sentiment": "unknown"}
+            finally:
+                inbox.task_done()
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _gather(self, topic):
+        async def search(scraper):
+            try:
+                return [(url, scraper) for url in await self._in_thread(scraper.search_links, topic)]
+            except Exception as e:
+                # One failing source should not cost the topic the others
+                print(f"Error searching {scraper.website_name} for {topic}: {e}")
+                return []
+
+        found = await asyncio.gather(*(search(scraper) for scraper in self.scrapers))
+        # The first source to return a URL fetches it
+        links = {}
+        for url, scraper in (link for source_links in found for link in source_links):
+            links.setdefault(url, scraper)
+        return topic, links
+
+    async def _fetch(self, item):
+        topic, links = item
+
+        async def fetch_one(url, scraper):
+            async with self._fetch_slots:
+                try:
+                    return await self._in_thread(scraper.fetch_article, url)
+                except Exception as e:
+                    # One failing article should not cost the topic the others
+                    print(f"Error fetching {url} from {scraper.website_name} for {topic}: {e}")
+                    return []
+
+        articles, fetched_links = [], []
+        results = await asyncio.gather(*(fetch_one(url, scraper) for url, scraper in links.items()))
+        for (url, scraper), fetched in zip(links.items(), results):
+            articles += fetched
+            if fetched:
+                fetched_links.append((url, scraper))
+        # Syndicated copies of one story would only crowd the prompt
+        if self.article_registry is not None:
+            articles = self.article_registry.dedupe(articles)
+        print(f"\nScraped {len(articles)} articles for topic: {topic}")
+        return topic, articles, fetched_links
+
+    async def _analyze(self, item):
+        topic, articles, fetched_links = item
+        # Incremental runs only gather what is new since the last run, so a recent analysis is the
+        # starting point: carried over when nothing is new, updated with the new articles otherwise
+        incremental = any(scraper.seen_urls is not None for scraper in self.scrapers)
+        previous = self.analyzer.previous_analysis(topic) if incremental else None
+        if not articles:
+            # Not worth an API call
+            if previous is not None:
+                print(f"No new articles for {topic}, carrying over its analysis")
+                return topic, carried_over(previous)
+            print(f"No new articles for {topic}, skipping analysis")
+            return topic, {"summary": "No new articles since the last run", "sentiment": "unknown"}
+        earlier = previous["analysis"] if previous is not None else None
+        if self.on_progress is None:
+            analysis = await self.analyzer.analyze_all_articles_async(articles, topic, previous=earlier)
+        else:
+            analysis = await self.analyzer.analyze_all_articles_async(
+                articles, topic, on_progress=lambda summary: self.on_progress(topic, summary), previous=earlier)
+        if analysis.get("summary") != FAILED_SUMMARY:
+            # Only now do the articles count as handled; after a failure the next run gathers them again
+            for url, scraper in fetched_links:
+                scraper.mark_seen(url, topic)
+        return topic, analysis
+
+    async def _notify(self, item):
+        topic, analysis = item
+        self.results[topic] = analysis
+        if self.on_result is not None:
+            await self._in_thread(self.on_result, topic, analysis)
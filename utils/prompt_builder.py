@@ -0,0 +1,148 @@
+import re
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Paragraphs that carry no news value: navigation, promos, disclaimers and share prompts
+BOILERPLATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"^(story continues|continue reading|read more|read next|related:|see also|recommended stories)",
+    r"^(click here|sign up|subscribe|download the .* app|follow us on|join our)",
+    r"(all rights reserved|terms of service|privacy policy|cookie)",
+    r"^(this article (was )?originally (appeared|published)|originally posted)",
+    r"^(disclaimer|disclosure|the views and opinions expressed)",
+    r"^(for more (news|information)|view comments|share this)",
+)]
+
+# Rough characters-per-token ratio for English text when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when available, otherwise with a character-based estimate"""
+
+    def __init__(self, model="gpt-4o-mini"):
+        self.model = model
+        self._encoding = None
+        self._encoding_loaded = tiktoken is None
+
+    @property
+    def encoding(self):
+        """tiktoken encoding, loaded on first use since it may be downloaded; None when unavailable"""
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except Exception as e:
+                # Unknown model or the encoding file could not be downloaded
+                print(f"Warning: tiktoken unavailable for {self.model}, estimating tokens: {e}")
+        return self._encoding
+
+    def count(self, text):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def truncate(self, text, max_tokens):
+        """Cut text to at most max_tokens, preferring to end on a paragraph or sentence boundary"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            cut = self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        else:
+            cut = text[:max_tokens * CHARS_PER_TOKEN]
+        boundary = max(cut.rfind("\n"), cut.rfind(". "))
+        if boundary > len(cut) // 2:
+            cut = cut[:boundary + 1]
+        return cut.rstrip() + " [...]"
+
+
+class PromptBuilder:
+    """Fits article sections into a token budget, trimming boilerplate and splitting into batches"""
+
+    def __init__(self, token_budget=6000, min_section_tokens=300, model="gpt-4o-mini"):
+        """
+        Initialize the builder.
+
+        Args:
+            token_budget (int): Maximum tokens of article text per prompt
+            min_section_tokens (int): Smallest share a section may be cut to before the
+                sections are split across several batches instead
+            model (str): Model whose tokenizer is used for counting
+        """
+        self.token_budget = token_budget
+        self.min_section_tokens = min_section_tokens
+        self.counter = TokenCounter(model)
+
+    def clean(self, content):
+        """Drop boilerplate and repeated paragraphs from article content"""
+        seen = set()
+        kept = []
+        for paragraph in content.split("\n"):
+            paragraph = paragraph.strip()
+            if not paragraph or paragraph in seen:
+                continue
+            if any(pattern.search(paragraph) for pattern in BOILERPLATE_PATTERNS):
+                continue
+            seen.add(paragraph)
+            kept.append(paragraph)
+        return "\n".join(kept)
+
+    def fit(self, sections, budget=None):
+        """
+        Truncate sections so together they fit the budget, giving each a fair share.
+
+        Sections smaller than their share keep their full length and the unused tokens
+        are redistributed among the larger ones.
+
+        Args:
+            sections (list): Section strings
+            budget (int, optional): Token budget. Defaults to token_budget.
+
+        Returns:
+            list: Sections truncated as needed
+        """
+        budget = budget or self.token_budget
+        sizes = [self.counter.count(section) for section in sections]
+        if sum(sizes) <= budget:
+            return list(sections)
+
+        allowance = [0] * len(sections)
+        remaining = budget
+        pending = sorted(range(len(sections)), key=lambda i: sizes[i])
+        while pending:
+            share = remaining // len(pending)
+            index = pending.pop(0)
+            allowance[index] = min(sizes[index], share)
+            remaining -= allowance[index]
+        return [self.counter.truncate(section, allowance[i]) for i, section in enumerate(sections)]
+
+    def batches(self, sections, budget=None):
+        """
+        Group sections into prompts that each fit the budget.
+
+        Returns a single batch when every section can keep at least min_section_tokens
+        of the budget; otherwise sections are spread evenly across as many batches as
+        needed for a map-reduce pass.
+
+        Args:
+            sections (list): Section strings
+            budget (int, optional): Token budget per batch. Defaults to token_budget.
+
+        Returns:
+            list: List of batches, each a list of fitted section strings
+        """
+        budget = budget or self.token_budget
+        if not sections:
+            return [[]]
+        per_batch = max(1, budget // self.min_section_tokens)
+        if len(sections) <= per_batch or sum(self.counter.count(section) for section in sections) <= budget:
+            return [self.fit(sections, budget)]
+
+        # Split evenly by count so every section gets a comparable share of its batch
+        batch_count = -(-len(sections) // per_batch)
+        groups = [sections[i::batch_count] for i in range(batch_count)]
+        return [self.fit(group, budget) for group in groups]
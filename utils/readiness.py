@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Counts in-flight fetch/XHR requests so the page can report when the network goes quiet
+NETWORK_IDLE_SCRIPT = """
+if (!window.__scraperNet) {
+    const net = window.__scraperNet = {pending: 0, last: performance.now()};
+    const done = () => { net.pending = Math.max(0, net.pending - 1); net.last = performance.now(); };
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function() {
+            net.pending++; net.last = performance.now();
+            return originalFetch.apply(this, arguments).finally(done);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        net.pending++; net.last = performance.now();
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+}
+const net = window.__scraperNet;
+return document.readyState === 'complete' && net.pending === 0 && performance.now() - net.last >= arguments[0];
+"""
+
+
+class element_count_at_least:
+    """Expected condition: at least `count` elements match `locator`"""
+
+    def __init__(self, locator, count):
+        self.locator = locator
+        self.count = count
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        return elements if len(elements) >= self.count else False
+
+
+class network_idle:
+    """Expected condition: document loaded and no fetch/XHR activity for `idle_ms` milliseconds"""
+
+    def __init__(self, idle_ms=500):
+        self.idle_ms = idle_ms
+
+    def __call__(self, driver):
+        return bool(driver.execute_script(NETWORK_IDLE_SCRIPT, self.idle_ms))
+
+
+class AdaptiveTimeout:
+    """Timeout derived from recently observed wait durations"""
+
+    def __init__(self, default=10, minimum=2, maximum=20, multiplier=3, window=20):
+        """
+        Args:
+            default (float): Timeout used until any latency has been observed
+            minimum (float): Lower bound for the learned timeout
+            maximum (float): Upper bound for the learned timeout
+            multiplier (float): Headroom applied to the p95 of recent latencies
+            window (int): Number of recent latencies to keep
+        """
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self._samples.append(seconds)
+
+    def observe_timeout(self, seconds):
+        """
+        Record a wait that gave up after `seconds`.
+
+        How long the page really needed is unknown, only that it was longer, so the sample
+        is sized to at least double the current timeout (up to maximum). Otherwise a timeout
+        learned on fast pages would never widen again for slow ones.
+        """
+        self._samples.append(max(seconds, min(self.maximum, 2 * self.current()) / self.multiplier))
+
+    def current(self):
+        if not self._samples:
+            return self.default
+        ordered = sorted(self._samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return max(self.minimum, min(self.maximum, p95 * self.multiplier))
+
+
+class PageReadiness:
+    """Shared wait helper: event-driven conditions, adaptive timeouts and per-wait timing"""
+
+    def __init__(self, poll_frequency=0.1, **timeout_options):
+        """
+        Initialize the readiness helper.
+
+        Args:
+            poll_frequency (float): Seconds between condition checks
+            **timeout_options: Passed to AdaptiveTimeout for each named wait
+        """
+        self.poll_frequency = poll_frequency
+        self.timeout_options = timeout_options
+        self._timeouts = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, name):
+        with self._lock:
+            if name not in self._timeouts:
+                self._timeouts[name] = AdaptiveTimeout(**self.timeout_options)
+            return self._timeouts[name].current()
+
+    def wait(self, driver, condition, name, timeout=None):
+        """
+        Wait for an expected condition and record how long it took.
+
+        Args:
+            driver: Selenium WebDriver instance
+            condition (callable): Expected condition taking the driver
+            name (str): Label used for adaptive timeouts and timing stats
+            timeout (float, optional): Fixed timeout overriding the learned one
+
+        Returns:
+            The condition's truthy result
+
+        Raises:
+            TimeoutException: If the condition is not met in time
+        """
+        timeout = timeout or self.timeout_for(name)
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            self._record(name, time.perf_counter() - start, timed_out=True)
+            raise
+        self._record(name, time.perf_counter() - start, timed_out=False)
+        return result
+
+    def _record(self, name, seconds, timed_out):
+        with self._lock:
+            stats = self._timings.setdefault(name, {"waits": 0, "timeouts": 0, "seconds": 0.0})
+            stats["waits"] += 1
+            stats["seconds"] += seconds
+            timeout = self._timeouts.setdefault(name, AdaptiveTimeout(**self.timeout_options))
+            if timed_out:
+                stats["timeouts"] += 1
+                timeout.observe_timeout(seconds)
+            else:
+                timeout.observe(seconds)
+
+    def summary(self):
+        """Per-wait totals: number of waits, timeouts and seconds spent waiting"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._timings.items()}
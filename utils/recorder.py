@@ -0,0 +1,71 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+
+def request_key(payload):
+    """Stable key for a request payload, used to match recorded responses on replay"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Recorder:
+    """
+    Captures what a live run saw so it can be replayed offline.
+
+    Layout of a recording directory:
+        pages/<sha1 of url>.html   page HTML as fetched or as rendered by the browser
+        pages.jsonl                one line per page: url, kind and file
+        responses.jsonl            one line per API exchange: service, key, request and response
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Recording directory; created if missing, appended to if it exists
+        """
+        self.path = Path(path)
+        (self.path / "pages").mkdir(parents=True, exist_ok=True)
+        self.counts = {"pages": 0, "responses": 0}
+        self._lock = threading.Lock()
+
+    def record_page(self, url, html, kind):
+        """
+        Save a page's HTML.
+
+        Args:
+            url (str): Page URL
+            html (str): Page HTML
+            kind (str): What the page is, e.g. "search" or "article"
+        """
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html"
+        with self._lock:
+            (self.path / "pages" / name).write_text(html, encoding="utf-8")
+            self._append("pages.jsonl", {"url": url, "kind": kind, "file": name, "recorded_at": time.time()})
+            self.counts["pages"] += 1
+
+    def record_response(self, service, request, response):
+        """
+        Save one API request and its response.
+
+        Args:
+            service (str): "openai" or "telegram"
+            request (dict): JSON-serializable request payload
+            response: JSON-serializable response body
+        """
+        entry = {"service": service, "key": request_key(request), "request": request, "response": response}
+        with self._lock:
+            self._append("responses.jsonl", entry)
+            self.counts["responses"] += 1
+
+    def record_driver_page(self, driver, kind):
+        """Save the page currently rendered in a WebDriver"""
+        try:
+            self.record_page(driver.current_url, driver.page_source, kind)
+        except Exception as e:
+            print(f"Warning: Could not record page: {e}")
+
+    def _append(self, name, entry):
+        with open(self.path / name, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,110 @@
+import threading
+import time
+from urllib.parse import quote
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+
+SEARCH_BOX = (By.ID, "ybar-sbq")
+
+
+class SearchStrategy:
+    """
+    Reaches a term's Yahoo Finance news results in as few page loads as possible.
+
+    Terms are first opened directly at their quote URL (or the URL a previous search
+    resolved to). If that does not show results, the search box of the page the session
+    is already on is used, and the homepage is only loaded when there is no search box.
+    Sessions, and therefore their cookies and consent state, are reused across terms.
+    """
+
+    def __init__(self, base_url, readiness, url_template="quote/{term}/", direct=True):
+        """
+        Initialize the strategy.
+
+        Args:
+            base_url (str): Yahoo Finance homepage URL
+            readiness (PageReadiness): Wait helper shared with the scraper
+            url_template (str): Path of a term's results page relative to base_url
+            direct (bool): Try the direct URL before typing into the search box
+        """
+        self.base_url = base_url
+        self.readiness = readiness
+        self.url_template = url_template
+        self.direct = direct
+        # term -> results URL the search box led to, reused on later searches
+        self.resolved = {}
+        # term -> {"method": "direct" | "typed", "seconds": float, "page_loads": int}
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def direct_url(self, search_term):
+        with self._lock:
+            resolved = self.resolved.get(search_term)
+        return resolved or self.base_url + self.url_template.format(term=quote(search_term.strip(), safe=""))
+
+    def search(self, driver, search_term, results_ready):
+        """
+        Load the results page for a term.
+
+        Args:
+            driver: Selenium WebDriver instance
+            search_term (str): Term to search for
+            results_ready (callable): Expected condition met once the results have rendered
+
+        Returns:
+            int: Page loads it took
+
+        Raises:
+            TimeoutException: If no strategy produced results in time
+        """
+        start = time.perf_counter()
+        page_loads = 0
+        method = "typed"
+
+        if self.direct:
+            driver.get(self.direct_url(search_term))
+            page_loads += 1
+            try:
+                # Unknown symbols redirect to the lookup page; stop waiting as soon as that happens
+                self.readiness.wait(driver, EC.any_of(results_ready, EC.url_contains("/lookup")), "direct_results")
+                if "/lookup" not in driver.current_url:
+                    method = "direct"
+            except TimeoutException:
+                pass
+            if method != "direct":
+                print(f"No direct results page for '{search_term}', using the search box")
+
+        try:
+            if method == "typed":
+                page_loads += self._type_search(driver, search_term)
+                self.readiness.wait(driver, results_ready, "search_results")
+                with self._lock:
+                    self.resolved[search_term] = driver.current_url
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.latencies[search_term] = {"method": method, "seconds": seconds, "page_loads": page_loads}
+            print(f"Search for '{search_term}' took {seconds:.2f}s ({method}, {page_loads} page loads)")
+        return page_loads
+
+    def _type_search(self, driver, search_term):
+        """Type the term into the search box, loading the homepage only if the page has none"""
+        page_loads = 1
+        try:
+            driver.find_element(*SEARCH_BOX)
+        except NoSuchElementException:
+            driver.get(self.base_url)
+            page_loads += 1
+        search_box = self.readiness.wait(driver, EC.visibility_of_element_located(SEARCH_BOX), "search_box")
+        search_box.send_keys(search_term)
+        search_box.send_keys(Keys.RETURN)
+        # The page typed into may itself show results (a previous term's), so wait for it to go away
+        self.readiness.wait(driver, EC.staleness_of(search_box), "search_navigation")
+        return page_loads
+
+    def summary(self):
+        """Per-term search latency, slowest first"""
+        with self._lock:
+            return dict(sorted(self.latencies.items(), key=lambda item: item[1]["seconds"], reverse=True))
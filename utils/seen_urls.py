@@ -0,0 +1,127 @@
+import hashlib
+import math
+import time
+from .article_cache import normalize_url
+from .sqlite_store import SqliteStore
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives, false positives at about error_rate"""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        """
+        Args:
+            capacity (int): Number of items the filter is sized for
+            error_rate (float): Target false positive rate at capacity
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one digest generate every position
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SeenUrlIndex(SqliteStore):
+    """
+    Article URLs already analyzed, per source and topic, kept across runs.
+
+    A story shared by several topics only counts as seen for the topics it was analyzed
+    for. A Bloom filter answers most lookups for new URLs without touching disk; the exact
+    set in SQLite confirms the rest, so a URL is never skipped by a false positive.
+    """
+
+    table = "seen_urls"
+    # The primary key spans three columns, so eviction addresses rows by rowid
+    key_column = "rowid"
+    schema = """
+        CREATE TABLE IF NOT EXISTS seen_urls (
+            url TEXT NOT NULL,
+            source TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            seen_at REAL NOT NULL,
+            PRIMARY KEY (source, topic, url)
+        );
+    """
+
+    def __init__(self, path="cache/seen_urls.sqlite3", retention_days=30, capacity=100000, error_rate=0.001):
+        """
+        Initialize the index.
+
+        Args:
+            path (str): SQLite database file holding the exact set
+            retention_days (float): URLs first seen longer ago than this are forgotten
+            capacity (int): Expected number of (source, topic, URL) entries, used to size the Bloom filter
+            error_rate (float): Bloom filter false positive rate at capacity
+        """
+        super().__init__(path)
+        self.retention_seconds = retention_days * 86400
+        self.stats = {"lookups": 0, "bloom_negatives": 0, "false_positives": 0, "seen": 0, "marked": 0}
+        self._evict(expires_column="seen_at", ttl_seconds=self.retention_seconds)
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        for row in self._conn.execute("SELECT source, topic, url FROM seen_urls"):
+            self._bloom.add(self._bloom_key(*row))
+
+    def _migrate(self):
+        columns = self._columns()
+        if columns and "topic" not in columns:
+            # Entries from before topics were tracked cannot be attributed to one; those articles
+            # are gathered again once
+            self._conn.execute("DROP TABLE seen_urls")
+
+    def _bloom_key(self, source, topic, url):
+        return f"{source}\x1f{topic}\x1f{url}"
+
+    def is_seen(self, url, source="", topic=""):
+        """
+        Check whether an article URL was analyzed before for a topic.
+
+        Args:
+            url (str): Article URL
+            source (str): Name of the scraper that found it
+            topic (str): Topic it was found for
+
+        Returns:
+            bool: True if the URL (after normalization) is in the index for this source and topic
+        """
+        key = normalize_url(url)
+        with self._lock:
+            self.stats["lookups"] += 1
+            if self._bloom_key(source, topic, key) not in self._bloom:
+                self.stats["bloom_negatives"] += 1
+                return False
+            found = self._conn.execute("SELECT 1 FROM seen_urls WHERE source = ? AND topic = ? AND url = ?",
+                                       (source, topic, key)).fetchone() is not None
+            self.stats["seen" if found else "false_positives"] += 1
+            return found
+
+    def mark(self, url, source="", topic=""):
+        """
+        Record an article URL as analyzed for a topic.
+
+        Args:
+            url (str): Article URL
+            source (str): Name of the scraper that found it
+            topic (str): Topic it was analyzed for
+        """
+        key = normalize_url(url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO seen_urls (url, source, topic, seen_at) VALUES (?, ?, ?, ?)",
+                (key, source, topic, time.time()),
+            )
+            self._conn.commit()
+            self._bloom.add(self._bloom_key(source, topic, key))
+            self.stats["marked"] += 1
@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SqliteStore:
+    """
+    Base for the caches and indexes kept in a single SQLite file.
+
+    Subclasses set `table`, `key_column` and `schema`; the store opens one connection shared
+    by all threads behind `_lock` and provides TTL and LRU eviction over that table.
+    """
+
+    table = None
+    key_column = "key"
+    schema = ""
+
+    def __init__(self, path):
+        """
+        Open the database and create the schema.
+
+        Args:
+            path (str): SQLite database file; its directory is created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._migrate()
+        self._conn.executescript(self.schema)
+        self._conn.commit()
+
+    def _migrate(self):
+        """Hook run before the schema is created, for stores whose table layout changed"""
+
+    def _columns(self):
+        return [row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")]
+
+    def _touch(self, key, now=None):
+        """Record an access for LRU eviction; call with the lock held"""
+        self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE {self.key_column} = ?",
+                           (time.time() if now is None else now, key))
+        self._conn.commit()
+
+    def _evict(self, max_entries=None, expires_column=None, ttl_seconds=None, batch=None):
+        """
+        Drop expired rows, then the least recently used ones beyond max_entries.
+
+        Args:
+            max_entries (int, optional): Rows to keep; None skips the LRU pass
+            expires_column (str, optional): Timestamp column compared against ttl_seconds; None skips the TTL pass
+            ttl_seconds (float, optional): Rows whose expires_column is older than this are removed
+            batch (int, optional): Most rows removed per pass, so eviction cost stays bounded
+        """
+        table, key = self.table, self.key_column
+        limit = -1 if batch is None else batch
+        with self._lock:
+            if expires_column is not None:
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE {key} IN ("
+                    f"SELECT {key} FROM {table} WHERE {expires_column} < ? ORDER BY {expires_column} LIMIT ?)",
+                    (time.time() - ttl_seconds, limit),
+                )
+            if max_entries is not None:
+                excess = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE {key} IN ("
+                        f"SELECT {key} FROM {table} ORDER BY last_access LIMIT ?)",
+                        (excess if batch is None else min(excess, batch),),
+                    )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+# Telegram rejects messages longer than this many characters
+MESSAGE_LIMIT = 4096
+# Entity markers of Telegram's legacy Markdown parse mode; entities do not nest
+CODE_BLOCK = "```"
+INLINE_MARKERS = ("*", "_", "`")
+# Preferred places to break a message, best first
+SPLIT_SEPARATORS = ("\n\n", "\n", " ")
+
+
+def escape_markdown(text):
+    """Escape legacy Markdown markers so arbitrary text, e.g. partial model output, shows literally"""
+    return re.sub(r"([_*`\[])", r"\\\1", text)
+
+
+def _entity_states(text):
+    """
+    Markdown entity open before each position of `text`.
+
+    Returns:
+        list: len(text) + 1 entries; entry i is the marker open before text[i], or None
+    """
+    states = [None] * (len(text) + 1)
+    open_marker = None
+    i = 0
+    while i < len(text):
+        states[i] = open_marker
+        if open_marker is None and text[i] == "\\":
+            step = 2
+        elif text.startswith(CODE_BLOCK, i) and open_marker in (None, CODE_BLOCK):
+            open_marker = None if open_marker else CODE_BLOCK
+            step = len(CODE_BLOCK)
+        else:
+            if open_marker in (None, text[i]) and text[i] in INLINE_MARKERS:
+                open_marker = None if open_marker else text[i]
+            step = 1
+        for j in range(i + 1, min(i + step, len(text))):
+            states[j] = states[i]
+        i += step
+    states[len(text)] = open_marker
+    return states
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """
+    Split text into messages of at most `limit` characters without breaking Markdown.
+
+    Breaks at a paragraph, then a line, then a word boundary where no entity is open;
+    when no such boundary fits, the open entity is closed at the cut and reopened in
+    the next message.
+
+    Args:
+        text (str): Message text in legacy Markdown
+        limit (int): Maximum characters per message
+
+    Returns:
+        list: Message texts, in order
+    """
+    messages = []
+    while len(text) > limit:
+        states = _entity_states(text[:limit])
+        cut = None
+        for separator in SPLIT_SEPARATORS:
+            position = text.rfind(separator, 0, limit)
+            while position > 0 and states[position] is not None:
+                position = text.rfind(separator, 0, position)
+            if position > 0:
+                cut = position
+                break
+        if cut is not None:
+            messages.append(text[:cut].rstrip())
+            text = text[cut:].lstrip()
+            continue
+        # No clean boundary: cut inside the entity and carry it over
+        cut = limit - len(CODE_BLOCK)
+        marker = states[cut]
+        if marker is None:
+            messages.append(text[:limit])
+            text = text[limit:]
+        else:
+            messages.append(text[:cut] + marker)
+            text = marker + text[cut:]
+    if text.strip():
+        messages.append(text)
+    return messages
+
+
+def pack_messages(blocks, limit=MESSAGE_LIMIT, separator="\n"):
+    """
+    Pack message blocks into as few messages as fit, never splitting a block that fits on its own.
+
+    Args:
+        blocks (list): Self-contained Markdown blocks, e.g. one per topic
+        limit (int): Maximum characters per message
+        separator (str): Text placed between blocks within a message
+
+    Returns:
+        list: Message texts, in order
+    """
+    messages = []
+    current = ""
+    for block in blocks:
+        candidate = f"{current}{separator}{block}" if current else block
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            messages.append(current)
+        if len(block) <= limit:
+            current = block
+        else:
+            *whole, current = split_message(block, limit)
+            messages += whole
+    if current:
+        messages.append(current)
+    return messages
+
+
+class SendRateLimiter:
+    """Thread-safe pacing of Bot API sends: a global rate, a minimum interval per chat and retry_after pauses"""
+
+    def __init__(self, messages_per_second=30, per_chat_interval=1.0):
+        """
+        Args:
+            messages_per_second (float): Sends allowed per second across all chats
+            per_chat_interval (float): Seconds between two sends to the same chat
+        """
+        self.global_interval = 1.0 / messages_per_second
+        self.per_chat_interval = per_chat_interval
+        self._next_global = 0.0
+        self._next_chat = {}
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold every send back for `seconds`, e.g. after a 429 with retry_after"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def wait(self, chat_id):
+        """Block until a message may be sent to `chat_id`, without claiming the slot"""
+        with self._lock:
+            delay = max(self._paused_until, self._next_global, self._next_chat.get(chat_id, 0.0)) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def acquire(self, chat_id):
+        """Block until a message may be sent to `chat_id`, then claim the slot"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._paused_until, self._next_global, self._next_chat.get(chat_id, 0.0))
+            self._next_global = slot + self.global_interval
+            self._next_chat[chat_id] = slot + self.per_chat_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class TelegramOutbox:
+    """Messages that could not be delivered, kept on disk and replayed by the next run"""
+
+    def __init__(self, path="cache/telegram_outbox.jsonl"):
+        """
+        Args:
+            path (str): JSON lines file, one undelivered message per line
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def add(self, chat_id, text, error):
+        """Queue a message that failed to send"""
+        entry = {"chat_id": chat_id, "text": text, "error": str(error), "queued_at": time.time()}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def pending(self):
+        """
+        Every queued message, oldest first.
+
+        Returns:
+            list: Dictionaries with 'chat_id', 'text', 'error' and 'queued_at' keys
+        """
+        with self._lock:
+            if not self.path.exists():
+                return []
+            with open(self.path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+    def replace(self, entries):
+        """Atomically rewrite the outbox with `entries`, e.g. the ones a replay could not deliver"""
+        with self._lock:
+            if not entries:
+                self.path.unlink(missing_ok=True)
+                return
+            temporary = self.path.with_suffix(".tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(temporary, self.path)
+
+    def __len__(self):
+        return len(self.pending())
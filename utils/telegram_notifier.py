@@ -1,52 +1,238 @@
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from .metrics import metrics
+from .telegram_delivery import SendRateLimiter, escape_markdown, pack_messages, split_message
+
+SENTIMENT_EMOJI = {
+    "bullish": "📈",
+    "bearish": "📉",
+    "neutral": "➡️"
+}
+DIGEST_HEADER = "📊 *Market Analysis Summary*\n"
+DIGEST_RULE = "─" * 30
 
 
 class TelegramNotifier:
     """Sends notifications to Telegram"""
 
-    def __init__(self, bot_token=None, chat_id=None):
+    def __init__(self, bot_token=None, chat_id=None, api_url=None, recorder=None, outbox=None, rate_limiter=None,
+                 timeout=(5, 30), max_retries=3, base_delay=1.0, max_workers=4):
         """
         Initialize the Telegram notifier.
 
         Args:
             bot_token (str, optional): Telegram bot token. If not provided, uses TELEGRAM_BOT_TOKEN env variable.
-            chat_id (str, optional): Telegram chat ID. If not provided, uses TELEGRAM_CHAT_ID env variable.
+            chat_id (str, optional): Telegram chat ID, or several separated by commas. If not provided,
+                uses TELEGRAM_CHAT_ID env variable.
+            api_url (str, optional): Bot API base URL. Defaults to TELEGRAM_API_URL or https://api.telegram.org.
+            recorder (Recorder, optional): Saves every API exchange for offline replay
+            outbox (TelegramOutbox, optional): Keeps messages that could not be delivered for the next run
+            rate_limiter (SendRateLimiter, optional): Paces sends; defaults to Telegram's published limits
+            timeout (tuple): Connect and read timeout in seconds for each request
+            max_retries (int): Retries per message after a 429, a 5xx or a connection error
+            base_delay (float): First backoff delay in seconds, doubled on each retry
+            max_workers (int): Chats sent to in parallel; messages to one chat always go in order
         """
         self.bot_token = bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
         self.chat_id = chat_id or os.getenv('TELEGRAM_CHAT_ID')
+        self.api_url = (api_url or os.getenv('TELEGRAM_API_URL') or "https://api.telegram.org").rstrip("/")
+        self.recorder = recorder
 
         if not self.bot_token or not self.chat_id:
             raise ValueError("Telegram bot token and chat ID must be provided either as arguments or environment variables")
 
+        self.chat_ids = [chat.strip() for chat in str(self.chat_id).split(",") if chat.strip()]
+        self.outbox = outbox
+        self.rate_limiter = rate_limiter or SendRateLimiter()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_workers = max_workers
+        self.stats = {"sent": 0, "edited": 0, "retries": 0, "rate_limited": 0, "failed": 0, "queued": 0,
+                      "replayed": 0}
+        self._stats_lock = threading.Lock()
+        # One keep-alive session shared by every send
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def send_message(self, message):
         """
-        Send a message to Telegram.
+        Send a message to Telegram, split into several when it is over the length limit.
 
         Args:
             message (str): Message to send
 
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if every part reached every chat, False otherwise
+        """
+        return self.send_messages(split_message(message))
+
+    @metrics.timed("send_message")
+    def send_messages(self, messages):
+        """
+        Send messages to every chat, in order; chats are served in parallel.
+
+        Messages that cannot be delivered go to the outbox, along with any later
+        messages to the same chat so the order is kept when they are replayed.
+
+        Args:
+            messages (list): Message texts, each within Telegram's length limit
+
+        Returns:
+            bool: True if every message reached every chat, False otherwise
+        """
+        undelivered = self._deliver({chat_id: list(messages) for chat_id in self.chat_ids})
+        delivered = self._queue_undelivered(undelivered)
+        if delivered:
+            print("✓ Message sent to Telegram")
+        return delivered
+
+    def start_digest(self, topics):
+        """
+        Post a placeholder digest for the topics, to be filled in as their results arrive.
+
+        Args:
+            topics (list): Topics the digest will cover
+
+        Returns:
+            LiveDigest: Feed it progress() and complete() calls, then finish()
+        """
+        return LiveDigest(self, topics)
+
+    def _queue_undelivered(self, undelivered):
+        """Put messages that could not be delivered, as chat -> [(text, error)], in the outbox; True if none"""
+        for chat_id, failures in undelivered.items():
+            if not failures:
+                continue
+            if self.outbox is not None:
+                for text, error in failures:
+                    self.outbox.add(chat_id, text, error)
+                self._count("queued", len(failures))
+            where = f"queued {len(failures)} in the outbox" if self.outbox is not None else "dropped"
+            print(f"✗ Telegram delivery to {chat_id} failed ({failures[0][1]}); {where}")
+        return not any(undelivered.values())
+
+    def flush_outbox(self):
+        """
+        Resend messages left in the outbox by earlier runs, oldest first.
+
+        Returns:
+            int: Number of messages delivered
+        """
+        if self.outbox is None:
+            return 0
+        entries = self.outbox.pending()
+        if not entries:
+            return 0
+        print(f"Replaying {len(entries)} undelivered Telegram message(s) from the outbox...")
+        per_chat = {}
+        for entry in entries:
+            per_chat.setdefault(entry["chat_id"], []).append(entry["text"])
+        undelivered = self._deliver(per_chat)
+        remaining = [{"chat_id": chat_id, "text": text, "error": str(error), "queued_at": time.time()}
+                     for chat_id, failures in undelivered.items() for text, error in failures]
+        self.outbox.replace(remaining)
+        replayed = len(entries) - len(remaining)
+        self._count("replayed", replayed)
+        print(f"Outbox: {replayed} delivered, {len(remaining)} still queued")
+        return replayed
+
+    def _deliver(self, per_chat):
+        """Send each chat its messages in order, chats in parallel; returns chat -> [(text, error)] not sent"""
+        if not per_chat:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(per_chat))) as executor:
+            return dict(zip(per_chat, executor.map(lambda item: self._send_chat(*item), per_chat.items())))
+
+    def _send_chat(self, chat_id, messages):
+        for index, text in enumerate(messages):
+            error = self._send_text(chat_id, text)
+            if error is not None:
+                # Later messages wait behind the failed one so the chat never sees them out of order
+                return [(text, error)] + [(later, "not sent after an earlier failure") for later in messages[index + 1:]]
+        return []
+
+    def _send_text(self, chat_id, text):
+        """Send one message; returns None on success or the error description"""
+        return self._post(chat_id, text)[1]
+
+    def _post(self, chat_id, text, message_id=None, markdown=True):
+        """
+        Send one message, or replace the text of an earlier one when message_id is given.
+
+        Returns:
+            tuple: (message_id, None) on success, or (None, error description)
+        """
+        method = "sendMessage" if message_id is None else "editMessageText"
+        data = {"chat_id": chat_id, "text": text}
+        if message_id is not None:
+            data["message_id"] = message_id
+        result, error = self._call(method, dict(data, parse_mode="Markdown") if markdown else data)
+        if markdown and error is not None and "can't parse entities" in error:
+            # Model output occasionally contains stray Markdown; send it as plain text instead of losing it
+            result, error = self._call(method, data)
+        if message_id is not None and error is not None and "message is not modified" in error:
+            result, error = {"message_id": message_id}, None
+        outcome = ("sent" if message_id is None else "edited") if error is None else "failed"
+        self._count(outcome)
+        metrics.count("telegram_messages", result=outcome)
+        if error is not None:
+            return None, error
+        return (result or {}).get("message_id", message_id), None
+
+    def _call(self, method, data):
         """
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-        data = {
-            "chat_id": self.chat_id,
-            "text": message,
-            "parse_mode": "Markdown"
-        }
-
-        try:
-            response = requests.post(url, data=data)
-            if response.status_code == 200:
-                print("✓ Message sent to Telegram")
-                return True
+        Call a Bot API method, retrying 429s (after retry_after), 5xx and connection errors.
+
+        Returns:
+            tuple: (result, None) on success, or (None, error description)
+        """
+        url = f"{self.api_url}/bot{self.bot_token}/{method}"
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(data["chat_id"])
+            delay = min(30.0, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            try:
+                response = self.session.post(url, data=data, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
             else:
-                print(f"✗ Failed to send Telegram message: {response.text}")
-                return False
-        except Exception as e:
-            print(f"✗ Error sending Telegram message: {e}")
-            return False
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {"ok": False, "description": response.text[:200]}
+                if self.recorder is not None:
+                    self.recorder.record_response("telegram", {"method": method, **data}, body)
+                if response.status_code == 200 and body.get("ok", True):
+                    return body.get("result"), None
+                error = body.get("description") or f"HTTP {response.status_code}"
+                if response.status_code == 429:
+                    # Telegram says how long to back off; every sender waits that long
+                    self._count("rate_limited")
+                    retry_after = (body.get("parameters") or {}).get("retry_after", 1)
+                    self.rate_limiter.pause(retry_after)
+                    delay = 0
+                elif response.status_code < 500:
+                    return None, error
+            if attempt < self.max_retries:
+                self._count("retries")
+                metrics.count("retries", service="telegram")
+                time.sleep(delay)
+        return None, error
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+
+    def close(self):
+        self.session.close()
 
     def send_summary(self, topic, summary, sentiment):
         """
@@ -60,15 +246,14 @@ class TelegramNotifier:
         Returns:
             bool: True if successful, False otherwise
         """
+        return self.send_message(self.format_summary(topic, summary, sentiment))
+
+    def format_summary(self, topic, summary, sentiment):
+        """The Markdown message send_summary() sends for one topic"""
         # Format sentiment with emoji
-        sentiment_emoji = {
-            "bullish": "📈",
-            "bearish": "📉",
-            "neutral": "➡️"
-        }
-        emoji = sentiment_emoji.get(sentiment.lower(), "")
-
-        message = f"""
+        emoji = SENTIMENT_EMOJI.get(sentiment.lower(), "")
+
+        return f"""
 🔔 *{topic} Analysis*
 
 *Sentiment:* {emoji} {sentiment.upper()}
@@ -79,11 +264,9 @@ class TelegramNotifier:
 _Generated at {self._get_timestamp()}_
         """.strip()
 
-        return self.send_message(message)
-
     def send_multiple_summaries(self, summaries):
         """
-        Send multiple analysis summaries as one message.
+        Send multiple analysis summaries, packed into as few messages as fit Telegram's limit.
 
         Args:
             summaries (list): List of dicts with 'topic', 'summary', 'sentiment' keys
@@ -94,27 +277,166 @@ _Generated at {self._get_timestamp()}_
         if not summaries:
             return False
 
-        message_parts = ["📊 *Market Analysis Summary*\n"]
+        # One block per topic, so a topic is only split when it alone is over the limit
+        blocks = [DIGEST_HEADER]
+        blocks += [self.digest_block(item.get('topic', 'Unknown'), item.get('summary', 'No summary available'),
+                                     item.get('sentiment', 'unknown')) for item in summaries]
+        blocks.append(f"\n_Generated at {self._get_timestamp()}_")
+        return self.send_messages(pack_messages(blocks))
 
-        for item in summaries:
-            sentiment = item.get('sentiment', 'unknown')
-            sentiment_emoji = {
-                "bullish": "📈",
-                "bearish": "📉",
-                "neutral": "➡️"
-            }.get(sentiment.lower(), "")
-
-            message_parts.append(f"\n*{item.get('topic', 'Unknown')}* {sentiment_emoji}")
-            message_parts.append(f"Sentiment: {sentiment.upper()}")
-            message_parts.append(f"{item.get('summary', 'No summary available')}\n")
-            message_parts.append("─" * 30)
-
-        message_parts.append(f"\n_Generated at {self._get_timestamp()}_")
-        message = "\n".join(message_parts)
-
-        return self.send_message(message)
+    def digest_block(self, topic, summary, sentiment):
+        """One topic's part of the digest send_multiple_summaries() sends"""
+        sentiment_emoji = SENTIMENT_EMOJI.get(sentiment.lower(), "")
+        return "\n".join([
+            f"\n*{topic}* {sentiment_emoji}",
+            f"Sentiment: {sentiment.upper()}",
+            f"{summary}\n",
+            DIGEST_RULE,
+        ])
 
     def _get_timestamp(self):
         """Get current timestamp as formatted string"""
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class LiveDigest:
+    """
+    A digest delivered while the run is still going.
+
+    The digest is posted at once with every topic pending, then edited in place
+    (editMessageText) as summaries stream in and topics finish; once every topic is done
+    it reads like the end-of-run digest, continuing in further messages if it outgrows
+    one. One thread per chat makes the calls. It waits for the chat's send slot before
+    rendering, so each call carries the latest state and a burst of updates collapses
+    into one edit; progress() and complete() never block.
+    """
+
+    def __init__(self, notifier, topics):
+        """
+        Args:
+            notifier (TelegramNotifier): Sends and edits the messages
+            topics (list): Topics the digest covers, in display order
+        """
+        self.notifier = notifier
+        self.topics = list(topics)
+        # topic -> {'status': 'pending' | 'streaming' | 'done', 'summary', 'sentiment'}
+        self._state = {topic: self._new_state() for topic in self.topics}
+        self._finished = False
+        # Set once every topic is done, or at finish(); the footer then shows it instead of progress
+        self._generated_at = None
+        self._changed = threading.Condition()
+        # chat -> [(text, error)] of final messages that could not be delivered
+        self._undelivered = {}
+        self._workers = [threading.Thread(target=self._run_chat, args=(chat_id,), daemon=True)
+                         for chat_id in notifier.chat_ids]
+        for worker in self._workers:
+            worker.start()
+
+    def progress(self, topic, summary):
+        """Show a topic's summary as streamed so far"""
+        self._update(topic, status="streaming", summary=summary)
+
+    def complete(self, topic, analysis):
+        """Show a topic's finished analysis; later calls for the same topic are ignored"""
+        self._update(topic, status="done", summary=analysis.get("summary", "No summary available"),
+                     sentiment=analysis.get("sentiment", "unknown"))
+
+    def finish(self):
+        """
+        Deliver the final state of the digest and stop the senders.
+
+        Returns:
+            bool: True if the final digest reached every chat; undelivered parts go to the outbox
+        """
+        with self._changed:
+            self._finished = True
+            if self._generated_at is None:
+                self._generated_at = self.notifier._get_timestamp()
+            self._changed.notify_all()
+        for worker in self._workers:
+            worker.join()
+        delivered = self.notifier._queue_undelivered(self._undelivered)
+        if delivered:
+            print("✓ Digest delivered to Telegram")
+        return delivered
+
+    def _new_state(self):
+        return {"status": "pending", "summary": "", "sentiment": None}
+
+    def _update(self, topic, **fields):
+        with self._changed:
+            state = self._state.get(topic)
+            if state is None:
+                self.topics.append(topic)
+                state = self._state[topic] = self._new_state()
+                self._generated_at = None
+            if state["status"] == "done":
+                return
+            state.update(fields)
+            if self._generated_at is None and all(self._state[name]["status"] == "done" for name in self.topics):
+                # Complete now; finish() then has nothing left to edit
+                self._generated_at = self.notifier._get_timestamp()
+            self._changed.notify_all()
+
+    def _run_chat(self, chat_id):
+        # Message ids, the text each one shows, and the render whose last delivery attempt failed
+        shown = {"ids": [], "texts": [], "failed": None, "failures": []}
+        while True:
+            # Render only once a call may go out, so it carries the newest state rather than the one
+            # current when the previous call finished
+            self.notifier.rate_limiter.wait(chat_id)
+            with self._changed:
+                texts = self._render(shown)
+                while not self._outdated(shown, texts) and not self._finished:
+                    self._changed.wait()
+                    texts = self._render(shown)
+                if not self._outdated(shown, texts):
+                    # Finished and up to date; a final digest that still failed goes to the outbox
+                    self._undelivered[chat_id] = shown["failures"]
+                    return
+            self._show_next(chat_id, shown, texts)
+
+    def _outdated(self, shown, texts):
+        return texts != shown["texts"] and texts != shown["failed"]
+
+    def _show_next(self, chat_id, shown, texts):
+        """Send or edit the first message that differs from texts; one API call"""
+        index = next(i for i, text in enumerate(texts) if i >= len(shown["texts"]) or shown["texts"][i] != text)
+        if index < len(shown["ids"]):
+            _, error = self.notifier._post(chat_id, texts[index], shown["ids"][index])
+            if error is None:
+                shown["texts"][index] = texts[index]
+        else:
+            message_id, error = self.notifier._post(chat_id, texts[index])
+            if error is None:
+                shown["ids"].append(message_id)
+                shown["texts"].append(texts[index])
+        if error is not None:
+            # Not retried until the digest changes; later messages would arrive out of order
+            shown["failed"] = texts
+            shown["failures"] = [(texts[index], error)] + [(later, "not sent after an earlier failure")
+                                                           for later in texts[index + 1:]]
+        elif shown["texts"] == texts:
+            shown["failed"], shown["failures"] = None, []
+
+    def _render(self, shown):
+        """The digest as message texts; called under the lock"""
+        blocks = [DIGEST_HEADER]
+        for topic in self.topics:
+            state = self._state[topic]
+            if state["status"] == "done":
+                blocks.append(self.notifier.digest_block(topic, state["summary"], state["sentiment"] or "unknown"))
+            elif self._finished:
+                blocks.append(f"\n✗ *{topic}*: no result")
+            elif state["status"] == "streaming":
+                # Partial model output may hold unbalanced Markdown, so it is escaped
+                blocks.append(f"\n⏳ *{topic}*\n{escape_markdown(state['summary'])} …\n\n{DIGEST_RULE}")
+            else:
+                blocks.append(f"\n⏳ *{topic}*: analyzing…")
+        done = sum(self._state[topic]["status"] == "done" for topic in self.topics)
+        blocks.append(f"\n_Generated at {self._generated_at}_" if self._generated_at is not None
+                      else f"\n_{done}/{len(self.topics)} topics ready_")
+        texts = pack_messages(blocks)
+        # Messages already in the chat cannot be taken back; ones the digest no longer fills are blanked
+        return texts + ["⋯"] * (len(shown["ids"]) - len(texts))
@@ -1,138 +1,201 @@
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
-from .base_scraper import BaseScraper
-
-
-class YahooFinanceScraper:
-    """Scraper for CryptoPotato website"""
-
-    def __init__(self, driver, days_back=1, num_articles=4, list_of_search_words=None):
+from .base_scraper import BaseScraper, register_scraper
+from .extraction import ExtractionSpec, Field, HtmlExtractor
+from .metrics import metrics
+from .readiness import PageReadiness, element_count_at_least, network_idle
+from .search_strategy import SearchStrategy
+
+
+@register_scraper("yahoo_finance")
+class YahooFinanceScraper(BaseScraper):
+    """Scraper for Yahoo Finance search results"""
+
+    # Search results: one item per news entry in the recent news section
+    SEARCH_RESULTS_SPEC = ExtractionSpec(
+        scope=[('section', {'data-testid': 'recent-news'})],
+        item='section[data-testid="recent-news"] div.content',
+        fields={
+            'date': Field('div.footer.yf-lfbf5f div.publishing.yf-m1e6lz'),
+            'url': Field('a.subtle-link.fin-size-small.titles.noUnderline.yf-106qqvl', attr='href'),
+        },
+    )
+
+    # Article page: the cover title and the paragraphs of the article body
+    ARTICLE_SPEC = ExtractionSpec(
+        scope=[('h1', {'class': 'cover-title yf-1rjrr1'}), ('div', {'class': 'body yf-h0on0w'})],
+        fields={
+            'title': Field('h1.cover-title.yf-1rjrr1'),
+            'paragraphs': Field('div.body.yf-h0on0w p.yf-1090901', many=True),
+        },
+    )
+    ARTICLE_BODY = 'div.body'
+
+    def __init__(self, driver=None, days_back=1, num_articles=4, list_of_search_words=None,
+                 driver_pool=None, base_url="https://finance.yahoo.com/", http_fetcher=None, readiness=None,
+                 article_cache=None, extractor=None,
+                 in_browser_extraction=True, search_strategy=None, seen_urls=None,
+                 article_registry=None, recorder=None):
         """
         Initialize the scraper.
 
         Args:
+            driver: Selenium WebDriver instance, used when no driver_pool is given
             days_back (int): Number of days back to check for articles (default: 1 = today only)
+            driver_pool (DriverPool, optional): Pool to spread searches and article visits across
+            base_url (str): Yahoo Finance homepage URL
+            http_fetcher (HttpFetcher, optional): Tries article pages over plain HTTP before the browser
+            readiness (PageReadiness, optional): Shared page wait helper; one is created if not given
+            article_cache (ArticleCache, optional): Checked before fetching an article at all
+            extractor (HtmlExtractor, optional): HTML extraction backend; defaults to the fastest installed
+            in_browser_extraction (bool): Run selectors inside the page via execute_script instead
+                of pulling page_source into Python
+            search_strategy (SearchStrategy, optional): How results pages are reached; defaults
+                to direct quote URLs with the search box as fallback
+            seen_urls (SeenUrlIndex, optional): Articles analyzed for a topic in earlier runs; link
+                gathering for that topic stops at the first one and only newer links are returned
+            article_registry (ArticleRegistry, optional): Run-wide registry so an article shared by
+                several topics is fetched once, and near-duplicate stories are dropped per topic
+            recorder (Recorder, optional): Saves search and article pages for offline replay
         """
-        self.driver = driver
+        self._init_sources(driver, driver_pool, article_cache, seen_urls, article_registry, recorder)
+        self.http_fetcher = http_fetcher
+        self.readiness = readiness or PageReadiness()
+        self.extractor = extractor or HtmlExtractor()
+        self.in_browser_extraction = in_browser_extraction
         self.days_back = days_back
         self.num_articles = num_articles
-        self.base_url = "https://finance.yahoo.com/"
-        self.website_name = "yahoo_finance"
+        self.base_url = base_url
+        self.search_strategy = search_strategy or SearchStrategy(base_url, self.readiness)
         self.list_of_search_words = list_of_search_words or ["Solana"]
-    
-    def scrape_website(self):
-        """Visit a website and scrape its content"""
-        output = {}
 
-        print(f"Starting from: {self.base_url}")
-        print(f"Will search for {len(self.list_of_search_words)} term(s): {', '.join(self.list_of_search_words)}")
+    def scrape_website(self, search_terms=None):
+        """
+        Visit a website and scrape its content.
+
+        Args:
+            search_terms (list, optional): Terms to search for. Defaults to list_of_search_words.
 
-        for search_term in self.list_of_search_words:
-            print(f"\n{'='*60}")
-            print(f"Searching for: {search_term}")
-            print(f"{'='*60}")
-            scraped_articles = self._scrape_website(search_term)
-            output[search_term] = scraped_articles
-            print(f"Completed search for '{search_term}': {len(scraped_articles)} articles scraped")
+        Returns:
+            dict: Maps each search term to its list of articles
+        """
+        search_terms = search_terms or self.list_of_search_words
+
+        print(f"Starting from: {self.base_url}")
+        print(f"Will search for {len(search_terms)} term(s): {', '.join(search_terms)}")
+
+        # Search all terms first, then visit every article, so both phases use the whole pool
+        links = self._map_drivers(self._search_and_gather, search_terms)
+        jobs = [(term, url) for term, urls in zip(search_terms, links) for url in urls]
+        # An article returned for several terms is fetched once and fanned out to each of them
+        unique_urls = list(dict.fromkeys(url for _, url in jobs))
+        visited = dict(zip(unique_urls, self._fetch_many(unique_urls)))
+        if len(unique_urls) < len(jobs):
+            print(f"{len(jobs) - len(unique_urls)} article link(s) shared between search terms, fetched once")
+
+        output = {search_term: [] for search_term in search_terms}
+        for search_term, url in jobs:
+            output[search_term] += visited[url]
+        for search_term in search_terms:
+            output[search_term] = self.dedupe_articles(output[search_term])
+            print(f"Completed search for '{search_term}': {len(output[search_term])} articles scraped")
 
         print(f"\n{'='*60}")
         print(f"Total scraping complete: {sum(len(articles) for articles in output.values())} articles across {len(output)} search term(s)")
         print(f"{'='*60}\n")
         return output
 
-    def _scrape_website(self, search_term):
-        self._navigate_and_search(search_term)
-        articles_to_visit = self._gather_links()
-        articles = []
-        for url in articles_to_visit:
-            articles += self._visit_and_get_article(url)
-        
-        print(f"Scraped {len(articles)} articles from Yahoo Finance")
-        return articles
-        
-    def _navigate_and_search(self, search_term):
-        """Navigate to the website and perform search"""
+    def search_links(self, search_term):
+        """
+        Search for a term and return the article links to visit, borrowing one driver.
+
+        Args:
+            search_term (str): Term to search for on Yahoo Finance
+
+        Returns:
+            list: Article URLs within the date range
+        """
+        return self._with_driver(self._search_and_gather, search_term)
+
+    def _search_and_gather(self, driver, search_term):
+        """Run a search and collect its article links on one driver"""
+        self._navigate_and_search(search_term, driver)
+        return self._gather_links(driver, search_term)
+
+    @metrics.timed("search", source="yahoo_finance")
+    def _navigate_and_search(self, search_term, driver=None):
+        """Open the search results for a term, directly when possible"""
+        driver = driver or self.driver
         print(f"Navigating and searching for '{search_term}'...")
-        self.driver.get(self.base_url)
-        # Wait until the search box is visible
-        wait = WebDriverWait(self.driver, 10)
-        search_box = wait.until(EC.visibility_of_element_located((By.ID, "ybar-sbq")))
-        search_box.send_keys(search_term)
-        search_box.send_keys(Keys.RETURN)
-
-        # Wait for search results to actually load
+
+        # Results are ready once enough news items have rendered, or the page has stopped loading more
+        results_ready = EC.all_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'section[data-testid="recent-news"]')),
+            EC.any_of(
+                element_count_at_least((By.CSS_SELECTOR, 'section[data-testid="recent-news"] div.content'),
+                                       self.num_articles),
+                network_idle(500),
+            ),
+        )
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'section[data-testid="recent-news"]')))
-            time.sleep(2)  # Brief pause for any remaining JS to execute
+            self.search_strategy.search(driver, search_term, results_ready)
             print("Search complete, page loaded")
+            self._record_page(driver, "search")
         except Exception as e:
             print(f"Warning: Timeout waiting for recent news section: {e}")
-            time.sleep(5)  # Fallback to fixed wait
-        
+        finally:
+            self._count_page_load("searches")
     
-    def _gather_links(self):
-        """Extract article links from Yahoo Finance search results"""
+
+    @metrics.timed("gather_links", source="yahoo_finance")
+    def _gather_links(self, driver=None, search_term=None):
+        """Extract article links from Yahoo Finance search results, stopping at ones analyzed for the term before"""
+        driver = driver or self.driver
         print("Gathering article links from Yahoo Finance...")
 
         # Ensure page is ready before getting source
         try:
-            self.driver.execute_script("return document.readyState") == "complete"
+            driver.execute_script("return document.readyState") == "complete"
         except Exception as e:
             print(f"Warning: Could not verify page ready state: {e}")
 
         try:
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            results = self.extractor.extract_from_driver(self.SEARCH_RESULTS_SPEC, driver, self.in_browser_extraction)
         except Exception as e:
             print(f"Error getting page source: {e}")
             return []
 
-        # First find the recent news section
-        recent_news_section = soup.find('section', {'data-testid': 'recent-news'})
-        if not recent_news_section:
+        if not results:
             print("Warning: Could not find recent news section")
             return []
 
-        # Find all content divs within the recent news section
-        content_divs = recent_news_section.find_all('div', class_='content')
-        print(f"Found {len(content_divs)} articles in recent news section")
+        print(f"Found {len(results)} articles in recent news section")
         articles_to_visit = []
 
-        for content_div in content_divs:
+        for result in results:
             if len(articles_to_visit) >= self.num_articles:
                 break
-            # Find the date in the footer
-            footer_div = content_div.find('div', class_='footer yf-lfbf5f')
-            if footer_div:
-                publishing_div = footer_div.find('div', class_='publishing yf-m1e6lz')
-                if publishing_div:
-                    # Extract date text (e.g., "TheStreet • 3h ago")
-                    date_text = publishing_div.get_text(strip=True)
-                    # Split by bullet point and get the time part
-                    if '•' in date_text:
-                        date = date_text.split('•')[-1].strip()
-                    else:
-                        date = date_text
-
-                    # Check if within date range
-                    if not self._is_within_date_range(date):
-                        break
-                        
-            
-            # Find the link
-            link_tag = content_div.find('a', class_='subtle-link fin-size-small titles noUnderline yf-106qqvl')
-            if not link_tag:
-                continue
-
-            article_url = link_tag.get('href', '')
+            # Extract date text from the footer (e.g., "TheStreet • 3h ago")
+            date_text = result['date']
+            if date_text:
+                # Split by bullet point and get the time part
+                if '•' in date_text:
+                    date = date_text.split('•')[-1].strip()
+                else:
+                    date = date_text
+
+                # Check if within date range
+                if not self._is_within_date_range(date):
+                    break
+
+            article_url = result['url']
             if not article_url or not article_url.startswith('http'):
                 continue
+            # Results are newest first, so everything from here on was analyzed for this term by an earlier run
+            if search_term is not None and self.is_seen(article_url, search_term):
+                print(f"Reached already analyzed article, stopping: {article_url}")
+                break
             articles_to_visit.append(article_url)
 
         timeframe = "today" if self.days_back == 1 else f"last {self.days_back} days"
@@ -140,43 +203,6 @@ class YahooFinanceScraper:
         print(articles_to_visit)
         return articles_to_visit
 
-    def _visit_and_get_article(self, url):
-        """Visit an article and extract its content"""
-        print(f"Visiting article: {url}")
-
-        article_texts = []
-        try:
-            self.driver.get(url)
-
-            # Wait for article body to load
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.body')))
-
-            # Get page source and parse with BeautifulSoup
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-        except Exception as e:
-            print(f"Error loading article {url}: {e}")
-            return []
-
-        # Extract title - Yahoo Finance uses h1 with class 'cover-title yf-1rjrr1'
-        title_tag = soup.find('h1', class_='cover-title yf-1rjrr1')
-        title = title_tag.get_text(strip=True) if title_tag else 'No title'
-
-        # Extract content - Yahoo Finance uses div with class 'body yf-h0on0w'
-        content_div = soup.find('div', class_='body yf-h0on0w')
-
-        # Find all <p> elements within the content div
-        if content_div:
-            paragraphs = content_div.find_all('p', class_='yf-1090901')
-            article_text = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-            content = '\n'.join(article_text)
-        else:
-            content = 'No content'
-
-        article_texts.append({'title': title, 'content': content})
-
-        return article_texts
-
     def _is_within_date_range(self, date_str):
         """
         Check if the article was posted within the specified days_back range.